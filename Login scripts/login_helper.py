@@ -1,6 +1,10 @@
 import os
+import sys
 from playwright.sync_api import sync_playwright
 
+# The main folder (content_manager.py, session_check.py) lives one level up from this script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # ==========================================
 # THE FAKE ID
 # ==========================================
@@ -54,14 +58,17 @@ def save_session(choice=None, is_ui=False, username="default"):
 
     if choice == '1':
         platform_name = "X"
+        platform_code = "x"
         profile_folder = "X_Profile"
         login_url = "https://x.com/login"
     elif choice == '2':
         platform_name = "Instagram"
+        platform_code = "ig"
         profile_folder = "IG_Profile"
         login_url = "https://www.instagram.com/accounts/login/"
     elif choice == '3':
         platform_name = "TikTok"
+        platform_code = "tiktok"
         profile_folder = "TikTok_Profile"
         login_url = "https://www.tiktok.com/login"
     else:
@@ -155,5 +162,17 @@ def save_session(choice=None, is_ui=False, username="default"):
         browser.close()
         print(f"Session saved! You can now run your main bots using the '{session_dir}' folder.")
 
+    # ==========================================
+    # 🔑 RELEASE POSTS WAITING FOR THIS LOGIN
+    # ==========================================
+    # Posts parked as 'needs_login' (see session_check.py) can go again once the cookies look right.
+    from session_check import check_profile, needs_login
+    session = check_profile(platform_code, session_dir)
+    if needs_login(session):
+        print(f"⚠️ The login doesn't look complete yet: {session['detail']}. Posts waiting for it stay parked.")
+        return
+    from content_manager import ContentManager
+    ContentManager().requeue_needs_login(platform_code, username)
+
 if __name__ == "__main__":
     save_session()
\ No newline at end of file
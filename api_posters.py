@@ -0,0 +1,404 @@
+"""
+SHADOW POSTER - OFFICIAL API POSTERS
+Posts through the platforms' own APIs instead of driving Chrome: no browser start, no
+profile, no scrolling, just a few HTTP calls. They keep the browser posters' contract
+(create_post(text, media_path) -> bool, last_error, the phase timer), so main.py simply
+uses them for every account that has API credentials and the browser for everyone else.
+
+    X          X API v2: chunked media upload (initialize / append / finalize / status) + POST /2/tweets
+    Instagram  Graph API: media container -> (video: resumable upload) -> wait until FINISHED -> media_publish
+    TikTok     Content Posting API: video/init -> chunked PUT upload -> poll status/fetch until PUBLISH_COMPLETE
+
+Credentials live next to the browser profiles, in Profiles/<user>/api_credentials.json:
+
+    {
+      "x":      {"access_token": "<OAuth 2.0 user token with tweet.write + media.write>"},
+      "ig":     {"access_token": "<Graph API token>", "ig_user_id": "1784...",
+                 "media_base_url": "https://cdn.example.com/shadow"},
+      "tiktok": {"access_token": "<token with video.publish>", "privacy_level": "PUBLIC_TO_EVERYONE"}
+    }
+
+A platform that isn't listed (or has "enabled": false) keeps using the browser, and so does
+everything when SHADOW_API_POSTING=0. Tokens are used as they are: when one expires the job
+fails with HTTP 401 until the file is updated.
+
+Instagram only takes images from a public URL, so image posts need "media_base_url": the address
+where this folder's files (media/..., cache/...) are reachable from the internet. Videos are uploaded directly.
+TikTok's API only takes videos from a file upload here.
+
+Every API can be rehearsed offline against api_stub_server.py.
+"""
+
+import json
+import mimetypes
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+from timing import JobTimer
+
+CREDENTIALS_FILE = "api_credentials.json"
+API_POSTING = os.environ.get("SHADOW_API_POSTING", "1") != "0"
+
+# Where the APIs live. Each can also be overridden per account ("api_url" / "upload_url" in the credentials).
+X_API_URL = os.environ.get("SHADOW_X_API_URL", "https://api.x.com")
+IG_API_URL = os.environ.get("SHADOW_IG_API_URL", "https://graph.facebook.com/v21.0")
+IG_UPLOAD_URL = os.environ.get("SHADOW_IG_UPLOAD_URL", "https://rupload.facebook.com/ig-api-upload/v21.0")
+TIKTOK_API_URL = os.environ.get("SHADOW_TIKTOK_API_URL", "https://open.tiktokapis.com")
+
+HTTP_TIMEOUT = 120                 # seconds for one request (a 64 MB chunk on a slow line takes a while)
+PROCESSING_TIMEOUT = float(os.environ.get("SHADOW_API_PROCESSING_TIMEOUT", "600"))
+MAX_POLL_SECONDS = 15              # longest wait between two status checks
+X_CHUNK_BYTES = 4 * 1024 * 1024
+TIKTOK_CHUNK_BYTES = 10 * 1024 * 1024       # TikTok wants 5-64 MB chunks...
+TIKTOK_SINGLE_CHUNK_MAX = 64 * 1024 * 1024  # ...and anything up to 64 MB may go in one
+
+
+class ApiError(Exception):
+    """An API call failed. permanent=True means retrying the same job can't help."""
+
+    def __init__(self, message, status=None, permanent=False):
+        super().__init__(message)
+        self.status = status
+        self.permanent = permanent
+
+
+# ==========================================
+# 🌐 HTTP HELPERS (stdlib only)
+# ==========================================
+def _error_message(payload):
+    """The human part of an error response, whichever API it came from."""
+    if not isinstance(payload, dict):
+        return None
+    error = payload.get('error')
+    if isinstance(error, dict) and error.get('message'):
+        return error['message']
+    errors = payload.get('errors')
+    if isinstance(errors, list) and errors and isinstance(errors[0], dict):
+        return errors[0].get('message') or errors[0].get('detail')
+    return payload.get('detail') or payload.get('title')
+
+
+def request(method, url, token=None, json_body=None, form=None, data=None, headers=None):
+    """One HTTP call. Returns the parsed JSON answer ({} when the body is empty); raises ApiError otherwise."""
+    headers = dict(headers or {})
+    if token:
+        headers.setdefault("Authorization", f"Bearer {token}")
+    if json_body is not None:
+        data = json.dumps(json_body).encode('utf-8')
+        headers["Content-Type"] = "application/json; charset=UTF-8"
+    elif form is not None:
+        data = urllib.parse.urlencode(form).encode('utf-8')
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+    where = f"{method} {urllib.parse.urlsplit(url).path}"
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data, method=method, headers=headers),
+                                    timeout=HTTP_TIMEOUT) as response:
+            body = response.read()
+    except urllib.error.HTTPError as e:
+        raw = e.read().decode('utf-8', 'replace')
+        try:
+            detail = _error_message(json.loads(raw)) or raw
+        except ValueError:
+            detail = raw
+        hint = " (token rejected or expired: update api_credentials.json)" if e.code == 401 else ""
+        hint = " (rate limited)" if e.code == 429 else hint
+        raise ApiError(f"{where} -> HTTP {e.code}{hint}: {' '.join(detail.split())[:300]}", status=e.code)
+    except (urllib.error.URLError, OSError) as e:
+        raise ApiError(f"{where} failed: {getattr(e, 'reason', e)}")
+    if not body.strip():
+        return {}
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise ApiError(f"{where} answered with something that isn't JSON: {body[:200]!r}")
+
+
+def multipart(fields, file_field, file_name, file_bytes):
+    """Builds a multipart/form-data body. Returns (body, content type)."""
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+             for name, value in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{file_name}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8'))
+    parts += [file_bytes, f'\r\n--{boundary}--\r\n'.encode('utf-8')]
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def chunk_ranges(size, chunk_size, merge_tail=False):
+    """
+    [(first byte, last byte)] covering the file. merge_tail folds the leftover into the last
+    full chunk instead of sending a small extra one (TikTok counts chunks as size // chunk_size).
+    """
+    if size <= chunk_size:
+        return [(0, size - 1)]
+    count = size // chunk_size if merge_tail else -(-size // chunk_size)
+    ranges = [(i * chunk_size, min((i + 1) * chunk_size, size) - 1) for i in range(count)]
+    if merge_tail:
+        ranges[-1] = (ranges[-1][0], size - 1)
+    return ranges
+
+
+def read_range(path, first, last):
+    with open(path, 'rb') as file:
+        file.seek(first)
+        return file.read(last - first + 1)
+
+
+def mime_type(path):
+    guessed, _ = mimetypes.guess_type(path)
+    return guessed or "application/octet-stream"
+
+
+def wait_until(check, what, timeout=PROCESSING_TIMEOUT):
+    """
+    Polls check() -> (done, seconds the API asked us to wait or None) until done.
+    Backs off 1s, 2s, 4s... (capped) unless the API says how long to wait. Raises ApiError on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 1.0
+    while True:
+        done, hint = check()
+        if done:
+            return
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ApiError(f"{what} still not finished after {timeout:.0f}s")
+        time.sleep(min(hint or delay, MAX_POLL_SECONDS, remaining))
+        delay = min(delay * 2, MAX_POLL_SECONDS)
+
+
+# ==========================================
+# 📮 THE POSTERS
+# ==========================================
+class ApiPoster:
+    """What every API poster shares: credentials, the timer, the create_post() contract."""
+
+    display_name = "API"
+    default_api_url = None
+
+    def __init__(self, credentials, timer=None):
+        self.credentials = credentials
+        self.token = credentials.get('access_token')
+        self.api_url = (credentials.get('api_url') or self.default_api_url).rstrip("/")
+        # Phase stopwatch (see timing.py). main.py passes a real one; otherwise it's a throwaway.
+        self.timer = timer or JobTimer()
+        # Why the last create_post() failed (and whether a retry could ever help). main.py stores it in the queue.
+        self.last_error = None
+        self.permanent = False
+        # The platform's id for the post that went live.
+        self.post_id = None
+
+    def call(self, method, path, **kwargs):
+        return request(method, self.api_url + path, token=self.token, **kwargs)
+
+    def create_post(self, text: str, media_path: str = None) -> bool:
+        self.last_error, self.permanent, self.post_id = None, False, None
+        try:
+            self.post_id = self.publish(text or "", media_path)
+            print(f"✅ {self.display_name} API accepted the post (id {self.post_id}).")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to post through the {self.display_name} API: {e}")
+            self.last_error = str(e)
+            self.permanent = getattr(e, 'permanent', False)
+            return False
+
+    def publish(self, text, media_path):
+        raise NotImplementedError
+
+
+class XApiPoster(ApiPoster):
+    display_name = "X"
+    default_api_url = X_API_URL
+
+    def publish(self, text, media_path):
+        body = {"text": text}
+        if media_path:
+            body["media"] = {"media_ids": [self.upload_media(media_path)]}
+        self.timer.phase("submit")
+        print("🚀 Creating the post...")
+        result = self.call("POST", "/2/tweets", json_body=body)
+        return result.get('data', {}).get('id')
+
+    def upload_media(self, path):
+        self.timer.phase("media_attach")
+        size, media_type = os.path.getsize(path), mime_type(path)
+        if media_type.startswith("video/"):
+            category = "tweet_video"
+        elif media_type == "image/gif":
+            category = "tweet_gif"
+        else:
+            category = "tweet_image"
+        print(f"📤 Uploading {os.path.basename(path)} ({size / (1024 * 1024):.1f} MB) to X...")
+        init = self.call("POST", "/2/media/upload/initialize",
+                         json_body={"media_type": media_type, "total_bytes": size, "media_category": category})
+        media_id = init.get('data', {}).get('id')
+        if not media_id:
+            raise ApiError(f"X didn't return a media id: {init}")
+        for index, (first, last) in enumerate(chunk_ranges(size, X_CHUNK_BYTES)):
+            body, content_type = multipart({"segment_index": index}, "media", os.path.basename(path), read_range(path, first, last))
+            self.call("POST", f"/2/media/upload/{media_id}/append", data=body, headers={"Content-Type": content_type})
+        final = self.call("POST", f"/2/media/upload/{media_id}/finalize")
+
+        # Videos and GIFs are transcoded before they can be attached; images are ready right away.
+        self.timer.phase("upload_wait")
+        info = final.get('data', {}).get('processing_info')
+        if info and info.get('state') != 'succeeded':
+            print("⏳ Waiting for X to process the media...")
+            time.sleep(min(info.get('check_after_secs') or 1, MAX_POLL_SECONDS))
+
+            def check():
+                status = self.call("GET", f"/2/media/upload?command=STATUS&media_id={media_id}")
+                info = status.get('data', {}).get('processing_info') or {'state': 'succeeded'}
+                if info.get('state') == 'failed':
+                    error = info.get('error', {})
+                    raise ApiError(f"X couldn't process the media: {error.get('message') or error}", permanent=True)
+                return info.get('state') == 'succeeded', info.get('check_after_secs')
+
+            wait_until(check, "X media processing")
+        return media_id
+
+
+class IGApiPoster(ApiPoster):
+    display_name = "Instagram"
+    default_api_url = IG_API_URL
+
+    def __init__(self, credentials, timer=None):
+        super().__init__(credentials, timer)
+        self.upload_url = (credentials.get('upload_url') or IG_UPLOAD_URL).rstrip("/")
+        self.user_id = credentials.get('ig_user_id')
+
+    def public_url(self, media_path):
+        base = self.credentials.get('media_base_url')
+        if not base:
+            raise ApiError("Instagram's API only takes images from a public URL: set 'media_base_url' in api_credentials.json",
+                           permanent=True)
+        relative = os.path.relpath(media_path, os.getcwd()).replace(os.sep, "/")
+        return f"{base.rstrip('/')}/{urllib.parse.quote(relative)}"
+
+    def publish(self, text, media_path):
+        if not self.user_id:
+            raise ApiError("'ig_user_id' is missing from api_credentials.json", permanent=True)
+        if not media_path:
+            raise ApiError("Instagram posts need an image or a video", permanent=True)
+
+        self.timer.phase("media_attach")
+        is_video = mime_type(media_path).startswith("video/")
+        params = {"caption": text}
+        if is_video:
+            params.update(media_type="REELS", upload_type="resumable")
+        else:
+            params["image_url"] = self.public_url(media_path)
+        container = self.call("POST", f"/{self.user_id}/media", form=params).get('id')
+        if not container:
+            raise ApiError("Instagram didn't return a media container id")
+
+        if is_video:
+            size = os.path.getsize(media_path)
+            print(f"📤 Uploading {os.path.basename(media_path)} ({size / (1024 * 1024):.1f} MB) to Instagram...")
+            with open(media_path, 'rb') as file: # streamed, never read into memory as a whole
+                request("POST", f"{self.upload_url}/{container}", data=file,
+                        headers={"Authorization": f"OAuth {self.token}", "offset": "0", "file_size": str(size),
+                                 "Content-Length": str(size), "Content-Type": "application/octet-stream"})
+
+        # The container is processed in the background; it can only be published once it's FINISHED.
+        self.timer.phase("upload_wait")
+        print("⏳ Waiting for Instagram to process the media...")
+
+        def check():
+            status = self.call("GET", f"/{container}?fields=status_code,status")
+            code = status.get('status_code')
+            if code in ("ERROR", "EXPIRED"):
+                raise ApiError(f"Instagram couldn't process the media: {status.get('status') or code}", permanent=(code == "ERROR"))
+            return code in ("FINISHED", "PUBLISHED"), None
+
+        wait_until(check, "Instagram media processing")
+
+        self.timer.phase("submit")
+        print("🚀 Publishing...")
+        return self.call("POST", f"/{self.user_id}/media_publish", form={"creation_id": container}).get('id')
+
+
+class TikTokApiPoster(ApiPoster):
+    display_name = "TikTok"
+    default_api_url = TIKTOK_API_URL
+
+    def call(self, method, path, **kwargs):
+        result = super().call(method, path, **kwargs)
+        error = result.get('error') or {}
+        if error.get('code') not in (None, "ok"):
+            raise ApiError(f"TikTok: {error.get('message') or error.get('code')}")
+        return result.get('data') or {}
+
+    def publish(self, text, media_path):
+        if not media_path or not mime_type(media_path).startswith("video/"):
+            raise ApiError("TikTok's API posts need a video file", permanent=True)
+
+        self.timer.phase("media_attach")
+        size = os.path.getsize(media_path)
+        chunk_size = size if size <= TIKTOK_SINGLE_CHUNK_MAX else TIKTOK_CHUNK_BYTES
+        ranges = chunk_ranges(size, chunk_size, merge_tail=True)
+        post_info = {"title": text, "privacy_level": self.credentials.get('privacy_level', "SELF_ONLY")}
+        for option in ("disable_comment", "disable_duet", "disable_stitch"):
+            if option in self.credentials:
+                post_info[option] = bool(self.credentials[option])
+        init = self.call("POST", "/v2/post/publish/video/init/", json_body={
+            "post_info": post_info,
+            "source_info": {"source": "FILE_UPLOAD", "video_size": size, "chunk_size": chunk_size,
+                            "total_chunk_count": len(ranges)},
+        })
+        publish_id, upload_url = init.get('publish_id'), init.get('upload_url')
+        if not publish_id or not upload_url:
+            raise ApiError(f"TikTok didn't return an upload slot: {init}")
+
+        print(f"📤 Uploading {os.path.basename(media_path)} ({size / (1024 * 1024):.1f} MB) to TikTok in {len(ranges)} chunk(s)...")
+        for first, last in ranges:
+            request("PUT", upload_url, data=read_range(media_path, first, last),
+                    headers={"Content-Type": mime_type(media_path), "Content-Range": f"bytes {first}-{last}/{size}"})
+
+        # TikTok processes and publishes by itself; we just watch until it's done.
+        self.timer.phase("confirmation")
+        print("⏳ Waiting for TikTok to publish...")
+
+        def check():
+            status = self.call("POST", "/v2/post/publish/status/fetch/", json_body={"publish_id": publish_id})
+            if status.get('status') == "FAILED":
+                raise ApiError(f"TikTok couldn't publish the video: {status.get('fail_reason') or 'no reason given'}")
+            return status.get('status') in ("PUBLISH_COMPLETE", "SEND_TO_USER_INBOX"), None
+
+        wait_until(check, "TikTok publishing")
+        return publish_id
+
+
+API_POSTERS = {'x': XApiPoster, 'ig': IGApiPoster, 'tiktok': TikTokApiPoster}
+
+
+# ==========================================
+# 🔑 PICKING THE API PER ACCOUNT
+# ==========================================
+def load_credentials(platform, username):
+    """This account's API credentials for the platform, or None (= post with the browser)."""
+    path = os.path.join(os.getcwd(), "Profiles", username, CREDENTIALS_FILE)
+    if not API_POSTING or platform not in API_POSTERS or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            entry = json.load(file).get(platform)
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"⚠️ Couldn't read {path}: {e}. Using the browser.")
+        return None
+    if not isinstance(entry, dict) or entry.get('enabled') is False or not entry.get('access_token'):
+        return None
+    return entry
+
+
+def load_api_poster(platform, username, timer=None):
+    """An API poster for this account + platform, or None when it should go through the browser."""
+    credentials = load_credentials(platform, username)
+    if credentials is None:
+        return None
+    return API_POSTERS[platform](credentials, timer=timer)
@@ -0,0 +1,333 @@
+"""
+SHADOW POSTER - API STUB SERVER
+A local stand-in for the X, Instagram Graph and TikTok Content Posting APIs, so the API
+posters (api_posters.py) can be exercised without credentials, quotas or a live account.
+It checks what the real APIs would reject (missing token, bytes that don't add up, publishing
+before processing is done), and media 'processes' for a few status checks so the polling runs too.
+
+    python api_stub_server.py                  (serves on 127.0.0.1:8766)
+    python api_stub_server.py --rehearse       (posts through every API poster once, exit 1 on failure)
+
+To point a real run at it, put the URLs it prints into Profiles/<user>/api_credentials.json
+("api_url" / "upload_url"), with any non-empty "access_token".
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+DEFAULT_PORT = 8766
+PROCESSING_POLLS = 2 # status checks a video needs before it counts as processed
+
+
+class StubState:
+    """Everything the fake platforms remember, guarded by one lock (the server is threaded)."""
+
+    def __init__(self, processing_polls=PROCESSING_POLLS):
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1000)
+        self.processing_polls = processing_polls
+        self.media = {}      # id -> {'total', 'received', 'polls', 'needs_processing', 'finalized'}
+        self.posts = []      # (platform, text, media id) of everything 'published'
+
+    def new_id(self):
+        return str(next(self.ids))
+
+    def processed(self, item):
+        """One more status check on `item`; True once it's done 'processing'."""
+        item['polls'] += 1
+        return not item['needs_processing'] or item['polls'] > self.processing_polls
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _send(self, status, payload=None):
+        body = json.dumps(payload if payload is not None else {}).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        # Read in chunks so a big upload never sits in memory twice.
+        remaining, parts = int(self.headers.get("Content-Length") or 0), []
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            parts.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(parts)
+
+    def _json(self, body):
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            return {}
+
+    def _form(self, body):
+        return {key: values[0] for key, values in parse_qs(body.decode('utf-8')).items()}
+
+    def _authorized(self):
+        auth = self.headers.get("Authorization") or ""
+        if auth.split(" ", 1)[-1].strip() and auth.startswith(("Bearer ", "OAuth ")):
+            return True
+        self._send(401, {"error": {"message": "Invalid or missing access token", "code": 190}})
+        return False
+
+    def do_GET(self):
+        self._route("GET", b"")
+
+    def do_POST(self):
+        self._route("POST", self._body())
+
+    def do_PUT(self):
+        self._route("PUT", self._body())
+
+    def _route(self, method, body):
+        parts = urlsplit(self.path)
+        path, query = parts.path, {key: values[0] for key, values in parse_qs(parts.query).items()}
+        site, _, rest = path.lstrip("/").partition("/")
+        handler = getattr(self, f"_{site.replace('-', '_')}", None)
+        if handler is None:
+            self._send(404, {"error": {"message": f"no such API: {path}"}})
+            return
+        if site != "tiktok-upload" and not self._authorized():
+            return
+        with self.state.lock:
+            handler(method, rest, query, body)
+
+    # ==========================================
+    # 🐦 X API v2
+    # ==========================================
+    def _x(self, method, rest, query, body):
+        media = self.state.media
+        if method == "POST" and rest == "2/media/upload/initialize":
+            request = self._json(body)
+            media_id = self.state.new_id()
+            media[media_id] = {'total': int(request.get('total_bytes') or 0), 'received': 0, 'polls': 0,
+                               'needs_processing': request.get('media_category') != "tweet_image", 'finalized': False}
+            self._send(200, {"data": {"id": media_id, "expires_after_secs": 86400}})
+            return
+        match = re.fullmatch(r"2/media/upload/(\w+)/(append|finalize)", rest)
+        if method == "POST" and match:
+            item = media.get(match.group(1))
+            if item is None:
+                self._send(400, {"errors": [{"message": "unknown media id"}]})
+            elif match.group(2) == "append":
+                # The file part is whatever sits between the part headers and the closing boundary.
+                boundary = self.headers.get("Content-Type", "").split("boundary=")[-1].encode()
+                marker = b'name="media"'
+                start = body.find(b"\r\n\r\n", body.find(marker)) + 4
+                end = body.rfind(b"\r\n--" + boundary)
+                item['received'] += max(0, end - start) if body.find(marker) >= 0 else 0
+                self._send(200, {})
+            elif item['received'] != item['total']:
+                self._send(400, {"errors": [{"message": f"got {item['received']} of {item['total']} bytes"}]})
+            else:
+                item['finalized'] = True
+                info = {"state": "pending", "check_after_secs": 1} if item['needs_processing'] else None
+                self._send(200, {"data": {"id": match.group(1), "processing_info": info} if info else {"id": match.group(1)}})
+            return
+        if method == "GET" and rest == "2/media/upload" and query.get('command') == "STATUS":
+            item = media.get(query.get('media_id'))
+            if item is None:
+                self._send(400, {"errors": [{"message": "unknown media id"}]})
+                return
+            state = "succeeded" if self.state.processed(item) else "in_progress"
+            self._send(200, {"data": {"processing_info": {"state": state, "check_after_secs": 1}}})
+            return
+        if method == "POST" and rest == "2/tweets":
+            request = self._json(body)
+            ids = request.get('media', {}).get('media_ids', [])
+            for media_id in ids:
+                item = media.get(media_id)
+                if not item or not item['finalized'] or (item['needs_processing'] and item['polls'] <= self.state.processing_polls):
+                    self._send(400, {"errors": [{"message": f"media {media_id} is not ready"}]})
+                    return
+            self.state.posts.append(('x', request.get('text'), ids[0] if ids else None))
+            self._send(201, {"data": {"id": self.state.new_id(), "text": request.get('text')}})
+            return
+        self._send(404, {"errors": [{"message": f"no such endpoint: {rest}"}]})
+
+    # ==========================================
+    # 📸 INSTAGRAM GRAPH API
+    # ==========================================
+    def _ig(self, method, rest, query, body):
+        media = self.state.media
+        match = re.fullmatch(r"(\w+)/(media|media_publish)", rest)
+        if method == "POST" and match and match.group(2) == "media":
+            form = self._form(body)
+            container = self.state.new_id()
+            video = form.get('upload_type') == "resumable"
+            if not video and not form.get('image_url'):
+                self._send(400, {"error": {"message": "image_url is required"}})
+                return
+            media[container] = {'total': None, 'received': 0, 'polls': 0, 'needs_processing': video,
+                                'finalized': not video, 'caption': form.get('caption')}
+            self._send(200, {"id": container})
+        elif method == "POST" and match:
+            item = media.get(self._form(body).get('creation_id'))
+            if not item or item.get('status') != "FINISHED":
+                self._send(400, {"error": {"message": "Media ID is not available"}})
+                return
+            self.state.posts.append(('ig', item['caption'], self._form(body).get('creation_id')))
+            self._send(200, {"id": self.state.new_id()})
+        elif method == "GET" and rest in media:
+            item = media[rest]
+            done = item['finalized'] and self.state.processed(item)
+            item['status'] = "FINISHED" if done else "IN_PROGRESS"
+            self._send(200, {"status_code": item['status'], "id": rest})
+        else:
+            self._send(404, {"error": {"message": f"no such endpoint: {rest}"}})
+
+    def _ig_upload(self, method, rest, query, body):
+        item = self.state.media.get(rest)
+        size = int(self.headers.get("file_size") or -1)
+        if method != "POST" or item is None:
+            self._send(404, {"error": {"message": "unknown container"}})
+        elif len(body) != size or self.headers.get("offset") != "0":
+            self._send(400, {"error": {"message": f"got {len(body)} bytes, file_size says {size}"}})
+        else:
+            item['finalized'] = True
+            self._send(200, {"success": True})
+
+    # ==========================================
+    # 🎵 TIKTOK CONTENT POSTING API
+    # ==========================================
+    def _tiktok(self, method, rest, query, body):
+        media = self.state.media
+        request = self._json(body)
+        if method == "POST" and rest == "v2/post/publish/video/init/":
+            source = request.get('source_info', {})
+            size, chunk, count = (int(source.get(key) or 0) for key in ("video_size", "chunk_size", "total_chunk_count"))
+            if not size or not chunk or count != max(1, size // chunk):
+                self._send(400, {"error": {"code": "invalid_params", "message": "chunk_size / total_chunk_count don't match video_size"}})
+                return
+            publish_id = f"v_pub_{self.state.new_id()}"
+            media[publish_id] = {'total': size, 'received': 0, 'polls': 0, 'needs_processing': True, 'finalized': False,
+                                 'caption': request.get('post_info', {}).get('title')}
+            host = self.headers.get("Host")
+            self._send(200, {"data": {"publish_id": publish_id, "upload_url": f"http://{host}/tiktok-upload/{publish_id}"},
+                             "error": {"code": "ok", "message": ""}})
+        elif method == "POST" and rest == "v2/post/publish/status/fetch/":
+            item = media.get(request.get('publish_id'))
+            if item is None:
+                self._send(400, {"error": {"code": "invalid_publish_id", "message": "unknown publish_id"}})
+                return
+            if not item['finalized']:
+                status = "PROCESSING_UPLOAD"
+            elif self.state.processed(item):
+                status = "PUBLISH_COMPLETE"
+                if not item.get('published'):
+                    item['published'] = True
+                    self.state.posts.append(('tiktok', item['caption'], request.get('publish_id')))
+            else:
+                status = "PROCESSING_UPLOAD"
+            self._send(200, {"data": {"status": status}, "error": {"code": "ok", "message": ""}})
+        else:
+            self._send(404, {"error": {"code": "not_found", "message": f"no such endpoint: {rest}"}})
+
+    def _tiktok_upload(self, method, rest, query, body):
+        item = self.state.media.get(rest)
+        match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+)", self.headers.get("Content-Range") or "")
+        if method != "PUT" or item is None or not match:
+            self._send(400, {"error": {"code": "invalid_upload", "message": "bad upload request"}})
+            return
+        first, last, total = (int(n) for n in match.groups())
+        if first != item['received'] or last - first + 1 != len(body) or total != item['total']:
+            self._send(416, {"error": {"code": "range_mismatch", "message": "Content-Range doesn't match the upload"}})
+            return
+        item['received'] += len(body)
+        item['finalized'] = item['received'] == item['total']
+        self._send(201 if item['finalized'] else 206, {})
+
+
+def start(port=0, processing_polls=PROCESSING_POLLS, verbose=False):
+    """Starts the stub on a background thread. port=0 picks a free port. Returns the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(processing_polls)
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def credentials_for(server, platform):
+    """api_credentials.json entry that points a poster at this stub."""
+    root = f"http://127.0.0.1:{server.server_address[1]}"
+    entry = {"access_token": "stub-token", "api_url": f"{root}/{platform}"}
+    if platform == 'ig':
+        entry.update(ig_user_id="17841400000000000", upload_url=f"{root}/ig-upload", media_base_url=f"{root}/public")
+    return entry
+
+
+def rehearse(server):
+    """Posts through every API poster once (image + video where the platform takes both). Returns True if all worked."""
+    import api_posters
+    from timing import JobTimer
+
+    workdir = tempfile.mkdtemp(prefix="shadow_api_")
+    image = os.path.join(workdir, "rehearsal.jpg")
+    video = os.path.join(workdir, "rehearsal.mp4")
+    with open(image, 'wb') as file:
+        file.write(os.urandom(300 * 1024))
+    with open(video, 'wb') as file:
+        file.write(os.urandom(9 * 1024 * 1024 + 123)) # several X chunks, an odd tail
+
+    cases = [('x', None), ('x', image), ('x', video), ('ig', image), ('ig', video), ('tiktok', video)]
+    all_ok = True
+    for platform, media in cases:
+        timer = JobTimer()
+        poster = api_posters.API_POSTERS[platform](credentials_for(server, platform), timer=timer)
+        began = time.perf_counter()
+        ok = poster.create_post(f"Rehearsal via the {platform} API #shadowposter", media)
+        timer.finish(ok)
+        label = f"{platform} + {os.path.basename(media) if media else 'text only'}"
+        print(f"{'✅' if ok else '❌'} {label:<26} {time.perf_counter() - began:6.2f}s  {poster.last_error or ''}")
+        all_ok = all_ok and ok
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the X / Instagram / TikTok posting APIs")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--processing-polls", type=int, default=PROCESSING_POLLS, help="status checks before media is 'processed'")
+    parser.add_argument("--rehearse", action="store_true", help="post through every API poster once, then exit")
+    args = parser.parse_args()
+
+    if args.rehearse:
+        server = start(0, args.processing_polls)
+        ok = rehearse(server)
+        server.shutdown()
+        sys.exit(0 if ok else 1)
+
+    server = start(args.port, args.processing_polls, verbose=True)
+    print(f"🧪 API stub served on http://127.0.0.1:{server.server_address[1]}")
+    for platform in ('x', 'ig', 'tiktok'):
+        print(f"   {platform:<7} {json.dumps(credentials_for(server, platform))}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
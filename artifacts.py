@@ -0,0 +1,287 @@
+"""
+SHADOW POSTER - FAILURE ARTIFACTS
+Every job that fails (or that a poster flags as suspicious) gets its own evidence bundle
+instead of overwriting logs/failed_x_post.png for the hundredth time:
+
+    logs/artifacts/job42_tiktok_20260501-183000.zip
+        failed_tiktok_post.png    screenshot at the moment things went wrong
+        failed_tiktok_post.html   the page's DOM (plus every iframe's) at that moment
+        console.log               the page's console messages and JS errors during the job
+        trace.zip                 Playwright trace (only with SHADOW_TRACE=1; open with `playwright show-trace`)
+        meta.json                 job id, platform, user, error, URL, time
+
+Bundles are zipped in the background so the next job isn't kept waiting, and the queue row's
+'artifact_path' column points at the job's latest bundle. Old bundles are deleted automatically:
+anything older than SHADOW_ARTIFACT_DAYS (14), then the oldest ones until the folder is under
+SHADOW_ARTIFACT_MAX_MB (500).
+
+    python artifacts.py list
+    python artifacts.py show 42          (where job #42's evidence is)
+    python artifacts.py prune            (apply the retention policy now)
+"""
+
+import argparse
+import collections
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+ARTIFACTS_DIR = os.path.join(os.getcwd(), "logs", "artifacts")
+TRACE_ENABLED = os.environ.get("SHADOW_TRACE", "0") == "1"
+MAX_AGE_DAYS = float(os.environ.get("SHADOW_ARTIFACT_DAYS", "14"))
+MAX_TOTAL_MB = float(os.environ.get("SHADOW_ARTIFACT_MAX_MB", "500"))
+CONSOLE_MAX_LINES = 2000
+STALE_FOLDER_SECONDS = 3600 # a bundle folder nobody finished within an hour is from a crashed run
+
+# One background worker: bundles are zipped in order and never compete with each other for disk.
+# Not a daemon, so a CLI run waits for the last zip before exiting instead of leaving half a file.
+_compressor = ThreadPoolExecutor(max_workers=1)
+_open_bundles = set()
+_lock = threading.Lock()
+
+
+class JobArtifacts:
+    """
+    Collects one job's evidence. start() before create_post(), capture() whenever something
+    looks wrong, finish() at the end: it returns where the bundle will be (or None if the job
+    went fine and nothing was captured, in which case nothing is kept).
+    """
+
+    def __init__(self, page, job_id=None, platform=None, username=None):
+        self.page = page
+        self.job_id = job_id
+        self.platform = platform
+        self.username = username
+        prefix = f"job{job_id}" if job_id is not None else "adhoc"
+        self.name = f"{prefix}_{platform or 'unknown'}_{time.strftime('%Y%m%d-%H%M%S')}"
+        self.path = os.path.join(ARTIFACTS_DIR, self.name)
+        self.captures = []
+        self.console = collections.deque(maxlen=CONSOLE_MAX_LINES)
+        self.tracing = False
+        self.listening = False
+
+    # ==========================================
+    # 🎬 RECORDING
+    # ==========================================
+    def _on_console(self, message):
+        self.console.append(f"{time.strftime('%H:%M:%S')} [{message.type}] {message.text}")
+
+    def _on_page_error(self, error):
+        self.console.append(f"{time.strftime('%H:%M:%S')} [pageerror] {error}")
+
+    def start(self):
+        self.page.on("console", self._on_console)
+        self.page.on("pageerror", self._on_page_error)
+        self.listening = True
+        if TRACE_ENABLED:
+            try:
+                self.page.context.tracing.start(screenshots=True, snapshots=True, sources=False)
+                self.tracing = True
+            except Exception as e:
+                print(f"⚠️ Couldn't start the Playwright trace: {e}")
+        return self
+
+    def _folder(self):
+        with _lock:
+            if self.path not in _open_bundles:
+                # Two failures of the same job in the same second would otherwise share a folder.
+                base, n = self.path, 1
+                while os.path.exists(self.path) or os.path.exists(self.path + ".zip"):
+                    n += 1
+                    self.path = f"{base}-{n}"
+                self.name = os.path.basename(self.path)
+                os.makedirs(self.path, exist_ok=True)
+                _open_bundles.add(self.path)
+        return self.path
+
+    def capture(self, label):
+        """Screenshot + DOM of the page right now, saved as <label>.png / <label>.html. Never raises."""
+        folder = self._folder()
+        self.captures.append(label)
+        try:
+            self.page.screenshot(path=os.path.join(folder, f"{label}.png"), full_page=True)
+        except Exception as e:
+            print(f"⚠️ Couldn't take the screenshot: {e}")
+        try:
+            parts = [self.page.content()]
+            for frame in self.page.frames[1:]:
+                # TikTok's upload form lives in an iframe; the top document alone wouldn't show it.
+                try:
+                    parts.append(f"\n<!-- ===== iframe: {frame.url} ===== -->\n{frame.content()}")
+                except Exception:
+                    pass
+            with open(os.path.join(folder, f"{label}.html"), 'w', encoding='utf-8') as file:
+                file.write("".join(parts))
+        except Exception as e:
+            print(f"⚠️ Couldn't save the page's DOM: {e}")
+        return folder
+
+    # ==========================================
+    # 📦 FINISHING THE BUNDLE
+    # ==========================================
+    def _stop_recording(self, keep):
+        if self.listening:
+            self.listening = False
+            for event, handler in (("console", self._on_console), ("pageerror", self._on_page_error)):
+                try:
+                    self.page.remove_listener(event, handler)
+                except Exception:
+                    pass
+        if self.tracing:
+            self.tracing = False
+            try:
+                if keep:
+                    self.page.context.tracing.stop(path=os.path.join(self._folder(), "trace.zip"))
+                else:
+                    self.page.context.tracing.stop()
+            except Exception as e:
+                print(f"⚠️ Couldn't save the Playwright trace: {e}")
+
+    def finish(self, success, error=None):
+        """Writes the console log + meta and queues the zip. Returns the bundle's .zip path, or None."""
+        keep = not success or bool(self.captures)
+        self._stop_recording(keep)
+        if not keep:
+            return None
+        if not self.captures:
+            self.capture("final_state") # the poster gave up without taking a picture
+        folder = self._folder()
+        try:
+            with open(os.path.join(folder, "console.log"), 'w', encoding='utf-8') as file:
+                file.write("\n".join(self.console) + ("\n" if self.console else ""))
+            try:
+                url = self.page.url
+            except Exception:
+                url = None
+            meta = {"job_id": self.job_id, "platform": self.platform, "username": self.username,
+                    "success": bool(success), "error": error, "url": url, "captures": self.captures,
+                    "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+            with open(os.path.join(folder, "meta.json"), 'w', encoding='utf-8') as file:
+                json.dump(meta, file, indent=2, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠️ Couldn't finish the artifact bundle: {e}")
+        _compressor.submit(_compress_and_sweep, folder)
+        print(f"🗃️ Evidence saved to {os.path.relpath(folder)}.zip")
+        return os.path.relpath(folder + ".zip")
+
+
+# ==========================================
+# 🗜️ BACKGROUND: ZIP + RETENTION
+# ==========================================
+def compress(folder):
+    """folder -> folder.zip (written to a temp name first, so a half-written zip is never left behind)."""
+    tmp_path = folder + ".zip.tmp"
+    with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                archive.write(path, os.path.relpath(path, folder))
+    os.replace(tmp_path, folder + ".zip")
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+def _compress_and_sweep(folder):
+    try:
+        compress(folder)
+    except Exception as e:
+        print(f"⚠️ Couldn't zip {folder}: {e}")
+    finally:
+        with _lock:
+            _open_bundles.discard(folder)
+    enforce_retention()
+
+
+def list_bundles():
+    """[(path, size in bytes, mtime)] oldest first. Unzipped folders (from a crash) count too."""
+    bundles = []
+    if not os.path.isdir(ARTIFACTS_DIR):
+        return bundles
+    for entry in os.scandir(ARTIFACTS_DIR):
+        if entry.name.endswith(".tmp"):
+            continue
+        if entry.is_dir():
+            size = sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(entry.path) for name in files)
+        else:
+            size = entry.stat().st_size
+        bundles.append((entry.path, size, entry.stat().st_mtime))
+    return sorted(bundles, key=lambda bundle: bundle[2])
+
+
+def _delete(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def enforce_retention(max_age_days=MAX_AGE_DAYS, max_total_mb=MAX_TOTAL_MB):
+    """Deletes bundles past the age limit, then the oldest until the total fits. Returns how many went."""
+    now = time.time()
+    with _lock:
+        busy = set(_open_bundles)
+    removed = 0
+    kept = []
+    for path, size, mtime in list_bundles():
+        if path in busy:
+            continue
+        if max_age_days and now - mtime > max_age_days * 86400:
+            _delete(path)
+            removed += 1
+            continue
+        if os.path.isdir(path) and now - mtime > STALE_FOLDER_SECONDS:
+            try:
+                compress(path) # left behind by a run that died before zipping it
+                path, size = path + ".zip", os.path.getsize(path + ".zip")
+            except Exception:
+                pass
+        kept.append((path, size))
+    total = sum(size for _, size in kept)
+    limit = max_total_mb * 1024 * 1024
+    for path, size in kept:
+        if not max_total_mb or total <= limit:
+            break
+        _delete(path)
+        total -= size
+        removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-job failure evidence (screenshots, DOM, console, traces)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="every bundle, oldest first")
+    show_parser = sub.add_parser("show", help="the bundles for one job id")
+    show_parser.add_argument("job_id")
+    sub.add_parser("prune", help="apply the retention policy now")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        bundles = list_bundles()
+        for path, size, mtime in bundles:
+            print(f"   {time.strftime('%Y-%m-%d %H:%M', time.localtime(mtime))}  {size / 1024:>9,.0f} KB  {os.path.relpath(path)}")
+        print(f"🗃️ {len(bundles)} bundle(s), {sum(b[1] for b in bundles) / (1024 * 1024):,.1f} MB "
+              f"(limits: {MAX_AGE_DAYS:g} days, {MAX_TOTAL_MB:g} MB).")
+    elif args.command == "show":
+        from content_manager import ContentManager
+        row = ContentManager().get_post(args.job_id)
+        if row and row.get('artifact_path'):
+            print(f"🔗 Queue row #{args.job_id} points at {row['artifact_path']}")
+        matches = [path for path, _, _ in list_bundles() if os.path.basename(path).startswith(f"job{args.job_id}_")]
+        for path in matches:
+            print(f"   {os.path.relpath(path)}")
+        if not matches:
+            print(f"📭 No evidence bundles for job #{args.job_id}.")
+    else:
+        print(f"🧹 Removed {enforce_retention()} bundle(s).")
@@ -0,0 +1,304 @@
+"""
+SHADOW POSTER - QUEUE BENCHMARK
+Numbers before and after any queue change. Generates synthetic content.csv files
+(1k / 100k / 1M rows by default) with realistic rows: emoji, commas and quotes inside
+captions, a mix of statuses, platforms and accounts. Then for each queue backend it times:
+
+  get_next_post_head   get_next_post(platform, user) whose first match is near the top
+  get_next_post_tail   ...whose first match is near the bottom (worst case for a scan)
+  mark_complete        mark_post_as_complete() on rows near the bottom
+  drain                iter_pending() + mark_post_as_complete() for each job (a 'Post All' run)
+
+Each result has the median/min time and the peak Python memory (tracemalloc) of the operation.
+
+    python bench_content_manager.py                               (1k,100k,1M x csv,sqlite)
+    python bench_content_manager.py --sizes 1k,100k --backends sqlite
+    python bench_content_manager.py --json bench/queue.json       (save a baseline)
+    python bench_content_manager.py --compare bench/queue.json    (exit 1 if >25% slower)
+
+Generated files are kept in bench/data/ so reruns don't pay for generating them again.
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform as host_platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from content_manager import ContentManager
+from queue_backend import FIELDNAMES
+
+DATA_DIR = os.path.join(os.getcwd(), "bench", "data")
+QUEUE_FILES = {'csv': ["content.csv", "content.csv.journal"], 'sqlite': ["content.db", "content.db-wal", "content.db-shm"]}
+
+# The two accounts the lookups search for. Each owns exactly one pending TikTok row,
+# placed 1% and 99% of the way down the file.
+HEAD_USER, TAIL_USER = "bench_head", "bench_tail"
+
+# ==========================================
+# 🧪 SYNTHETIC QUEUE
+# ==========================================
+CAPTION_PARTS = [
+    "New drop is live 🔥", "Link in bio, go go go 🚀", "Behind the scenes, part 2 🎬",
+    'She said "ship it", so we did 😅', "Monday, Tuesday, every day ☕", "Thread 🧵 below",
+    "Tag a friend who needs this 👇", "Sale ends tonight, 50% off 💸", "#automation #growth #marketing",
+    "We hit 10k, thank you ❤️", "Can you guess the location? 🌍", "Rate this 1-10, honestly",
+]
+STATUS_WEIGHTS = [("pending", 60), ("completed", 25), ("failed", 10), ("paused", 5)]
+MEDIA = ["media/sample.mp4", "media/placeholder.jpg", ""]
+
+
+def parse_size(text):
+    """'1k' -> 1000, '1M' -> 1000000."""
+    text = text.strip()
+    multiplier = {'k': 1000, 'K': 1000, 'm': 1000000, 'M': 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if multiplier > 1 else text) * multiplier)
+
+
+def generate_csv(path, rows, seed=42):
+    """Writes a content.csv with `rows` rows. Streams, so 1M rows never sit in memory."""
+    rng = random.Random(seed)
+    statuses = [status for status, weight in STATUS_WEIGHTS for _ in range(weight)]
+    users = [f"user_{i:02d}" for i in range(50)]
+    head_at, tail_at = max(1, rows // 100), max(2, rows - rows // 100)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDNAMES)
+        for i in range(1, rows + 1):
+            caption = " ".join(rng.sample(CAPTION_PARTS, rng.randint(1, 4)))
+            if i in (head_at, tail_at):
+                writer.writerow([i, "tiktok", HEAD_USER if i == head_at else TAIL_USER, caption, MEDIA[0], "pending"])
+            else:
+                platform = rng.choice(("x", "ig", "tiktok"))
+                # A blank username means 'any account', which would satisfy the lookups early,
+                # so those only show up on X / IG rows.
+                user = "" if platform != "tiktok" and rng.random() < 0.1 else rng.choice(users)
+                writer.writerow([i, platform, user, caption, rng.choice(MEDIA), rng.choice(statuses)])
+    os.replace(path + ".tmp", path)
+
+
+def dataset(rows, seed):
+    path = os.path.join(DATA_DIR, f"content_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        print(f"🧪 Generating {rows:,} rows -> {path}")
+        began = time.perf_counter()
+        generate_csv(path, rows, seed)
+        print(f"   done in {time.perf_counter() - began:.1f}s")
+    return path
+
+
+# ==========================================
+# ⏱️ MEASURING
+# ==========================================
+@contextlib.contextmanager
+def quiet():
+    """The ContentManager prints a line per update; a million of those would drown the results."""
+    with open(os.devnull, 'w', encoding='utf-8') as sink, contextlib.redirect_stdout(sink):
+        yield
+
+
+@contextlib.contextmanager
+def working_dir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+class Workspace:
+    """A scratch folder with one backend's queue in it, restorable to its pristine state between operations."""
+
+    def __init__(self, backend, source_csv):
+        self.backend = backend
+        self.dir = tempfile.mkdtemp(prefix=f"shadow_queue_{backend}_")
+        self.pristine = os.path.join(self.dir, "pristine")
+        os.makedirs(self.pristine)
+        shutil.copyfile(source_csv, os.path.join(self.dir, "content.csv"))
+        with working_dir(self.dir), quiet():
+            began = time.perf_counter()
+            ContentManager(backend)  # sqlite: imports content.csv on first use
+            self.setup_seconds = time.perf_counter() - began
+        for name in QUEUE_FILES[backend]:
+            if os.path.exists(os.path.join(self.dir, name)):
+                shutil.copyfile(os.path.join(self.dir, name), os.path.join(self.pristine, name))
+
+    def reset(self):
+        for name in QUEUE_FILES[self.backend]:
+            target = os.path.join(self.dir, name)
+            if os.path.exists(target):
+                os.remove(target)
+            if os.path.exists(os.path.join(self.pristine, name)):
+                shutil.copyfile(os.path.join(self.pristine, name), target)
+
+    def cleanup(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def measure(workspace, operation, repeat, memory=True):
+    """
+    Times `operation(cm)` `repeat` times on a fresh copy of the queue, then once more under
+    tracemalloc for the peak (traced separately, because tracing slows Python down a lot).
+    """
+    timings = []
+    with working_dir(workspace.dir), quiet():
+        for _ in range(repeat):
+            workspace.reset()
+            cm = ContentManager(workspace.backend)
+            began = time.perf_counter()
+            count = operation(cm)
+            timings.append(time.perf_counter() - began)
+        peak = None
+        if memory:
+            workspace.reset()
+            cm = ContentManager(workspace.backend)
+            tracemalloc.start()
+            operation(cm)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    result = {"median_s": round(statistics.median(timings), 6), "min_s": round(min(timings), 6), "runs": repeat}
+    if count is not None:
+        result["items"] = count
+    if peak is not None:
+        result["peak_mb"] = round(peak / (1024 * 1024), 3)
+    return result
+
+
+def tail_ids(csv_path, how_many):
+    """Ids of the last few pending rows (the slowest ones to find and rewrite)."""
+    ids = []
+    with open(csv_path, 'r', encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file):
+            if row['status'] == 'pending':
+                ids.append(row['id'])
+                ids = ids[-how_many:]
+    return ids
+
+
+def benchmark(rows, backend, source_csv, repeat, drain_limit, memory):
+    workspace = Workspace(backend, source_csv)
+    ids = tail_ids(source_csv, 5)
+
+    def get_head(cm):
+        assert cm.get_next_post("tiktok", HEAD_USER) is not None
+
+    def get_tail(cm):
+        assert cm.get_next_post("tiktok", TAIL_USER) is not None
+
+    def mark(cm):
+        for post_id in ids:
+            cm.mark_post_as_complete(post_id)
+        return len(ids)
+
+    def drain(cm):
+        posted = 0
+        for job in cm.iter_pending():
+            cm.mark_post_as_complete(job['id'])
+            posted += 1
+            if drain_limit and posted >= drain_limit:
+                break
+        return posted
+
+    try:
+        results = {"setup": {"median_s": round(workspace.setup_seconds, 6), "min_s": round(workspace.setup_seconds, 6), "runs": 1}}
+        for name, operation, runs in (("get_next_post_head", get_head, repeat), ("get_next_post_tail", get_tail, repeat),
+                                      ("mark_complete", mark, repeat), ("drain", drain, 1)):
+            print(f"   {backend:<6} {rows:>9,} rows  {name}...", flush=True)
+            results[name] = measure(workspace, operation, runs, memory)
+        return results
+    finally:
+        workspace.cleanup()
+
+
+# ==========================================
+# 📊 REPORTING
+# ==========================================
+def flatten(report):
+    """{'csv/1000/drain': {...}} - the shape --compare works on."""
+    return {f"{backend}/{rows}/{name}": result
+            for backend, sizes in report["results"].items()
+            for rows, operations in sizes.items()
+            for name, result in operations.items()}
+
+
+def print_table(report, baseline=None, tolerance=0.25):
+    current = flatten(report)
+    old = flatten(baseline) if baseline else {}
+    regressions = []
+    print(f"\n📊 {'BACKEND/ROWS/OPERATION':<38} {'MEDIAN':>11} {'MIN':>11} {'PEAK MB':>9}" + ("   VS BASELINE" if baseline else ""))
+    for key, result in current.items():
+        peak = f"{result['peak_mb']:.2f}" if 'peak_mb' in result else "-"
+        line = f"   {key:<38} {result['median_s'] * 1000:>9.2f}ms {result['min_s'] * 1000:>9.2f}ms {peak:>9}"
+        before = old.get(key)
+        if before and before['median_s'] > 0:
+            ratio = result['median_s'] / before['median_s']
+            flag = ""
+            # Sub-millisecond operations are all noise; only flag what's big enough to matter.
+            if ratio > 1 + tolerance and result['median_s'] > 0.001:
+                flag = "  🐢"
+                regressions.append(f"{key}: {before['median_s'] * 1000:.2f}ms -> {result['median_s'] * 1000:.2f}ms")
+            elif ratio < 1 - tolerance:
+                flag = "  🚀"
+            line += f"   x{ratio:.2f}{flag}"
+        print(line)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the posting queue at scale")
+    parser.add_argument("--sizes", default="1k,100k,1M", help="comma separated row counts (default 1k,100k,1M)")
+    parser.add_argument("--backends", default="csv,sqlite", help="comma separated (default csv,sqlite)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per operation (median is reported)")
+    parser.add_argument("--drain-limit", type=int, default=1000,
+                        help="stop a drain after this many jobs (0 = the whole queue; slow on CSV at 100k+)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    parser.add_argument("--compare", default=None, help="baseline JSON from an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    report = {
+        "meta": {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "repeat": args.repeat, "drain_limit": args.drain_limit,
+                 "seed": args.seed, "python": sys.version.split()[0], "machine": host_platform.platform()},
+        "results": {backend: {} for backend in backends},
+    }
+    for rows in sizes:
+        source_csv = dataset(rows, args.seed)
+        for backend in backends:
+            report["results"][backend][str(rows)] = benchmark(rows, backend, source_csv, args.repeat,
+                                                              args.drain_limit, not args.no_memory)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+    regressions = print_table(report, baseline, args.tolerance)
+    if baseline:
+        print("\n✅ Nothing got slower than the baseline." if not regressions else "\n🐢 Slower than the baseline:")
+        for line in regressions:
+            print(f"   {line}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    sys.exit(1 if regressions else 0)
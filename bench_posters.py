@@ -0,0 +1,175 @@
+"""
+SHADOW POSTER - OFFLINE POSTER BENCHMARK
+Runs the real XPoster / IGPoster / TikTokPoster create_post() flows end-to-end against
+fixture_server.py in a throwaway headless Chromium, with the human pacing turned down
+(to zero by default). Nothing touches a live site or a saved profile.
+
+It answers two questions without waiting for production to fail:
+  - do the selectors still line up with the flows? (pass/fail per scenario)
+  - did a change make any phase slower? (p50 per phase, optionally against a saved baseline)
+
+    python bench_posters.py                                  (every scenario, 3 runs each)
+    python bench_posters.py --scenario tiktok-iframe --runs 5
+    python bench_posters.py --json bench/posters.json        (save the results)
+    python bench_posters.py --compare bench/posters.json     (exit 1 if a phase got >25% slower)
+
+Exit code is non-zero if any run failed or a regression was found, so CI can gate on it.
+"""
+
+import argparse
+import json
+import os
+import platform as host_platform
+import sys
+import tempfile
+import time
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from playwright.sync_api import sync_playwright
+from human import Human
+from artifacts import JobArtifacts
+from timing import JobTimer, percentile
+import fixture_server
+import locators
+import main
+
+# scenario -> (platform code, fixture site, media file)
+SCENARIOS = {
+    'x': ('x', 'x', "media/placeholder.jpg"),
+    'ig': ('ig', 'ig', "media/placeholder.jpg"),
+    'tiktok': ('tiktok', 'tiktok', "media/sample.mp4"),
+    'tiktok-iframe': ('tiktok', 'tiktok-iframe', "media/sample.mp4"),
+}
+CAPTION = "Offline benchmark caption #shadowposter"
+
+
+def run_scenario(browser, server, name, runs, speed):
+    platform, site, media = SCENARIOS[name]
+    PosterClass, _, display_name = main.load_poster(platform, "bench")
+    media_path = os.path.join(os.getcwd(), media)
+    results = []
+    for run in range(1, runs + 1):
+        print(f"\n>>> {name} run {run}/{runs} ({display_name} fixture)")
+        # A fresh context per run, like a new job: no cookies or cached pages carried over.
+        context = browser.new_context()
+        page = context.new_page()
+        timer = JobTimer()
+        # A failed run keeps its screenshot / DOM / console in logs/artifacts/, so a broken selector is easy to see.
+        bundle = JobArtifacts(page, job_id=f"bench-{name}-{run}", platform=platform, username="bench").start()
+        poster = PosterClass(page, Human(page, speed=speed), timer=timer, base_url=fixture_server.base_url(server, site),
+                             artifacts=bundle)
+        began = time.perf_counter()
+        try:
+            success = poster.create_post(text=CAPTION, media_path=media_path)
+        except Exception as e:
+            success, poster.last_error = False, f"Browser error: {e}"
+        finally:
+            artifact_path = bundle.finish(success, poster.last_error)
+            context.close()
+        timer.finish(success)
+        results.append({
+            "run": run,
+            "success": bool(success),
+            "error": None if success else poster.last_error,
+            "artifact_path": artifact_path,
+            "total": round(time.perf_counter() - began, 3),
+            "phases": timer.totals(),
+        })
+    return results
+
+
+def summarize(results):
+    phases = {}
+    for result in results:
+        for phase, duration in result["phases"].items():
+            phases.setdefault(phase, []).append(duration)
+    return {
+        "runs": len(results),
+        "passed": sum(1 for r in results if r["success"]),
+        "total_p50": percentile([r["total"] for r in results], 50),
+        "phases_p50": {phase: percentile(values, 50) for phase, values in phases.items()},
+        "errors": sorted({r["error"] for r in results if r["error"]}),
+    }
+
+
+def compare(summary, baseline, tolerance, min_seconds=0.25):
+    """Lists the phases that got more than `tolerance` slower. Tiny phases are ignored (pure noise)."""
+    regressions = []
+    for name, current in summary.items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        pairs = [("total", old["summary"]["total_p50"], current["total_p50"])]
+        pairs += [(phase, old["summary"]["phases_p50"].get(phase), value) for phase, value in current["phases_p50"].items()]
+        for phase, before, after in pairs:
+            if before is None or max(before, after) < min_seconds:
+                continue
+            if after > before * (1 + tolerance):
+                regressions.append(f"{name} {phase}: {before:.2f}s -> {after:.2f}s")
+    return regressions
+
+
+def print_summary(summary):
+    print(f"\n📊 {'SCENARIO':<14} {'PASS':>7} {'P50':>8}  PHASES (p50)")
+    for name, stats in summary.items():
+        phases = "  ".join(f"{phase}={value:.2f}" for phase, value in stats["phases_p50"].items())
+        print(f"   {name:<14} {stats['passed']:>3}/{stats['runs']:<3} {stats['total_p50']:>7.2f}s  {phases}")
+        for error in stats["errors"]:
+            print(f"      ❌ {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the posters end-to-end against the offline fixtures")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append", help="repeatable (default: all)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--speed", type=float, default=0, help="human pacing multiplier (default 0 = no delays)")
+    parser.add_argument("--upload-delay", type=float, default=fixture_server.UPLOAD_DELAY)
+    parser.add_argument("--headed", action="store_true", help="show the browser")
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    parser.add_argument("--compare", default=None, help="baseline JSON from an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    # Keep what the posters learn about the fixtures out of the real cache/locators.json.
+    scratch = tempfile.mkdtemp(prefix="shadow_bench_")
+    locators.use_cache(os.path.join(scratch, "locators.json"))
+    server = fixture_server.start(upload_delay=args.upload_delay)
+
+    scenarios = args.scenario or list(SCENARIOS)
+    report = {
+        "meta": {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "runs": args.runs, "speed": args.speed,
+                 "python": sys.version.split()[0], "machine": host_platform.platform()},
+        "scenarios": {},
+    }
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=not args.headed)
+        try:
+            for name in scenarios:
+                results = run_scenario(browser, server, name, args.runs, args.speed)
+                report["scenarios"][name] = {"summary": summarize(results), "results": results}
+        finally:
+            browser.close()
+    server.shutdown()
+
+    summary = {name: data["summary"] for name, data in report["scenarios"].items()}
+    print_summary(summary)
+    failed = any(stats["passed"] < stats["runs"] for stats in summary.values())
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            regressions = compare(summary, json.load(file), args.tolerance)
+        print("\n✅ No phase regressed against the baseline." if not regressions else "\n🐢 Slower than the baseline:")
+        for line in regressions:
+            print(f"   {line}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    sys.exit(1 if failed or regressions else 0)
@@ -0,0 +1,109 @@
+"""
+SHADOW POSTER - START-UP BENCHMARK
+How long the UI and the CLI take before they can do anything useful, measured in fresh
+Python processes (exactly what a user pays on every launch / button click):
+
+  python_baseline      an empty interpreter, for reference
+  ui_import            import ui (should NOT load Playwright any more)
+  ui_window            build and draw the control panel (skipped without a display)
+  cli_import           import main (Playwright is only loaded when a browser is needed)
+  playwright_import    import playwright.sync_api
+  playwright_driver    import + start + stop the Playwright driver (a local run pays this per job)
+  service_roundtrip    a ping to the poster service (what a job costs to hand over; needs it running)
+
+    python bench_startup.py
+    python bench_startup.py --runs 10 --json bench/startup.json
+    python bench_startup.py --compare bench/startup.json
+"""
+
+import argparse
+import json
+import os
+import platform as host_platform
+import statistics
+import subprocess
+import sys
+import time
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+import poster_service
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> python source run with -c in a fresh interpreter
+PROBES = {
+    'python_baseline': "pass",
+    'ui_import': "import ui",
+    'ui_window': ("import sys, tkinter as tk, ui\n"
+                  "root = tk.Tk(); ui.ShadowPosterUI(root); root.update()\n"
+                  "sys.stdout = sys.__stdout__; root.destroy()"),
+    'cli_import': "import main",
+    'playwright_import': "import playwright.sync_api",
+    'playwright_driver': "from playwright.sync_api import sync_playwright\nsync_playwright().start().stop()",
+    'service_roundtrip': "import poster_service, sys\nsys.exit(0 if poster_service.ping() else 3)",
+}
+
+
+def time_probe(source, runs):
+    """Median / min wall time of `python -c source`. Returns None if the probe can't run here."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [HERE, os.environ.get("PYTHONPATH")])))
+    timings = []
+    for _ in range(runs):
+        began = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", source], cwd=os.getcwd(), env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors='replace')
+        elapsed = time.perf_counter() - began
+        if result.returncode != 0:
+            last_line = (result.stderr.strip().splitlines() or [f"exit code {result.returncode}"])[-1]
+            return None, last_line
+        timings.append(elapsed)
+    return {"median_s": round(statistics.median(timings), 4), "min_s": round(min(timings), 4), "runs": runs}, None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure UI / CLI start-up time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--probe", choices=sorted(PROBES), action="append", help="repeatable (default: all)")
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    parser.add_argument("--compare", default=None, help="baseline JSON from an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file).get("results", {})
+
+    report = {"meta": {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "runs": args.runs,
+                       "python": sys.version.split()[0], "machine": host_platform.platform(),
+                       "service_running": poster_service.ping() is not None},
+              "results": {}}
+    regressions = []
+    print(f"⏱️ {'PROBE':<20} {'MEDIAN':>10} {'MIN':>10}" + ("   VS BASELINE" if baseline else ""))
+    for name in args.probe or list(PROBES):
+        result, problem = time_probe(PROBES[name], args.runs)
+        if result is None:
+            print(f"   {name:<20} {'skipped':>10}   ({problem})")
+            continue
+        report["results"][name] = result
+        line = f"   {name:<20} {result['median_s'] * 1000:>8.0f}ms {result['min_s'] * 1000:>8.0f}ms"
+        before = baseline.get(name)
+        if before:
+            ratio = result['median_s'] / before['median_s']
+            line += f"   x{ratio:.2f}"
+            if ratio > 1 + args.tolerance:
+                line += "  🐢"
+                regressions.append(name)
+        print(line)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"💾 Results written to {args.json}")
+    if regressions:
+        print(f"🐢 Slower than the baseline: {', '.join(regressions)}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,215 @@
+"""
+SHADOW POSTER - CAPTION RULES
+Checks a caption against the platform's rules BEFORE anybody types it: a caption that is
+too long used to be discovered only after Human.human_type had spent half a minute typing
+it letter by letter into the composer.
+
+Each platform counts differently, and the numbers live in caption_rules.json (edit that
+file when a platform changes its limits, no code change needed):
+  - X counts "weighted" characters: Latin text counts 1, CJK and most other scripts 2,
+    every emoji (even a multi-person family) 2, and every link 23 however long it is.
+  - Instagram counts plain characters and also caps hashtags (30) and @mentions (20).
+  - TikTok counts plain characters.
+
+The importer rejects bad rows when they are imported, and main.py checks again right before
+a job is posted (the row may have been hand-edited since).
+
+    python caption_rules.py                       (check every pending row in the queue)
+    python caption_rules.py --platform x "Some caption to measure 🚀 https://example.com"
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import unicodedata
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+RULES_PATH = os.environ.get("SHADOW_CAPTION_RULES") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "caption_rules.json")
+
+HASHTAG_PATTERN = re.compile(r"(?<![\w&#])#(\w+)")
+MENTION_PATTERN = re.compile(r"(?<![\w@])@(\w[\w.]*)")
+
+# Code points that stick to the emoji in front of them and never count on their own:
+# variation selector 16, zero-width joiner, skin tones, the keycap mark and flag tag letters.
+VARIATION_SELECTOR = 0xFE0F
+ZERO_WIDTH_JOINER = 0x200D
+SKIN_TONES = range(0x1F3FB, 0x1F400)
+KEYCAP = 0x20E3
+TAGS = range(0xE0020, 0xE0080)
+REGIONAL_INDICATORS = range(0x1F1E6, 0x1F200)
+
+_cache = {"mtime": None, "rules": None}
+
+
+def _parse_range(text):
+    start, _, end = text.partition("-")
+    return int(start, 16), int(end or start, 16)
+
+
+def load_rules(path=None):
+    """
+    The rules file, parsed. Re-read whenever it changes, so a running service picks edits up.
+    A missing file means no rules ({}); that is cached too, so the warning shows once, not per job.
+    """
+    path = path or RULES_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    if _cache["mtime"] == (path, mtime):
+        return _cache["rules"]
+    if mtime is None:
+        print(f"⚠️ {path} is missing. Captions aren't checked.")
+        rules = {}
+    else:
+        with open(path, 'r', encoding='utf-8') as file:
+            raw = json.load(file)
+        rules = {key: value for key, value in raw.items() if not key.startswith("_")}
+        rules["emoji_ranges"] = [_parse_range(text) for text in raw.get("emoji_ranges", [])]
+        for platform_rules in rules.values():
+            if isinstance(platform_rules, dict):
+                platform_rules["weighted_ranges"] = [(*_parse_range(entry["range"]), entry["weight"])
+                                                     for entry in platform_rules.get("weighted_ranges", [])]
+        tlds = "|".join(sorted(map(re.escape, raw.get("url_tlds", [])), key=len, reverse=True)) or "com"
+        rules["url_pattern"] = re.compile(
+            r"(?:https?://|www\.)[^\s]+|(?<![\w@.])(?:[a-z0-9-]+\.)+(?:" + tlds + r")(?![\w-])(?:/[^\s]*)?",
+            re.IGNORECASE)
+    _cache.update(mtime=(path, mtime), rules=rules)
+    return rules
+
+
+# ==========================================
+# 🧮 COUNTING
+# ==========================================
+def _in_ranges(code, ranges):
+    return any(start <= code <= end for start, end in ranges)
+
+
+def _emoji_end(text, i, emoji_ranges):
+    """If an emoji starts at text[i], the index just past it (the whole ZWJ sequence). Otherwise None."""
+    code = ord(text[i])
+    following = ord(text[i + 1]) if i + 1 < len(text) else None
+    if code in REGIONAL_INDICATORS:
+        # A flag is two regional indicators; a lone one still shows as an emoji letter.
+        end = i + 2 if following in REGIONAL_INDICATORS else i + 1
+    elif _in_ranges(code, emoji_ranges):
+        end = i + 1
+    elif following == VARIATION_SELECTOR or following == KEYCAP:
+        end = i + 1  # 1️⃣ / #️⃣ keycaps, ©️ ❤️ and friends when asked to draw as emoji
+    else:
+        return None
+    while end < len(text):
+        code = ord(text[end])
+        if code == VARIATION_SELECTOR or code == KEYCAP or code in SKIN_TONES or code in TAGS:
+            end += 1
+        elif code == ZERO_WIDTH_JOINER and end + 1 < len(text):
+            end += 2  # 👩‍👩‍👧 is one emoji: ZWJ glues the next one on
+        else:
+            break
+    return end
+
+
+def weighted_length(text, rules, platform_rules):
+    """X's count: every character by its weight, every emoji as one, every link as url_length."""
+    scale = platform_rules.get("scale", 100)
+    ranges = platform_rules["weighted_ranges"]
+    default_weight = platform_rules.get("default_weight", 200)
+    emoji_weight = platform_rules.get("emoji_weight", default_weight)
+    url_weight = platform_rules.get("url_length", 23) * scale
+
+    total, i = 0, 0
+    urls = [(match.start(), match.end()) for match in rules["url_pattern"].finditer(text)]
+    while i < len(text):
+        if urls and urls[0][0] == i:
+            total += url_weight
+            i = urls.pop(0)[1]
+            continue
+        end = _emoji_end(text, i, rules["emoji_ranges"])
+        if end is not None:
+            total += emoji_weight
+            i = end
+            continue
+        code = ord(text[i])
+        total += next((weight for start, stop, weight in ranges if start <= code <= stop), default_weight)
+        i += 1
+    return total / scale
+
+
+def measure(platform, caption, rules=None):
+    """{'length', 'hashtags', 'mentions'} of a caption, counted the platform's way. None for no rules."""
+    rules = rules if rules is not None else load_rules()
+    platform_rules = rules.get(platform)
+    if not isinstance(platform_rules, dict):
+        return None
+    text = unicodedata.normalize("NFC", caption or "")
+    if platform_rules.get("counting") == "weighted":
+        length = weighted_length(text, rules, platform_rules)
+    else:
+        length = len(text)
+    # Links like example.com/#top or someone@example.com aren't hashtags or mentions.
+    plain = rules["url_pattern"].sub(" ", text)
+    return {
+        "length": length,
+        "hashtags": len(HASHTAG_PATTERN.findall(plain)),
+        "mentions": len(MENTION_PATTERN.findall(plain)),
+    }
+
+
+def check_caption(platform, caption, rules=None):
+    """
+    Returns a list of (rule, detail) problems; empty if the caption is fine (or the platform has no rules).
+    rule is short and the same for every row ('caption too long'), detail is this caption's numbers.
+    """
+    rules = rules if rules is not None else load_rules()
+    counts = measure(platform, caption, rules)
+    if counts is None:
+        return []
+    platform_rules = rules[platform]
+    problems = []
+    max_length = platform_rules.get("max_length")
+    if max_length is not None and counts["length"] > max_length:
+        unit = "weighted characters" if platform_rules.get("counting") == "weighted" else "characters"
+        problems.append(("caption too long", f"{counts['length']:g} > {max_length} {unit}"))
+    for key, label in (("hashtags", "hashtags"), ("mentions", "@mentions")):
+        limit = platform_rules.get(f"max_{key}")
+        if limit is not None and counts[key] > limit:
+            problems.append((f"too many {label}", f"{counts[key]} > {limit}"))
+    return problems
+
+
+def describe(problems):
+    """'caption too long (291 > 280 weighted characters); too many hashtags (31 > 30)'"""
+    return "; ".join(f"{rule} ({detail})" for rule, detail in problems)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check captions against each platform's rules (caption_rules.json)")
+    parser.add_argument("caption", nargs="?", default=None, help="measure this caption instead of checking the queue")
+    parser.add_argument("--platform", choices=["ig", "tiktok", "x"], default=None, help="platform rules to use")
+    args = parser.parse_args()
+
+    if args.caption is not None:
+        for platform in [args.platform] if args.platform else ["x", "ig", "tiktok"]:
+            counts = measure(platform, args.caption)
+            problems = check_caption(platform, args.caption)
+            print(f"{'❌' if problems else '✅'} {platform:<7} length {counts['length']:g}, "
+                  f"{counts['hashtags']} hashtag(s), {counts['mentions']} mention(s)"
+                  + (f"  -> {describe(problems)}" if problems else ""))
+        sys.exit(0)
+
+    from content_manager import ContentManager
+    bad = 0
+    for row in ContentManager().iter_rows(['pending', 'paused']):
+        platform = (row.get('platform') or '').strip().lower()
+        if args.platform and platform != args.platform:
+            continue
+        problems = check_caption(platform, row.get('caption') or '')
+        if problems:
+            bad += 1
+            print(f"❌ #{row['id']} ({platform}): {describe(problems)}")
+    print(f"🏁 {bad} pending/paused post(s) have caption problems." if bad else "✅ Every pending/paused caption fits its platform.")
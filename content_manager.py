@@ -1,92 +1,287 @@
 """
 SHADOW POSTER - CONTENT MANAGER
-This module acts as the system's memory. It safely reads the content.csv file to find
-out what we need to post today, and updates the file when a post succeeds 
+This module acts as the system's memory. It safely reads the queue to find
+out what we need to post today, and updates it when a post succeeds
 so we don't accidentally spam the timeline with duplicates.
+
+The queue itself lives in a pluggable backend (see queue_backend.py):
+  - 'csv'    : content.csv is the queue (the default, edit it by hand like always).
+               Status changes land in content.csv.journal first and are folded in every few
+               minutes; run `python content_manager.py compact` before hand-editing to fold them now.
+  - 'sqlite' : content.db, indexed and transactional, for big queues and parallel runs
+Pick one with ContentManager(backend="sqlite") or the SHADOW_QUEUE_BACKEND environment variable.
 """
 
-import csv
+import argparse
 import os
+import sys
+
+from queue_backend import CSVQueueBackend, SQLiteQueueBackend, FIELDNAMES
+
+# ==========================================
+# 🔁 RETRY POLICY
+# ==========================================
+# A failed job is retried after 5 min, then 10, 20, ... (capped at 6 hours).
+# After MAX_ATTEMPTS failures it is parked as 'failed' so batch runs can't hot-loop on it.
+MAX_ATTEMPTS = int(os.environ.get("SHADOW_MAX_ATTEMPTS", "3"))
+BACKOFF_BASE_SECONDS = 300
+BACKOFF_MAX_SECONDS = 6 * 60 * 60
+
+def backoff_seconds(attempts):
+    return min(BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)), BACKOFF_MAX_SECONDS)
 
 class ContentManager:
-    def __init__(self):
+    def __init__(self, backend: str = None):
         # ==========================================
         # 📍 PHASE 1: LOCATING THE DATABASE
         # ==========================================
         # We look for 'content.csv' right in the main folder where you run main.py
         # Using os.getcwd() ensures it always finds it no matter where you launch the terminal from.
         self.csv_path = os.path.join(os.getcwd(), "content.csv")
+        self.db_path = os.path.join(os.getcwd(), "content.db")
+
+        backend = (backend or os.environ.get("SHADOW_QUEUE_BACKEND") or "csv").strip().lower()
+        if backend == "sqlite":
+            self.backend = SQLiteQueueBackend(self.db_path)
+            # First run on SQLite? Seed the database from the existing content.csv so nothing is lost.
+            if self.backend.count() == 0 and os.path.exists(self.csv_path):
+                CSVQueueBackend(self.csv_path).compact() # statuses still in the CSV journal come along too
+                imported = self.backend.import_csv(self.csv_path)
+                print(f"📥 Imported {imported} rows from content.csv into {self.db_path}.")
+        elif backend == "csv":
+            self.backend = CSVQueueBackend(self.csv_path)
+        else:
+            raise ValueError(f"Unknown queue backend '{backend}'. Use 'csv' or 'sqlite'.")
 
     def get_next_post(self, platform_name: str = None, username: str = None):
         """
-        Scans the CSV top-to-bottom for the first row that matches our platform 
+        Finds the first queued row that matches our platform
         (or any platform if None) AND has a status of 'pending'.
+        The highest 'priority' wins; among equals, queue order decides.
+        Jobs still waiting out a retry backoff are skipped.
         """
-        # Pre-flight check: Did we accidentally delete or rename the CSV?
-        if not os.path.exists(self.csv_path):
+        # Pre-flight check: Did we accidentally delete or rename the queue?
+        if not self.backend.exists():
             print(f"⚠️ Where is {self.csv_path}? I can't post without my instructions!")
             return None
 
         # ==========================================
         # 📖 PHASE 2: READING THE DATA
         # ==========================================
-        # We open the file in 'r' (read) mode with utf-8 encoding. 
-        # (UTF-8 is absolutely crucial here, otherwise any emojis in your marketing copy will crash the script).
-        with open(self.csv_path, mode='r', encoding='utf-8') as file:
-            
-            # DictReader is python magic. It maps your top row (id, platform, caption...) to dictionary keys.
-            reader = csv.DictReader(file)
-            for row in reader:
-                # We clean the text with .strip() and .lower() so a stray space like " Pending " 
-                # or a capital "X" doesn't break our strict logic.
-                status = row.get('status', '').strip().lower()
-                platform = row.get('platform', '').strip().lower()
-                row_user = row.get('username', '').strip()
-                
-                # If a username is specified and the CSV row has one, they must match.
-                # If the row has no username column or it's empty, it can be posted by any user.
-                if username and row_user and row_user != username:
-                    continue
-                
-                if status == 'pending' and (platform_name is None or platform == platform_name):
-                    # Boom. We found our target. Return this exact row as a dictionary.
-                    return row 
-                    
-        # If the loop finishes and we found nothing...
+        job = self.backend.get_next_post(platform_name, username)
+        if job:
+            # Boom. We found our target. Return this exact row as a dictionary.
+            return job
+
+        # If the search finishes and we found nothing...
         print(f"📭 No pending posts found for {platform_name}.")
         return None
 
+    def iter_pending(self, platform_name: str = None, username: str = None):
+        """
+        Yields every pending row for a batch run, highest priority first and then in queue order,
+        from a single pass over the queue (instead of calling get_next_post again after every job).
+        """
+        if not self.backend.exists():
+            print(f"⚠️ Where is {self.csv_path}? I can't post without my instructions!")
+            return
+        yield from self.backend.iter_pending(platform_name, username)
+
+    def get_post(self, post_id: str):
+        """Looks up one row by id (any status). Returns None if it doesn't exist."""
+        return self.backend.get_post(post_id)
+
+    def iter_rows(self, statuses=None):
+        """Every row in queue order, optionally only those whose status is in `statuses`."""
+        if not self.backend.exists():
+            return
+        yield from self.backend.iter_rows(statuses)
+
+    def pause_post(self, post_id: str):
+        """Takes a pending post out of rotation without losing it ('paused' is never picked up)."""
+        return self._switch_status(post_id, 'pending', 'paused')
+
+    def resume_post(self, post_id: str):
+        """Puts a paused post back into the queue."""
+        return self._switch_status(post_id, 'paused', 'pending')
+
+    def _switch_status(self, post_id, from_status, to_status):
+        row = self.get_post(post_id)
+        if not row:
+            print(f"⚠️ There is no post #{post_id} in the queue.")
+            return False
+        current = (row.get('status') or '').strip().lower()
+        if current != from_status:
+            print(f"⚠️ Post #{post_id} is '{current}', not '{from_status}'. Leaving it alone.")
+            return False
+        self.backend.update_status(post_id, to_status)
+        print(f"📝 Post #{post_id}: {from_status} -> {to_status}.")
+        return True
+
     def mark_post_as_complete(self, post_id: str):
         """
-        Once a post goes live on X or LinkedIn, we have to permanently change its 
-        status in the CSV from 'pending' to 'completed'. 
+        Once a post goes live on X, IG or TikTok, we have to permanently change its
+        status in the queue from 'pending' to 'completed'.
         """
-        rows = []
-        updated = False
-        
         # ==========================================
-        # 💾 PHASE 3: THE SAFE REWRITE
+        # 💾 PHASE 3: THE SAFE UPDATE
         # ==========================================
-        # Step A: Read everything into memory first. 
-        # (Never try to read and write to a CSV at the exact same time. It corrupts the file.)
-        with open(self.csv_path, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            fieldnames = reader.fieldnames # Save the column headers for later
-            for row in reader:
-                
-                # If this is the specific post we just uploaded...
-                if row.get('id') == str(post_id):
-                    row['status'] = 'completed' # Change the status!
-                    updated = True
-                    
-                # Keep a copy of every row (changed or unchanged) in our list
-                rows.append(row)
-                
-        # Step B: Overwrite the physical file with our updated list
-        if updated:
-            # 'w' mode deletes the old file contents and writes the fresh data
-            with open(self.csv_path, mode='w', encoding='utf-8', newline='') as file:
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()   # Put the column names back at the top
-                writer.writerows(rows) # Dump all our rows back in
-            print(f"📝 Marked post #{post_id} as completed in the database.")
\ No newline at end of file
+        if self.backend.update_status(post_id, 'completed'):
+            print(f"📝 Marked post #{post_id} as completed in the database.")
+
+    def mark_post_as_failed(self, post_id: str, error: str = None, permanent: bool = False, artifact_path: str = None):
+        """
+        Records a failed attempt: bumps 'attempts', saves the error and pushes the job's
+        'next_attempt_at' into the future (exponential backoff). Once it has failed
+        MAX_ATTEMPTS times the status flips to 'failed' and it leaves the queue for good.
+        permanent=True skips the retries (for problems a retry can't fix, like a bad video file).
+        artifact_path links the row to the failure's evidence bundle (see artifacts.py).
+        """
+        max_attempts = 1 if permanent else MAX_ATTEMPTS
+        extra = {'artifact_path': artifact_path} if artifact_path else None
+        fields = self.backend.record_failure(post_id, error or "unknown error", max_attempts, backoff_seconds, extra)
+        if not fields:
+            return None
+        if fields.get('status') == 'failed':
+            print(f"🪦 Post #{post_id} failed {fields['attempts']} times. Marked as 'failed' (requeue it by setting status back to 'pending').")
+        else:
+            print(f"🔁 Post #{post_id} failed (attempt {fields['attempts']}/{MAX_ATTEMPTS}). Retrying after {fields['next_attempt_at']}.")
+        return fields
+
+    def mark_needs_login(self, post_id: str, reason: str):
+        """
+        Parks a post whose account isn't logged in any more (see session_check.py) as 'needs_login'.
+        It doesn't count as a failed attempt: nothing was tried. requeue_needs_login() brings it back.
+        """
+        if self.backend.update_fields(post_id, {'status': 'needs_login', 'last_error': f"Needs login: {reason}"}):
+            print(f"🔑 Post #{post_id} is waiting for a fresh login ('needs_login').")
+
+    def mark_duplicate(self, post_id: str, reason: str):
+        """
+        Retires a post that would repeat one already live on the same account (see dedupe.py) as 'duplicate'.
+        Like mark_needs_login(), it isn't a failed attempt; nothing was posted.
+        """
+        if self.backend.update_fields(post_id, {'status': 'duplicate', 'last_error': reason}):
+            print(f"♻️ Post #{post_id} marked as 'duplicate'.")
+
+    def requeue_needs_login(self, platform_name: str = None, username: str = None):
+        """Puts 'needs_login' posts (for one platform / account, or all of them) back to 'pending'."""
+        post_ids = []
+        for row in self.iter_rows(['needs_login']):
+            row_user = (row.get('username') or '').strip()
+            if username and row_user and row_user != username:
+                continue
+            if platform_name and (row.get('platform') or '').strip().lower() != platform_name:
+                continue
+            post_ids.append(row['id'])
+        changed = self.backend.update_many(post_ids, {'status': 'pending', 'last_error': ''}, {'needs_login'}) if post_ids else 0
+        print(f"📝 Requeued {changed} post(s) that were waiting for a login.")
+        return changed
+
+    def next_id(self):
+        """The id the next new post should get."""
+        return self.backend.next_id()
+
+    def append_posts(self, rows, fieldnames=FIELDNAMES):
+        """
+        Adds a batch of new rows to the end of the queue, all-or-nothing, and gives them fresh ids
+        (any 'id' they carry is replaced). `rows` can be a generator, so huge batches never sit in memory.
+        Returns (first id, last id) of the new rows, or (None, None) if there were none.
+        """
+        return self.backend.append_rows(rows, list(fieldnames))
+
+    # ==========================================
+    # 🗂️ BROWSING & BULK ACTIONS (the UI's queue browser)
+    # ==========================================
+    def signature(self):
+        """A cheap 'did the queue change?' token (size + modification time of the queue files)."""
+        if isinstance(self.backend, SQLiteQueueBackend):
+            paths = [self.db_path, self.db_path + "-wal"]
+        else:
+            paths = [self.csv_path, self.backend.journal_path]
+        stamp = []
+        for path in paths:
+            try:
+                info = os.stat(path)
+                stamp.append((info.st_mtime_ns, info.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def count_by_status(self):
+        """{status: number of rows} for the whole queue."""
+        return self.backend.count_by_status() if self.backend.exists() else {}
+
+    def read_page(self, offset: int, limit: int, statuses=None):
+        """One page of rows in queue order, optionally only those whose status is in `statuses`."""
+        return self.backend.read_page(offset, limit, statuses) if self.backend.exists() else []
+
+    def requeue_failed(self, post_ids=None):
+        """Gives failed posts a fresh set of retries. post_ids=None requeues every failed post."""
+        if post_ids is None:
+            post_ids = [row['id'] for row in self.iter_rows(['failed'])]
+        changed = self.backend.update_many(post_ids, {'status': 'pending', 'attempts': '0', 'last_error': '', 'next_attempt_at': ''}, {'failed'})
+        print(f"📝 Requeued {changed} failed post(s).")
+        return changed
+
+    def cancel_posts(self, post_ids):
+        """'cancelled' is never picked up again. Only pending/paused posts can be cancelled."""
+        changed = self.backend.update_many(post_ids, {'status': 'cancelled'}, {'pending', 'paused'})
+        print(f"📝 Cancelled {changed} post(s).")
+        return changed
+
+    def reprioritize(self, post_ids, priority: int):
+        """Sets the priority of many posts at once (higher goes first among posts due at the same time)."""
+        changed = self.backend.update_many(post_ids, {'priority': str(int(priority))})
+        print(f"📝 Set priority {int(priority)} on {changed} post(s).")
+        return changed
+
+    # ==========================================
+    # 🔁 PHASE 4: MOVING BETWEEN CSV AND SQLITE
+    # ==========================================
+    def import_csv(self, csv_path: str = None):
+        """Copies content.csv (or any CSV in the same format) into the SQLite queue."""
+        if not isinstance(self.backend, SQLiteQueueBackend):
+            print("⚠️ Import only makes sense for the sqlite backend. The csv backend already reads content.csv.")
+            return 0
+        if not csv_path:
+            CSVQueueBackend(self.csv_path).compact()
+        count = self.backend.import_csv(csv_path or self.csv_path)
+        print(f"📥 Imported {count} rows into {self.db_path}.")
+        return count
+
+    def export_csv(self, csv_path: str = None):
+        """Dumps the SQLite queue back out to content.csv so you can eyeball or hand-edit it."""
+        if not isinstance(self.backend, SQLiteQueueBackend):
+            print("⚠️ Export only makes sense for the sqlite backend. content.csv is already the queue.")
+            return 0
+        count = self.backend.export_csv(csv_path or self.csv_path)
+        print(f"📤 Exported {count} rows to {csv_path or self.csv_path}.")
+        return count
+
+    def compact(self):
+        """Folds the CSV status journal into content.csv right now (do this before editing it by hand)."""
+        if not isinstance(self.backend, CSVQueueBackend):
+            print("⚠️ Compact only applies to the csv backend.")
+            return 0
+        changed = self.backend.compact()
+        print(f"🗜️ Folded the status journal into content.csv ({changed} row(s) updated).")
+        return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move the posting queue between content.csv and content.db")
+    parser.add_argument("action", choices=["import", "export", "compact"],
+                        help="import: CSV -> SQLite, export: SQLite -> CSV, compact: fold content.csv.journal into content.csv")
+    parser.add_argument("csv_path", nargs="?", default=None, help="CSV file to read/write (defaults to content.csv)")
+    args = parser.parse_args()
+
+    if args.action == "compact":
+        ContentManager(backend="csv").compact()
+        sys.exit(0)
+
+    cm = ContentManager(backend="sqlite")
+    if args.action == "import":
+        cm.import_csv(args.csv_path)
+    else:
+        cm.export_csv(args.csv_path)
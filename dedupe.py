@@ -0,0 +1,190 @@
+"""
+SHADOW POSTER - DUPLICATE GUARD
+Remembers every post that went live as a fingerprint of
+(platform, account, caption hash, media content hash) in dedupe.db.
+Before a browser is launched, main.py checks the job against that index, so the same
+multi-hundred-MB video with the same caption is never uploaded to the same account twice.
+
+Media is fingerprinted by CONTENT (see media_hash.py), so renaming or copying the file
+doesn't fool it. Captions are compared after collapsing whitespace.
+
+What happens to a duplicate is set by SHADOW_DUPLICATE_POLICY:
+  skip  (default) : mark the row 'duplicate' and don't post it
+  flag            : warn, but post it anyway
+  allow           : don't check at all
+
+    python dedupe.py report                 (duplicates across the whole queue)
+    python dedupe.py rebuild --user default (seed the index from rows already 'completed')
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from media_hash import file_sha256
+
+INDEX_PATH = os.path.join(os.getcwd(), "dedupe.db")
+POLICY = (os.environ.get("SHADOW_DUPLICATE_POLICY") or "skip").strip().lower()
+
+
+def caption_hash(caption):
+    normalized = " ".join((caption or "").split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def media_hash_for(job):
+    """Content hash of the ORIGINAL media named in the row ('' for text-only posts or missing files)."""
+    raw = (job.get('image_path') or '').strip()
+    if not raw:
+        return ''
+    path = os.path.join(os.getcwd(), raw)
+    if not os.path.exists(path):
+        return ''
+    return file_sha256(path)
+
+
+def fingerprint(job, username):
+    platform = (job.get('platform') or '').strip().lower()
+    return platform, username, caption_hash(job.get('caption')), media_hash_for(job)
+
+
+class DedupeIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS posted (
+                    platform TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    caption_hash TEXT NOT NULL,
+                    media_hash TEXT NOT NULL,
+                    post_id TEXT NOT NULL,
+                    posted_at TEXT NOT NULL,
+                    PRIMARY KEY (platform, username, caption_hash, media_hash)
+                )
+                """
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def find(self, fp):
+        """Returns the id of the earlier post with this fingerprint, or None."""
+        conn = self._connect()
+        try:
+            record = conn.execute(
+                "SELECT post_id FROM posted WHERE platform = ? AND username = ? AND caption_hash = ? AND media_hash = ?",
+                fp,
+            ).fetchone()
+            return record[0] if record else None
+        finally:
+            conn.close()
+
+    def record(self, fp, post_id):
+        conn = self._connect()
+        try:
+            with conn:
+                # First post wins: re-recording the same fingerprint keeps the original post id.
+                conn.execute(
+                    "INSERT OR IGNORE INTO posted VALUES (?, ?, ?, ?, ?, ?)",
+                    tuple(fp) + (str(post_id), time.strftime("%Y-%m-%d %H:%M:%S")),
+                )
+        finally:
+            conn.close()
+
+    def count(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM posted").fetchone()[0]
+        finally:
+            conn.close()
+
+
+def check_job(job, username, cm, index=None):
+    """
+    Called by main.py before any browser work. Returns True if the job may be posted.
+    Duplicates are handled according to SHADOW_DUPLICATE_POLICY.
+    """
+    if POLICY == "allow":
+        return True
+    index = index or DedupeIndex()
+    original_id = index.find(fingerprint(job, username))
+    if original_id is None or original_id == str(job['id']):
+        return True
+
+    if POLICY == "flag":
+        print(f"⚠️ Job #{job['id']} looks like a duplicate of post #{original_id} on this account. Posting anyway (policy: flag).")
+        return True
+
+    print(f"♻️ Job #{job['id']} is a duplicate of post #{original_id} (same caption + same media, same account). Skipping.")
+    cm.mark_duplicate(job['id'], f"Duplicate of post #{original_id}")
+    return False
+
+
+def record_job(job, username, index=None):
+    """Called by main.py after a post goes live."""
+    (index or DedupeIndex()).record(fingerprint(job, username), job['id'])
+
+
+def report(cm, index):
+    """Prints every group of queue rows that would end up as the same post, plus pending rows already posted."""
+    groups = defaultdict(list)
+    for row in cm.iter_rows():
+        # Rows without a username are posted by the 'default' account unless a run says otherwise (same as main.py).
+        account = (row.get('username') or '').strip() or 'default'
+        groups[fingerprint(row, account)].append(row)
+
+    found = 0
+    for (platform, account, _, media), rows in groups.items():
+        if len(rows) > 1:
+            found += 1
+            ids = ", ".join(f"#{r['id']} ({(r.get('status') or '').strip()})" for r in rows)
+            print(f"♻️ {platform.upper()} / {account}: {len(rows)} identical rows -> {ids}")
+
+    for fp, rows in groups.items():
+        for row in rows:
+            if (row.get('status') or '').strip().lower() != 'pending':
+                continue
+            original_id = index.find(fp)
+            if original_id:
+                found += 1
+                print(f"♻️ Pending #{row['id']} was already posted as #{original_id} on {fp[0].upper()} / {fp[1]}")
+
+    if not found:
+        print("✅ No duplicates in the queue.")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find and prevent duplicate uploads")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("report", help="list duplicate rows across the whole queue")
+    rebuild_parser = sub.add_parser("rebuild", help="add every 'completed' row to the index")
+    rebuild_parser.add_argument("--user", default="default", help="the account those completed posts were made from")
+    args = parser.parse_args()
+
+    from content_manager import ContentManager
+    cm = ContentManager()
+    index = DedupeIndex()
+    if args.command == "report":
+        sys.exit(1 if report(cm, index) else 0)
+    else:
+        added = 0
+        for row in cm.iter_rows(['completed']):
+            row_user = (row.get('username') or '').strip() or args.user
+            index.record(fingerprint(row, row_user), row['id'])
+            added += 1
+        print(f"📚 Indexed {added} completed rows. The index now holds {index.count()} fingerprints.")
@@ -0,0 +1,112 @@
+"""
+SHADOW POSTER - FIXTURE SERVER
+A tiny local web server that serves hand-built copies of the X, Instagram and TikTok
+compose/upload flows from fixtures/. Point a poster at it and the whole create_post()
+sequence runs offline: no account, no rate limits, no risk.
+
+    python fixture_server.py                  (serves on 127.0.0.1:8765)
+
+Then in another terminal, for example:
+    set SHADOW_TIKTOK_BASE_URL=http://127.0.0.1:8765/tiktok-iframe
+    set SHADOW_HUMAN_SPEED=0
+
+Sites:  /x   /ig   /tiktok (form in the page)   /tiktok-iframe (form inside an iframe)
+Uploads (any POST) are read to the end and answered after UPLOAD_DELAY seconds.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DEFAULT_PORT = 8765
+UPLOAD_DELAY = 0.5 # pretend the platform needs a moment to take the file in
+
+# site -> {path under the site: fixture file}
+ROUTES = {
+    'x': {'home': "x_home.html", 'compose/tweet': "x_compose.html"},
+    'ig': {'': "ig_home.html"},
+    'tiktok': {'': "tiktok_home.html", 'creator-center/upload': "tiktok_upload.html"},
+    'tiktok-iframe': {
+        '': "tiktok_home.html",
+        'creator-center/upload': "tiktok_upload_iframe.html",
+        'creator-center/upload_frame': "tiktok_upload_frame.html",
+    },
+}
+CONTENT_TYPES = {'.html': "text/html; charset=utf-8", '.js': "application/javascript; charset=utf-8"}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type="text/plain; charset=utf-8"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        site, _, rest = self.path.split('?')[0].strip('/').partition('/')
+        name = ROUTES.get(site, {}).get(rest)
+        # Shared assets (e.g. tiktok_upload_form.js) are found by file name wherever a page asks for them.
+        if name is None and os.path.basename(rest) and os.path.splitext(rest)[1] in CONTENT_TYPES:
+            name = os.path.basename(rest)
+        path = os.path.join(FIXTURE_DIR, name) if name else None
+        if not path or not os.path.isfile(path):
+            self._send(404, b"no such fixture")
+            return
+        with open(path, 'rb') as file:
+            self._send(200, file.read(), CONTENT_TYPES.get(os.path.splitext(path)[1], "application/octet-stream"))
+
+    def do_POST(self):
+        # An 'upload': swallow the body in chunks (so big videos don't sit in memory) and say OK.
+        remaining = int(self.headers.get("Content-Length") or 0)
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        time.sleep(self.server.upload_delay)
+        self._send(200, b'{"ok": true}', "application/json")
+
+
+def start(port=0, upload_delay=UPLOAD_DELAY, verbose=False):
+    """Starts the server on a background thread. port=0 picks a free port. Returns the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+    server.daemon_threads = True
+    server.upload_delay = upload_delay
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server, site):
+    return f"http://127.0.0.1:{server.server_address[1]}/{site}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the offline X / IG / TikTok fixtures")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--upload-delay", type=float, default=UPLOAD_DELAY, help="seconds every upload takes")
+    args = parser.parse_args()
+
+    server = start(args.port, args.upload_delay, verbose=True)
+    print(f"🧪 Fixtures served on http://127.0.0.1:{server.server_address[1]}")
+    for site in ROUTES:
+        print(f"   {site:<14} {base_url(server, site)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
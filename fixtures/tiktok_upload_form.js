@@ -0,0 +1,30 @@
+// The TikTok upload form, shared by the direct-DOM page and the iframe variant.
+// `host` is the document that gets the 'Manage your posts' page after posting.
+function tiktokUploadForm(root, host) {
+  root.innerHTML =
+    '<input type="file" accept="video/*" id="picker">' +
+    '<div id="status"></div>' +
+    '<div class="public-DraftEditor-content" contenteditable="true" style="min-height: 60px"></div>' +
+    '<div style="height: 1500px"></div>' +
+    '<button data-e2e="post_video_button" disabled>Post</button>';
+  const status = root.querySelector('#status');
+  const post = root.querySelector('[data-e2e="post_video_button"]');
+
+  root.querySelector('#picker').addEventListener('change', async (event) => {
+    let percent = 0;
+    status.innerHTML = '<div role="progressbar" aria-valuenow="0"></div><span id="pct">0%</span>';
+    const ticker = setInterval(() => {
+      percent = Math.min(percent + 10, 90);
+      status.querySelector('[role="progressbar"]').setAttribute('aria-valuenow', percent);
+      status.querySelector('#pct').textContent = percent + '%';
+    }, 100);
+    const reply = await fetch('upload', {method: 'POST', body: event.target.files[0]});
+    clearInterval(ticker);
+    status.innerHTML = reply.ok ? '<span>Uploaded</span>' : '<span>Upload failed</span>';
+    post.disabled = !reply.ok;
+  });
+  post.addEventListener('click', () => {
+    // Like the real site, the 'page' changes a moment after the click (which also removes the iframe)
+    setTimeout(() => { host.body.innerHTML = '<h1>Manage your posts</h1>'; }, 200);
+  });
+}
@@ -5,14 +5,35 @@ JS event listeners to track mouse movements, scroll speeds, and keystroke interv
 This class injects chaos and imperfection into the bot to mimic a real person.
 """
 
+import os
 import time
 import random
 
+# Multiplies every human delay. 1 = normal, 0.1 = ten times faster, 0 = no delays at all
+# (only for offline rehearsals against fixture_server.py - never against the real sites!).
+HUMAN_SPEED = float(os.environ.get("SHADOW_HUMAN_SPEED", "1"))
+
 class Human:
-    def __init__(self, page):
+    def __init__(self, page, speed=None, guard=None):
         # We pass the active Playwright page into this class so the Human 
         # can take control of the mouse and keyboard on whatever tab is open.
         self.page = page
+        self.speed = HUMAN_SPEED if speed is None else speed
+        # Called during every pause; raising from it aborts the job (see resource_monitor.py).
+        self.guard = guard
+
+    def _pause(self, seconds):
+        """Every delay in here goes through this, so the speed setting (and the guard) apply everywhere."""
+        remaining = seconds * self.speed if self.speed > 0 else 0
+        while True:
+            if self.guard:
+                self.guard()
+            if remaining <= 0:
+                return
+            # Long pauses are sliced up so the guard still gets a say every second.
+            step = min(remaining, 1.0)
+            time.sleep(step)
+            remaining -= step
 
     def sleep(self, min_time=2, max_time=5):
         """
@@ -20,14 +41,15 @@ class Human:
         Instead of always waiting exactly 3.0 seconds (a massive red flag), 
         it waits 3.14 seconds, or 4.82 seconds, etc.
         """
-        time.sleep(random.uniform(min_time, max_time))
+        self._pause(random.uniform(min_time, max_time))
 
     def scroll_feed(self, duration_seconds=40):
         """
         Simulates a human doom-scrolling the timeline. 
         This is crucial for account health; bots just post and leave. Humans browse.
         """
-        print(f"🚶‍♂️ Simulating human scrolling for {duration_seconds} seconds...")
+        duration_seconds *= self.speed
+        print(f"🚶‍♂️ Simulating human scrolling for {duration_seconds:g} seconds...")
         end_time = time.time() + duration_seconds
         
         # ==========================================
@@ -41,14 +63,14 @@ class Human:
             # 2. Pause to "read" the post or look at an image
             read_time = random.uniform(1.5, 4.5)
             print(f"👀 Pausing to view post for {read_time:.1f}s...")
-            time.sleep(read_time)
+            self._pause(read_time)
             
             # 3. The "Wait, what was that?" maneuver
             # 30% chance to scroll back up slightly, like a real person re-reading 
             # something they just scrolled past. This destroys bot-detection algorithms.
             if random.random() > 0.7:
                 self.page.mouse.wheel(0, -random.randint(100, 400))
-                time.sleep(random.uniform(1.0, 2.0))
+                self._pause(random.uniform(1.0, 2.0))
 
     def human_type(self, selector, text):
         """
@@ -59,7 +81,13 @@ class Human:
         
         # Click the text box to focus it
         self.page.click(selector)
-        
+        self.type_keys(text)
+
+    def type_keys(self, text):
+        """
+        The keystrokes of human_type() without the click, for a box that already has focus
+        (e.g. one inside an iframe that a plain page selector can't reach).
+        """
         # ==========================================
         # ⌨️ THE CHAOTIC KEYBOARD
         # ==========================================
@@ -70,11 +98,11 @@ class Human:
             # 2. The Physical Delay
             # We sleep the thread between 0.05s (50ms) and 0.15s (150ms).
             # This perfectly mimics the physical travel time of a finger hitting keys.
-            time.sleep(random.uniform(0.05, 0.15))
+            self._pause(random.uniform(0.05, 0.15))
             
             # 3. The Cognitive Delay
             # If we hit a space or punctuation, there is a chance the "human" 
             # pauses to formulate their next thought.
             if char in [' ', '.', ',', '!', '?'] and random.random() > 0.8:
                 pause_time = random.uniform(0.3, 0.8)
-                time.sleep(pause_time)
\ No newline at end of file
+                self._pause(pause_time)
\ No newline at end of file
@@ -4,25 +4,50 @@ This script handles the physical interaction with Instagram.com.
 It actively mimics erratic human behavior to avoid detection.
 """
 
+import os
 import time
-from playwright.sync_api import Page
+from playwright.sync_api import Page, Error as PlaywrightError
+from timing import JobTimer
+from artifacts import JobArtifacts
+import locators
+from locators import TOP
+from upload_wait import UploadWatcher
+
+# Where the site lives. Point it at fixture_server.py to rehearse the whole flow offline.
+BASE_URL = os.environ.get("SHADOW_IG_BASE_URL", "https://www.instagram.com")
+
+# The Create button has looked different over the years. locators.py tries the last one that worked first.
+CREATE_BUTTON_STRATEGIES = [
+    (TOP, 'span:has-text("Create")', 3000),      # the standard Create text on the sidebar
+    (TOP, "svg[aria-label='New post']", 3000),   # the New Post SVG icon
+    (TOP, "text=Create", 3000),                  # just look for any matching element
+]
 
 class IGPoster:
-    def __init__(self, page: Page, human):
+    def __init__(self, page: Page, human, timer=None, base_url=None, artifacts=None):
         self.page = page
         self.human = human
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        # Phase stopwatch (see timing.py). main.py passes a real one; otherwise it's a throwaway.
+        self.timer = timer or JobTimer()
+        # Where failure screenshots / DOM snapshots go (see artifacts.py). main.py passes the job's bundle.
+        self.artifacts = artifacts or JobArtifacts(page, platform='instagram')
+        # Why the last create_post() failed. main.py stores it in the queue's 'last_error' column.
+        self.last_error = None
 
     def create_post(self, text: str, media_path: str = None) -> bool:
         if not media_path:
             print("❌ Instagram requires media (image or video) to post!")
+            self.last_error = "Instagram requires media (image or video) to post!"
             return False
 
         try:
             # ==========================================
             # 🏃‍♂️ PHASE 1: THE WARM UP
             # ==========================================
+            self.timer.phase("warmup")
             print("🏠 Navigating to Instagram feed for warm-up...")
-            self.page.goto("https://www.instagram.com/", wait_until="domcontentloaded")
+            self.page.goto(f"{self.base_url}/", wait_until="domcontentloaded")
             
             # Give React a second to render the actual feed
             self.human.sleep(2, 4) 
@@ -31,27 +56,10 @@ class IGPoster:
             # ==========================================
             # ✍️ PHASE 2: OPENING THE COMPOSER (MODAL)
             # ==========================================
+            self.timer.phase("navigation")
             # Click the Create button on the sidebar.
-            creation_clicked = False
-            
-            # Strategy 1: The standard Create text on the sidebar
-            try:
-                self.page.locator("span", has_text="Create").first.click(timeout=3000)
-                creation_clicked = True
-            except:
-                pass
-                
-            # Strategy 2: The New Post SVG icon
-            if not creation_clicked:
-                try:
-                    self.page.locator("svg[aria-label='New post']").first.click(timeout=3000)
-                    creation_clicked = True
-                except:
-                    pass
-
-            # Strategy 3: Just look for any matching element
-            if not creation_clicked:
-                self.page.click("text=Create", timeout=3000)
+            locators.resolve(self.page, 'ig', 'create_button', CREATE_BUTTON_STRATEGIES,
+                             lambda button, timeout: button.click(timeout=timeout))
                 
             self.human.sleep(2, 4)
             
@@ -59,23 +67,32 @@ class IGPoster:
             try:
                 self.page.locator("span", has_text="Post").first.click(timeout=3000)
                 self.human.sleep(1, 3)
-            except:
+            except PlaywrightError:
                 pass # The sub-menu didn't appear, that's fine.
 
             # ==========================================
             # 📎 PHASE 3: HANDLING MEDIA
             # ==========================================
+            self.timer.phase("media_attach")
             print(f"📎 Attaching media: {media_path}")
             # Find the hidden file input. It accepts images and videos.
             file_input = self.page.locator('input[type="file"]')
-            file_input.set_input_files(media_path)
+            upload = UploadWatcher(self.page, 'ig', media_path, guard=self.human.guard).start()
+            try:
+                file_input.set_input_files(media_path)
+            except Exception:
+                upload.stop()
+                raise
             
-            # Wait for the media to visually render in the crop modal 
-            self.human.sleep(3, 5) 
+            # Wait for the media to actually render in the crop modal (not a fixed few seconds)
+            self.timer.phase("upload_wait")
+            print(f"✅ Media loaded ({upload.wait()}).")
+            self.human.sleep(1, 2)
             
             # ==========================================
             # ➡️ PHASE 4: NAVIGATING THE MODAL STEPS
             # ==========================================
+            self.timer.phase("modal_steps")
             print("➡️ Clicking Next (Crop Step)...")
             self.page.click("text=Next")
             self.human.sleep(2, 3)
@@ -87,6 +104,7 @@ class IGPoster:
             # ==========================================
             # 🗣️ PHASE 5: TYPING THE CAPTION
             # ==========================================
+            self.timer.phase("caption")
             print("✍️ Typing caption...")
             # Instagram's caption box is a div acting as a textbox
             caption_box = self.page.locator('div[aria-label="Write a caption..."]')
@@ -95,7 +113,7 @@ class IGPoster:
             self.human.sleep(1, 2)
             try:
                 caption_box.click(timeout=3000)
-            except:
+            except PlaywrightError:
                 self.page.mouse.click(0,0) # fall back
 
             self.human.sleep(1, 2)
@@ -106,22 +124,24 @@ class IGPoster:
             # ==========================================
             # 🚀 PHASE 6: THE STEALTH POST METHOD
             # ==========================================
+            self.timer.phase("submit")
             print("🚀 Clicking Share...")
             self.page.click("text=Share")
             
             # ==========================================
             # 🕵️‍♂️ PHASE 7: VERIFICATION
             # ==========================================
+            self.timer.phase("confirmation")
             print("⏳ Waiting for upload to complete (Videos can take a while)...")
             try:
                 # Wait for the text confirmation "Your post has been shared."
                 self.page.wait_for_selector("text=Your post has been shared.", timeout=120000)
                 print("✅ Success confirmation detected!")
-            except:
+            except PlaywrightError:
                 print("⚠️ Could not detect success text, checking for modal closure...")
                 # It might have succeeded but we missed the success text, or it failed.
                 # Just take a screenshot to be safe.
-                self.page.screenshot(path="logs/possible_ig_post_issue.png")
+                self.artifacts.capture("possible_ig_post_issue")
                 # Alternatively, check if the "Share" button is still there. If it is, it failed.
                 if self.page.locator("text=Share").is_visible():
                      raise Exception("Share button is still visible! The post likely failed.")
@@ -131,26 +151,22 @@ class IGPoster:
             # Close the success modal (There's usually an X button)
             try:
                 self.page.click("svg[aria-label='Close']", timeout=3000)
-            except:
+            except PlaywrightError:
                 pass
 
             # ==========================================
             # 🧊 PHASE 8: THE COOL DOWN
             # ==========================================
+            self.timer.phase("cooldown")
             print("🧊 Cooling down session...")
             self.human.sleep(2, 4)
-            self.page.goto("https://www.instagram.com/", wait_until="domcontentloaded")
+            self.page.goto(f"{self.base_url}/", wait_until="domcontentloaded")
             self.human.scroll_feed(duration_seconds=20)
 
             return True
 
         except Exception as e:
             print(f"❌ Failed to post on Instagram: {e}")
-            import os
-            if not os.path.exists("logs"):
-                 os.makedirs("logs")
-            try:
-                self.page.screenshot(path="logs/failed_ig_post.png")
-            except:
-                pass
+            self.last_error = str(e)
+            self.artifacts.capture("failed_ig_post")
             return False
@@ -0,0 +1,257 @@
+"""
+SHADOW POSTER - BULK IMPORTER
+Adds a big batch of posts (tens of thousands of rows from another system) to the queue
+safely, instead of hand-pasting into content.csv.
+
+  - reads CSV or JSONL one row at a time, so the input can be any size
+  - checks every row: known platform, caption fits the platform's rules (caption_rules.py),
+    media present (and the right kind)
+  - looks up the media files with a thread pool (a slow network drive won't stall the import)
+  - gives the good rows fresh ids and appends them to the queue in ONE atomic step
+  - finishes with a summary of what was rejected and why (optionally a rejects file to fix and re-import)
+
+    python importer.py batch.csv
+    python importer.py batch.jsonl --user brand_account --rejects rejected.csv
+    python importer.py batch.csv --dry-run          (check only, add nothing)
+
+Input columns are the content.csv ones: platform, username, caption, image_path (or media_path),
+plus optional status (pending/paused), scheduled_at and priority. Any 'id' in the input is ignored.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+import caption_rules
+from content_manager import ContentManager
+from queue_backend import FIELDNAMES, SCHEDULE_FIELDNAMES, normalize_stamp
+
+# ==========================================
+# 📐 WHAT EACH PLATFORM ACCEPTS
+# ==========================================
+# Caption limits (length, hashtags, mentions) live in caption_rules.json.
+KNOWN_PLATFORMS = ('x', 'ig', 'tiktok')
+MEDIA_REQUIRED = {'ig', 'tiktok'}
+VIDEO_ONLY = {'tiktok'}
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.m4v', '.webm')
+PLATFORM_ALIASES = {'instagram': 'ig', 'twitter': 'x', 'tik tok': 'tiktok'}
+IMPORT_STATUSES = ('pending', 'paused')
+
+OUTPUT_FIELDS = FIELDNAMES + SCHEDULE_FIELDNAMES
+CHUNK_SIZE = 500 # rows validated together (and the most that are ever held in memory at once)
+
+
+class RowRejected(Exception):
+    """reason is what the summary groups on; detail is the row-specific part."""
+
+    def __init__(self, reason, detail=""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+        self.detail = detail
+
+
+def read_rows(path, fmt):
+    """Yields (line number, row dict or error text) without loading the file."""
+    file = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8-sig', newline='')
+    try:
+        if fmt == "jsonl":
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    yield line_number, "invalid JSON"
+                    continue
+                yield line_number, row if isinstance(row, dict) else "not a JSON object"
+        else:
+            reader = csv.DictReader(file)
+            for row in reader:
+                if None in row:
+                    yield reader.line_num, "too many columns (an unquoted comma in the caption?)"
+                elif None in row.values():
+                    yield reader.line_num, "too few columns"
+                else:
+                    yield reader.line_num, row
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+class Importer:
+    def __init__(self, cm, default_user="", workers=8):
+        self.cm = cm
+        self.default_user = default_user or ""
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.media_exists = {}  # relative path -> bool, so a video shared by 5,000 rows is checked once
+        self.accepted = 0
+        self.rejected = Counter()
+        self.examples = []      # a few (line, reason) pairs for the summary
+        self.rejects_writer = None
+
+    # ==========================================
+    # 🔎 VALIDATION
+    # ==========================================
+    def _check_media(self, paths):
+        """Stats the not-yet-seen media paths in parallel."""
+        new = [path for path in set(paths) if path and path not in self.media_exists]
+        for path, found in zip(new, self.pool.map(lambda p: os.path.isfile(os.path.join(os.getcwd(), p)), new)):
+            self.media_exists[path] = found
+
+    def clean(self, row):
+        """Returns the row as it will be queued, or raises RowRejected with the reason."""
+        def field(*names):
+            for name in names:
+                value = row.get(name)
+                if value is not None:
+                    return str(value)
+            return ""
+
+        platform = field('platform').strip().lower()
+        platform = PLATFORM_ALIASES.get(platform, platform)
+        if platform not in KNOWN_PLATFORMS:
+            raise RowRejected("unknown platform", f"'{platform}'") if platform else RowRejected("missing platform")
+
+        caption = field('caption')
+        media = field('image_path', 'media_path').strip()
+        if not caption.strip() and not media:
+            raise RowRejected("nothing to post", "no caption and no media")
+        problems = caption_rules.check_caption(platform, caption)
+        if problems:
+            rule, detail = problems[0]
+            others = caption_rules.describe(problems[1:])
+            raise RowRejected(f"{rule} for {platform}", detail + (f"; {others}" if others else ""))
+        if platform in MEDIA_REQUIRED and not media:
+            raise RowRejected(f"{platform} posts need media")
+        if media and platform in VIDEO_ONLY and not media.lower().endswith(VIDEO_EXTENSIONS):
+            raise RowRejected(f"{platform} needs a video", f"'{media}'")
+        if media and not self.media_exists.get(media):
+            raise RowRejected("media file not found", media)
+
+        status = field('status').strip().lower() or 'pending'
+        if status not in IMPORT_STATUSES:
+            raise RowRejected(f"status must be one of {', '.join(IMPORT_STATUSES)}", f"'{status}'")
+        try:
+            scheduled_at = normalize_stamp(field('scheduled_at'))
+        except ValueError as e:
+            raise RowRejected("unreadable scheduled_at", str(e))
+        priority = field('priority').strip()
+        if priority and not priority.lstrip('-').isdigit():
+            raise RowRejected("priority must be a whole number", f"'{priority}'")
+
+        return {
+            'platform': platform,
+            'username': field('username').strip() or self.default_user,
+            'caption': caption,
+            'image_path': media,
+            'status': status,
+            'scheduled_at': scheduled_at,
+            'priority': priority,
+        }
+
+    def reject(self, line_number, reason, detail="", row=None):
+        self.rejected[reason] += 1
+        message = f"{reason}: {detail}" if detail else reason
+        if len(self.examples) < 10:
+            self.examples.append((line_number, message))
+        if self.rejects_writer is not None:
+            row = row if isinstance(row, dict) else {}
+            self.rejects_writer.writerow({
+                'line': line_number, 'reason': message, 'platform': row.get('platform', ""),
+                'username': row.get('username', ""), 'caption': row.get('caption', ""),
+                'image_path': row.get('image_path') or row.get('media_path') or "",
+            })
+
+    def validated(self, rows):
+        """Streams the rows that pass, in input order. Works through the input CHUNK_SIZE rows at a time."""
+        chunk = []
+        for item in rows:
+            chunk.append(item)
+            if len(chunk) >= CHUNK_SIZE:
+                yield from self._validate_chunk(chunk)
+                chunk = []
+        yield from self._validate_chunk(chunk)
+
+    def _validate_chunk(self, chunk):
+        self._check_media(str(row.get('image_path') or row.get('media_path') or "").strip()
+                          for _, row in chunk if isinstance(row, dict))
+        for line_number, row in chunk:
+            if not isinstance(row, dict):
+                self.reject(line_number, row)
+                continue
+            try:
+                yield self.clean(row)
+            except RowRejected as e:
+                self.reject(line_number, e.reason, e.detail, row)
+
+    # ==========================================
+    # 📥 THE IMPORT
+    # ==========================================
+    def run(self, path, fmt, dry_run=False, rejects_path=None):
+        rejects_file = None
+        if rejects_path:
+            rejects_file = open(rejects_path, 'w', encoding='utf-8', newline='')
+            self.rejects_writer = csv.DictWriter(rejects_file, fieldnames=['line', 'reason', 'platform', 'username', 'caption', 'image_path'])
+            self.rejects_writer.writeheader()
+        try:
+            good_rows = self.validated(read_rows(path, fmt))
+            if dry_run:
+                self.accepted = sum(1 for _ in good_rows)
+                return self.accepted
+            # The ids are handed out by the queue itself, under its lock, so a parallel import can't reuse them.
+            self.first_id, last_id = self.cm.append_posts(good_rows, OUTPUT_FIELDS)
+            self.accepted = last_id - self.first_id + 1 if self.first_id is not None else 0
+            return self.accepted
+        finally:
+            self.pool.shutdown()
+            if rejects_file:
+                rejects_file.close()
+
+    def print_summary(self, dry_run=False):
+        verb = "would be added" if dry_run else "added to the queue"
+        ids = ""
+        if self.accepted and not dry_run:
+            last_id = self.first_id + self.accepted - 1
+            ids = f" (id {last_id})" if last_id == self.first_id else f" (ids {self.first_id}-{last_id})"
+        print(f"\n✅ {self.accepted} post(s) {verb}{ids}.")
+        total_rejected = sum(self.rejected.values())
+        if not total_rejected:
+            return
+        print(f"🚫 {total_rejected} row(s) rejected:")
+        for reason, count in self.rejected.most_common():
+            print(f"   {count:>7}  {reason}")
+        print("   First few:")
+        for line_number, reason in self.examples:
+            print(f"     line {line_number}: {reason}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream a CSV/JSONL batch of posts into the queue")
+    parser.add_argument("path", help="input file (.csv or .jsonl), or - for stdin")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None, help="default: guessed from the extension")
+    parser.add_argument("--user", default="", help="username for rows that don't name one")
+    parser.add_argument("--workers", type=int, default=8, help="threads used to check media files")
+    parser.add_argument("--rejects", default=None, help="write rejected rows (with the reason) to this CSV")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, add nothing")
+    args = parser.parse_args()
+
+    fmt = args.format or ("jsonl" if args.path.lower().endswith((".jsonl", ".ndjson")) else "csv")
+    if args.path != "-" and not os.path.exists(args.path):
+        print(f"❌ No such file: {args.path}")
+        sys.exit(1)
+    if args.path == "-" and sys.stdin.encoding.lower().replace("-", "") != "utf8":
+        sys.stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+
+    importer = Importer(ContentManager(), args.user, args.workers)
+    importer.run(args.path, fmt, args.dry_run, args.rejects)
+    importer.print_summary(args.dry_run)
+    sys.exit(1 if importer.rejected else 0)
@@ -0,0 +1,37 @@
+"""
+SHADOW POSTER - JSON CACHE FILES
+Loading and saving the small JSON caches in cache/ (media probes, media hashes, locator
+memory). Saving writes a temp file of its own (every process gets a unique name) and
+renames it over the cache in one step, so two runs saving at the same moment can't trip
+over each other's half-written temp file: the cache is always one whole version or another.
+"""
+
+import json
+import os
+import tempfile
+
+
+def load(path):
+    """The cache's contents, or {} if it doesn't exist yet (or is unreadable)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save(path, data, **dump_options):
+    """Writes `data` to `path` atomically. Raises OSError if it can't be written."""
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=1, **dump_options)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,219 @@
+"""
+SHADOW POSTER - LOCATOR MEMORY
+TikTok and Instagram keep moving their buttons around: sometimes the upload form is in the
+top-level page, sometimes inside an iframe, sometimes in a frame with no useful name.
+The posters used to try every place in a fixed order, sitting through a 5-60s timeout at
+each miss, on EVERY run.
+
+This module remembers which strategy (frame + selector) actually found each element, per
+platform, in cache/locators.json. Next run it tries that winner first, so the timeouts are
+only paid again when the site really changes.
+
+    python locators.py report                 (hit rates per platform / element / strategy)
+    python locators.py reset --platform tiktok
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import json_cache
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+CACHE_PATH = os.path.join(os.getcwd(), "cache", "locators.json")
+
+# Where a strategy looks. Anything else is a CSS selector for an iframe (searched with frame_locator).
+TOP = None          # the top-level page
+ANY_FRAME = "*"     # every frame on the page, first one that has the element wins
+
+
+class LocatorNotFound(Exception):
+    """None of an element's strategies worked."""
+
+
+def strategy_key(frame, selector):
+    """How a strategy is named on disk and in the report, e.g. 'top >> input[type="file"]'."""
+    where = "top" if frame is TOP else ("any frame" if frame == ANY_FRAME else frame)
+    return f"{where} >> {selector}"
+
+
+class LocatorCache:
+    """The on-disk memory. One instance per process, shared by every poster (and UI thread)."""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = self._load()
+
+    def _load(self):
+        return json_cache.load(self.path)
+
+    def save(self):
+        try:
+            json_cache.save(self.path, self.data, sort_keys=True)
+        except OSError as e:
+            print(f"⚠️ Couldn't save locator cache: {e}")
+
+    def entry(self, platform, element):
+        element_stats = self.data.setdefault(platform, {}).setdefault(element, {})
+        element_stats.setdefault("winner", None)
+        element_stats.setdefault("resolutions", 0)
+        element_stats.setdefault("first_try", 0)
+        element_stats.setdefault("wasted_s", 0.0)
+        element_stats.setdefault("strategies", {})
+        return element_stats
+
+    def ordered(self, platform, element, strategies):
+        """The declared strategies with the last winner moved to the front."""
+        with self.lock:
+            winner = self.data.get(platform, {}).get(element, {}).get("winner")
+        first = [s for s in strategies if strategy_key(s[0], s[1]) == winner]
+        return first + [s for s in strategies if strategy_key(s[0], s[1]) != winner]
+
+    def record(self, platform, element, attempts, winner_key):
+        """attempts: [(key, ok, seconds)] in the order they were tried."""
+        with self.lock:
+            element_stats = self.entry(platform, element)
+            element_stats["resolutions"] += 1
+            if winner_key is not None and attempts and attempts[0][0] == winner_key:
+                element_stats["first_try"] += 1
+            for key, ok, seconds in attempts:
+                stats = element_stats["strategies"].setdefault(key, {"ok": 0, "miss": 0, "last_ok": None})
+                if ok:
+                    stats["ok"] += 1
+                    stats["last_ok"] = time.strftime("%Y-%m-%d %H:%M:%S")
+                else:
+                    stats["miss"] += 1
+                    element_stats["wasted_s"] = round(element_stats["wasted_s"] + seconds, 3)
+            if winner_key is not None:
+                element_stats["winner"] = winner_key
+            self.save()
+
+    def reset(self, platform=None):
+        with self.lock:
+            if platform:
+                self.data.pop(platform, None)
+            else:
+                self.data = {}
+            self.save()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LocatorCache()
+        return _cache
+
+
+def use_cache(path):
+    """Switches this process to another cache file (the offline benchmarks keep theirs apart)."""
+    global _cache
+    with _cache_lock:
+        _cache = LocatorCache(path)
+        return _cache
+
+
+def _miss_errors():
+    """
+    What counts as 'not in this place': Playwright's own errors (timeouts, detached elements...) and
+    LocatorNotFound. Imported here so the cache and the report work without Playwright installed.
+    """
+    from playwright.sync_api import Error as PlaywrightError
+    return (PlaywrightError, LocatorNotFound)
+
+
+def _try_strategy(page, frame, selector, timeout, action):
+    """Runs `action(locator, timeout)` in the place this strategy describes. Returns the locator it used."""
+    if frame == ANY_FRAME:
+        for f in page.frames:
+            try:
+                # count() doesn't wait, so frames without the element cost nothing.
+                if f.locator(selector).count() > 0:
+                    locator = f.locator(selector).first
+                    action(locator, timeout)
+                    return locator
+            except _miss_errors():
+                pass # timed out / detached in this frame, try the next one
+        raise LocatorNotFound(f"'{selector}' not found in any frame")
+    scope = page if frame is TOP else page.frame_locator(frame)
+    locator = scope.locator(selector).first
+    action(locator, timeout)
+    return locator
+
+
+def resolve(page, platform, element, strategies, action):
+    """
+    Finds `element` and performs `action(locator, timeout_ms)` on it.
+    strategies: [(frame, selector, timeout_ms)] in the order a fresh install should try them;
+    frame is TOP, ANY_FRAME or an iframe selector. The last winner is always tried first.
+    Returns the locator that worked, or raises LocatorNotFound. Errors that aren't Playwright's
+    (ResourceLimitExceeded, UploadStalled...) are raised straight through, not retried elsewhere.
+    """
+    cache = get_cache()
+    attempts = []
+    try:
+        for frame, selector, timeout in cache.ordered(platform, element, strategies):
+            key = strategy_key(frame, selector)
+            began = time.perf_counter()
+            # Only a miss (Playwright timeout / not found) moves on to the next place. Anything else,
+            # like a tripped resource limit or a stalled upload, is the job's problem, not the locator's.
+            try:
+                locator = _try_strategy(page, frame, selector, timeout, action)
+            except _miss_errors():
+                attempts.append((key, False, time.perf_counter() - began))
+                print(f"⚠️ {element}: '{key}' didn't work, trying the next place...")
+                continue
+            attempts.append((key, True, time.perf_counter() - began))
+            if len(attempts) > 1:
+                print(f"🧠 Remembering '{key}' for {platform} {element} next time.")
+            return locator
+    finally:
+        winner = attempts[-1][0] if attempts and attempts[-1][1] else None
+        cache.record(platform, element, attempts, winner)
+    raise LocatorNotFound(f"Could not locate the {element.replace('_', ' ')} with any known strategy.")
+
+
+# ==========================================
+# 📊 REPORTING
+# ==========================================
+def print_report(platform=None):
+    data = get_cache().data
+    platforms = [platform] if platform else sorted(data)
+    if not any(data.get(name) for name in platforms):
+        print("📭 No locator history yet.")
+        return
+    for name in platforms:
+        for element, stats in sorted(data.get(name, {}).items()):
+            resolutions = stats.get("resolutions", 0)
+            rate = stats.get("first_try", 0) / resolutions * 100 if resolutions else 0
+            print(f"\n🔎 {name.upper()} {element}: {resolutions} lookups, {rate:.0f}% found on the first try, "
+                  f"{stats.get('wasted_s', 0):.0f}s lost to misses")
+            for key, counts in sorted(stats.get("strategies", {}).items(), key=lambda item: -item[1]["ok"]):
+                tried = counts["ok"] + counts["miss"]
+                marker = "⭐" if key == stats.get("winner") else "  "
+                print(f"   {marker} {counts['ok']:>4}/{tried:<4} {counts['ok'] / tried * 100 if tried else 0:>4.0f}%  {key}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Learned locator strategies for the posters")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (("report", "hit rates per element and strategy"), ("reset", "forget what was learned")):
+        command_parser = sub.add_parser(command, help=help_text)
+        command_parser.add_argument("--platform", choices=["ig", "tiktok", "x"], default=None)
+    args = parser.parse_args()
+
+    if args.command == "report":
+        print_report(args.platform)
+    else:
+        get_cache().reset(args.platform)
+        print("🧹 Locator memory cleared.")
@@ -0,0 +1,44 @@
+"""
+SHADOW POSTER - LOG CONTEXT
+Remembers which platform the current thread is working on, so every print() made while a
+job runs can be tagged with it (the UI console filters on this) without passing the
+platform through every function. Also sorts a log line into info / warning / error by
+the emoji it starts with, which is how the whole bot already marks trouble.
+
+    with log_context.platform('tiktok'):
+        print("...")      # the UI sees this line as a TikTok line
+"""
+
+import contextlib
+import threading
+
+LEVELS = ('info', 'warning', 'error')
+ERROR_MARKERS = ("❌", "🚫", "💥", "Traceback")
+WARNING_MARKERS = ("⚠️", "🐢", "🔁")
+
+_state = threading.local()
+
+
+def current_platform():
+    """The platform code this thread is posting to right now, or None."""
+    return getattr(_state, 'platform', None)
+
+
+@contextlib.contextmanager
+def platform(code):
+    """Tags everything this thread prints inside the block with `code` (nesting restores the outer one)."""
+    previous = current_platform()
+    _state.platform = code or None
+    try:
+        yield
+    finally:
+        _state.platform = previous
+
+
+def level_of(line):
+    text = line.lstrip()
+    if text.startswith(ERROR_MARKERS):
+        return 'error'
+    if text.startswith(WARNING_MARKERS):
+        return 'warning'
+    return 'info'
@@ -1,8 +1,26 @@
 """
-This is the master controller. It reads the content queue, loads the 
+This is the master controller. It reads the content queue, loads the
 stealth browser profile, and executes the posting sequence.
+
+Two ways to run it:
+  - main()  : post the single next job (what the 'Next ...' buttons do)
+  - drain() : post every pending job in one pass. Consecutive jobs for the same
+              account + platform share ONE browser, so Chrome only boots once per group.
+
+From the command line, jobs are handed to the poster service (poster_service.py) when
+one is running, so Playwright is already warm. Otherwise they run right here.
+
+Accounts with API credentials (Profiles/<user>/api_credentials.json, see api_posters.py)
+post through the platform's official API instead, and never start a browser at all.
+
+Run from the command line without a service, the jobs still go through the supervisor
+(supervisor.py): a separate job process with a time budget per job. SHADOW_SUPERVISE=0 runs them
+right here in this process instead.
 """
 
+import argparse
+import contextlib
+import itertools
 import os
 import sys
 import time
@@ -11,10 +29,21 @@ import time
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding='utf-8')
 
-from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
+# Playwright itself is only imported once a browser is really needed (see playwright_session),
+# so handing a job to the poster service doesn't pay for loading it.
 from human import Human                    # imports the Human function from the human.py script
 from content_manager import ContentManager # imports the content manager from content_manager.py
+import preflight                           # header-only media checks (no browser needed)
+import media_prep                          # picks the pre-built per-platform media variant, if any
+import dedupe                              # never upload the same caption + media to the same account twice
+from timing import JobTimer                # per-phase stopwatch, written to logs/timings.jsonl
+import log_context                         # tags this thread's log lines with the platform being posted to
+from resource_monitor import ResourceMonitor, describe as describe_resources  # Chrome CPU/RAM per job (+ optional limits)
+import profile_maintenance                 # prunes a profile's caches when it grows past SHADOW_PROFILE_MAX_MB
+from artifacts import JobArtifacts         # per-job failure evidence: screenshot, DOM, console log, trace
+import api_posters                         # official-API posters for accounts that have credentials
+import session_check                       # is the saved login still good? (reads the cookie file, no browser)
+import caption_rules                       # X's weighted length, IG's hashtag/mention caps... (caption_rules.json)
 
 # ==========================================
 # GLOBAL CONFIGURATION
@@ -22,9 +51,16 @@ from content_manager import ContentManager # imports the content manager from co
 # Tells X.com and IG "I am a standard Windows PC running regular Chrome"
 REAL_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
 
+# platform code -> (display name, module, poster class, profile folder)
+PLATFORMS = {
+    'ig': ("IG", "ig_poster", "IGPoster", "IG_Profile"),
+    'tiktok': ("TikTok", "tiktok_poster", "TikTokPoster", "TikTok_Profile"),
+    'x': ("X", "x_poster", "XPoster", "X_Profile"),
+}
+
 def get_stealth_args():
     """
-    It removed the automation flags from the automated Chrome browser. 
+    It removed the automation flags from the automated Chrome browser.
     These launch arguments strip away the automation fingerprints that Playwright leaves behind.
     """
     return [
@@ -34,117 +70,436 @@ def get_stealth_args():
         "--disable-dev-shm-usage",                       # Prevents memory crashes on heavy media uploads
         "--no-sandbox",                                  # Required for some OS environments
         "--disable-setuid-sandbox",
-        "--disable-web-security",                        # Relaxes strict CORS policies 
+        "--disable-web-security",                        # Relaxes strict CORS policies
         "--dns-result-order=ipv4first",                  # Speeds up network requests
         "--disable-features=IsolateOrigins,site-per-process" # Saves RAM by disabling site isolation
     ]
 
-def main(target_platform=None, username="default"):
+def load_poster(platform, username):
+    """
+    Works out which poster class and which saved browser profile a platform needs.
+    Returns (PosterClass, profile_path, display_name) or None for an unknown platform.
+    """
+    if platform not in PLATFORMS:
+        return None
+    display_name, module_name, class_name, profile_folder = PLATFORMS[platform]
+    # Imported lazily so an X-only run never pays for loading the TikTok module (and vice versa)
+    module = __import__(module_name)
+    profile_path = os.path.join(os.getcwd(), "Profiles", username, profile_folder)
+    return getattr(module, class_name), profile_path, display_name
+
+def resolve_media_path(job):
+    """
+    BULLETPROOF FILE PATHING
+    Returns (ok, absolute_media_path). ok is False when the CSV points at a file that isn't there.
+    """
+    # 1. Grab the raw string from the CSV (e.g., 'media/campaign_1.mp4')
+    raw_media_string = job['image_path'].strip() if job.get('image_path') else None
+
+    if not raw_media_string:
+        return True, None
+
+    # 2. Convert to Absolute Path
+    absolute_media_path = os.path.join(os.getcwd(), raw_media_string)
+
+    # 3. The Pre-Flight Check
+    # If the marketing media was accidentally deleted or misspelled in the CSV, abort.
+    if not os.path.exists(absolute_media_path):
+        print(f"❌ CRITICAL ERROR: Could not find the media file!")
+        print(f"   I looked exactly here: {absolute_media_path}")
+        print(f"   Check your media/ folder and content.csv spelling. Aborting.")
+        return False, absolute_media_path
+
+    return True, absolute_media_path
+
+def preflight_job(job, platform, media_path, cm):
+    """
+    MEDIA PREFLIGHT
+    Checks codec/size/duration/aspect ratio against the platform's limits by reading only
+    the file headers. A bad file is rejected in milliseconds instead of after a 60s browser session.
+    Returns True if the job may go ahead.
+    """
+    problems = preflight.check_media(platform, media_path)
+    if not problems:
+        return True
+    print(f"❌ Media for job #{job['id']} won't be accepted by {platform.upper()}:")
+    for problem in problems:
+        print(f"   - {problem}")
+    # Retrying won't make the file any smaller, so this one goes straight to 'failed'.
+    cm.mark_post_as_failed(job['id'], "Preflight: " + "; ".join(problems), permanent=True)
+    return False
+
+def prepare_job(job, platform, username, cm):
+    """
+    Every check that can reject a job WITHOUT a browser, cheapest first.
+    Returns (ok, absolute_media_path). Rejected jobs have already been updated in the queue.
+    """
+    # A caption the platform won't take would only be found after typing it all out, key by key.
+    problems = caption_rules.check_caption(platform, job.get('caption') or '')
+    if problems:
+        print(f"❌ The caption of job #{job['id']} breaks {platform.upper()}'s rules: {caption_rules.describe(problems)}")
+        # Retrying won't shorten the caption: straight to 'failed' (fix it, then requeue).
+        cm.mark_post_as_failed(job['id'], "Caption: " + caption_rules.describe(problems), permanent=True)
+        return False, None
+
+    # ==========================================
+    # PHASE 1.5: BULLETPROOF FILE PATHING
+    # ==========================================
+    media_ok, absolute_media_path = resolve_media_path(job)
+    if not media_ok:
+        cm.mark_post_as_failed(job['id'], f"Media file not found: {absolute_media_path}")
+        return False, None
+
+    # Same caption + same media already live on this account? Don't upload it again.
+    if not dedupe.check_job(job, username, cm):
+        return False, None
+
+    # Swap in the pre-converted variant (media_prep.py) if one is ready, then check it fits the platform.
+    absolute_media_path = media_prep.variant_for(platform, absolute_media_path)
+    if not preflight_job(job, platform, absolute_media_path, cm):
+        return False, None
+    return True, absolute_media_path
+
+def session_ok(job, platform, profile_path, cm, session=None):
+    """
+    SAVED LOGIN CHECK
+    Reads the profile's cookie file (no browser) and parks the job as 'needs_login' if the account
+    is logged out or its login has expired, instead of finding out after a full browser session.
+    Pass `session` to reuse a check already made for this profile. Returns True if the job may go ahead.
+    """
+    if not session_check.ENABLED:
+        return True
+    session = session or session_check.check_profile(platform, profile_path)
+    if not session_check.needs_login(session):
+        return True
+    print(f"🔑 The saved {platform.upper()} login in {os.path.relpath(profile_path)} isn't usable: {session['detail']}.")
+    cm.mark_needs_login(job['id'], session['detail'])
+    return False
+
+@contextlib.contextmanager
+def playwright_session(p=None):
+    """
+    Yields a running Playwright. The poster service passes in the one it keeps warm;
+    everybody else gets a fresh one that is shut down afterwards.
+    """
+    if p is not None:
+        yield p
+        return
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as fresh:
+        yield fresh
+
+def launch_browser(p, profile_path):
+    """
+    BROWSER IGNITION
+    Boots Chrome on the saved profile and returns (context, page) with stealth patches applied.
+    """
+    # A bloated profile makes every start slower; trim its caches first if it crossed the size limit.
+    profile_maintenance.maybe_auto_prune(profile_path)
+
+    # We launch the persistent context using the profile folder we built with login_helper.py
+    context = p.chromium.launch_persistent_context(
+        user_data_dir=profile_path,
+        headless=False,                                       # Set to True later if you want it entirely invisible
+        channel="chrome",                                     # Use the real Google Chrome installation
+        user_agent=REAL_USER_AGENT,                           # STEALTH 1: Apply the Fake ID
+        ignore_default_args=["--enable-automation"],          # STEALTH 2: Remove Playwright's default snitch flag
+        args=get_stealth_args()                               # STEALTH 3: Inject the Invisibility Cloak
+    )
+
+    # Grab the active tab
+    page = context.pages[0]
+
+    from playwright_stealth import Stealth
+
+    # STEALTH 4: Apply Javascript Stealth Patches
+    Stealth().use_sync(page)
+    return context, page
+
+def record_resources(monitor, timer):
+    """Stops the monitor and files its peak/average numbers next to the job's timings."""
+    summary = monitor.stop()
+    if summary:
+        timer.extra["resources"] = summary
+        print(f"📈 Chrome used {describe_resources(summary)}.")
+        if summary["limit_breach"]:
+            print(f"🚫 {summary['limit_breach']}")
+    return summary
+
+def new_timer(job, username):
+    return JobTimer(job['id'], job.get('platform', '').strip().lower(), username)
+
+def run_job(page, PosterClass, job, media_path, cm, username, timer=None, profile_path=None):
+    """
+    EXECUTION + DATABASE UPDATE for one job on an already-open page.
+    The job's phase timings (and Chrome's resource usage) are written to the run history whatever the outcome.
+    If it fails, its evidence bundle is linked from the queue row ('artifact_path') and from timer.extra.
+    Returns True if the post went live.
+    """
+    timer = timer or new_timer(job, username)
+
+    # Watches the Chrome process tree while the job runs. Its check() aborts the job if a limit is crossed.
+    monitor = ResourceMonitor(profile_path, timer).start()
+
+    # Instantiate our random-behavior engine to make the mouse/keyboard look human
+    brian_bot = Human(page, guard=monitor.check)
+
+    # Console log (and the optional trace) are recorded from here; screenshots are taken when things go wrong.
+    bundle = JobArtifacts(page, job_id=job['id'], platform=job.get('platform'), username=username).start()
+
+    # Load up the correct platform logic and pass our human behavior engine (and the stopwatch) into it
+    poster = PosterClass(page, brian_bot, timer=timer, artifacts=bundle)
+
+    # Fire the actual sequence! Note we are passing the absolute media path here.
+    try:
+        success = poster.create_post(
+            text=job['caption'],
+            media_path=media_path
+        )
+    except Exception as e:
+        record_resources(monitor, timer)
+        timer.extra['artifact_path'] = bundle.finish(False, f"Browser error: {e}")
+        timer.finish(False, f"Browser error: {e}")
+        raise
+    record_resources(monitor, timer)
+    error = None if success else (poster.last_error or "create_post() returned False")
+    artifact_path = bundle.finish(success, error)
+    if artifact_path:
+        timer.extra['artifact_path'] = artifact_path
+    timer.finish(success, error)
+    return record_outcome(job, success, error, cm, username, artifact_path=artifact_path)
+
+def run_api_job(poster, job, media_path, cm, username, timer):
+    """
+    EXECUTION + DATABASE UPDATE for one job through an official API (no browser, no page).
+    Returns True if the post went live.
+    """
+    timer.extra['via'] = "api"
+    success = poster.create_post(text=job['caption'], media_path=media_path)
+    error = None if success else (poster.last_error or "create_post() returned False")
+    if poster.post_id:
+        timer.extra['post_id'] = poster.post_id
+    timer.finish(success, error)
+    return record_outcome(job, success, error, cm, username, permanent=poster.permanent)
+
+def record_outcome(job, success, error, cm, username, artifact_path=None, permanent=False):
+    """Writes a finished job's result to the queue. Returns success."""
+    # Only mark the queue as 'completed' if the platform confirms the post actually went live.
+    # Anything else counts as a failed attempt, so the job backs off instead of being retried instantly.
+    if success:
+        print("✅ Successfully Posted.")
+        cm.mark_post_as_complete(job['id'])
+        dedupe.record_job(job, username)
+    else:
+        cm.mark_post_as_failed(job['id'], error, permanent=permanent, artifact_path=artifact_path)
+    return success
+
+def main(target_platform=None, username="default", p=None):
     print(f"🚀 Firing up the posting engine (Stealth Mode) for {'ALL' if not target_platform else target_platform.upper()} (User: {username})...")
-    
+
     # ==========================================
     # PHASE 1: THE DATA FETCH
     # ==========================================
-    # We do this FIRST. There is no reason to launch a heavy, RAM-hungry 
-    # browser if we don't even have a post scheduled. 
+    # We do this FIRST. There is no reason to launch a heavy, RAM-hungry
+    # browser if we don't even have a post scheduled.
     cm = ContentManager()
-    
+
     # Get the next post for the target platform (or any platform if None)
     job = cm.get_next_post(target_platform, username)
-    
+
     # The kill switch: If content.csv is empty or has no 'pending' rows, we exit instantly.
     if not job:
         print(f"🛑 Nothing to do because content.csv is empty or has no pending posts for '{target_platform}'. Shutting down gracefully.")
-        return
+        return None
 
+    return post_job(job, username, cm, p)
+
+def post_job(job, username, cm, p=None):
+    """
+    Posts one specific queue row from start to finish: picks the poster, checks the media,
+    boots the browser, posts and updates the queue. Used by main() and by the scheduler.
+    Returns True if the post went live.
+    """
     platform = job.get('platform', '').strip().lower()
-    
-    if platform == 'ig':
-        from ig_poster import IGPoster
-        PROFILE_PATH = os.path.join(os.getcwd(), "Profiles", username, "IG_Profile")
-        PosterClass = IGPoster
-        print(f"📋 Found IG Job #{job['id']}: '{job['caption'][:20]}...'")
-    elif platform == 'tiktok':
-        from tiktok_poster import TikTokPoster
-        PROFILE_PATH = os.path.join(os.getcwd(), "Profiles", username, "TikTok_Profile")
-        PosterClass = TikTokPoster
-        print(f"📋 Found TikTok Job #{job['id']}: '{job['caption'][:20]}...'")
-    elif platform == 'x':
-        from x_poster import XPoster
-        PROFILE_PATH = os.path.join(os.getcwd(), "Profiles", username, "X_Profile")
-        PosterClass = XPoster
-        print(f"📋 Found X Job #{job['id']}: '{job['caption'][:20]}...'")
-    else:
-        print(f"❌ Unknown platform '{platform}' for job #{job['id']}. Aborting.")
-        return
-    
-    # ==========================================
-    # PHASE 1.5: BULLETPROOF FILE PATHING
-    # ==========================================
-    # 1. Grab the raw string from the CSV (e.g., 'media/campaign_1.mp4')
-    raw_media_string = job['image_path'].strip() if job.get('image_path') else None
-    
-    # We define a placeholder for the final, absolute path.
-    absolute_media_path = None
-
-    if raw_media_string:
-        # 2. Convert to Absolute Path
-        absolute_media_path = os.path.join(os.getcwd(), raw_media_string)
-        
-        # 3. The Pre-Flight Check
-        # If the marketing media was accidentally deleted or misspelled in the CSV, abort.
-        if not os.path.exists(absolute_media_path):
-            print(f"❌ CRITICAL ERROR: Could not find the media file!")
-            print(f"   I looked exactly here: {absolute_media_path}")
-            print(f"   Check your media/ folder and content.csv spelling. Aborting.")
-            return # Kills the script safely
+    with log_context.platform(platform):
+        loaded = load_poster(platform, username)
+        if not loaded:
+            print(f"❌ Unknown platform '{platform}' for job #{job['id']}. Aborting.")
+            cm.mark_post_as_failed(job['id'], f"Unknown platform '{platform}'")
+            return False
+        PosterClass, PROFILE_PATH, display_name = loaded
+        print(f"📋 Found {display_name} Job #{job['id']}: '{job['caption'][:20]}...'")
+
+        job_ok, absolute_media_path = prepare_job(job, platform, username, cm)
+        if not job_ok:
+            return False # Kills the script safely
+
+        # An account with API credentials skips the browser entirely.
+        timer = new_timer(job, username)
+        api_poster = api_posters.load_api_poster(platform, username, timer)
+        if api_poster:
+            print(f"🔑 Posting through the official {display_name} API (no browser).")
+            return run_api_job(api_poster, job, absolute_media_path, cm, username, timer)
+
+        # Logged out? Then there's no point starting Chrome at all.
+        if not session_ok(job, platform, PROFILE_PATH, cm):
+            return False
 
-    # ==========================================
-    # PHASE 2: BROWSER IGNITION
-    # ==========================================
-    with sync_playwright() as p:
-        
-        # We launch the persistent context using the X_Profile folder we built with login_helper.py
-        context = p.chromium.launch_persistent_context(
-            user_data_dir=PROFILE_PATH,
-            headless=False,                                       # Set to True later if you want it entirely invisible
-            channel="chrome",                                     # Use the real Google Chrome installation
-            user_agent=REAL_USER_AGENT,                           # STEALTH 1: Apply the Fake ID
-            ignore_default_args=["--enable-automation"],          # STEALTH 2: Remove Playwright's default snitch flag
-            args=get_stealth_args()                               # STEALTH 3: Inject the Invisibility Cloak
-        )
-        
-        # Grab the active tab
-        page = context.pages[0]
-        
-        # STEALTH 4: Apply Javascript Stealth Patches
-        Stealth().use_sync(page)
-        
-        # ==========================================
-        # PHASE 3: EXECUTION
-        # ==========================================
-        # Instantiate our random-behavior engine to make the mouse/keyboard look human
-        brian_bot = Human(page)
-        
-        # Load up the correct platform logic and pass our human behavior engine into it
-        poster = PosterClass(page, brian_bot)
-        
-        # Fire the actual sequence! Note we are passing absolute_media_path here.
-        success = poster.create_post(
-            text=job['caption'], 
-            media_path=absolute_media_path 
-        )
-        
         # ==========================================
-        # PHASE 4: DATABASE UPDATE
+        # PHASE 2: BROWSER IGNITION
         # ==========================================
-        # Only mark the CSV as 'completed' if Playwright confirms the post actually went live.
-        if success:
-            print("✅ Successfully Posted.")
-            cm.mark_post_as_complete(job['id'])
-            
-        # Shut down the browser to flush cookies and free up system memory
-        context.close()
+        with playwright_session(p) as p:
+            context = None
+            try:
+                with timer.span("browser_launch"):
+                    context, page = launch_browser(p, PROFILE_PATH)
+
+                # ==========================================
+                # PHASE 3 + 4: EXECUTION & DATABASE UPDATE
+                # ==========================================
+                return run_job(page, PosterClass, job, absolute_media_path, cm, username, timer, PROFILE_PATH)
+            except Exception as e:
+                # The browser itself died (or never started). Record it like drain() does, so the
+                # row backs off instead of staying 'pending' and being retried straight away.
+                print(f"❌ Browser error on job #{job['id']}: {e}")
+                cm.mark_post_as_failed(job['id'], f"Browser error: {e}", artifact_path=timer.extra.get('artifact_path'))
+                return False
+            finally:
+                # Shut down the browser to flush cookies and free up system memory
+                if context is not None:
+                    try:
+                        context.close()
+                    except Exception:
+                        pass
+
+def drain(target_platform=None, username="default", p=None, job_ids=None, on_job_start=None, on_job_done=None):
+    """
+    BATCH MODE: walks the pending queue ONCE and posts everything it finds.
+    Jobs are grouped by (account, platform) in queue order, and each group gets a single
+    persistent browser, so profile loading and Chrome start-up are paid per group, not per post.
+
+    job_ids limits the run to those queue rows (the ones still pending), in that order. That's how the
+    supervisor (supervisor.py) hands a batch to its job process. on_job_start(job) / on_job_done(job)
+    are called around every job, whatever happens to it.
+    """
+    cm = ContentManager()
+    if job_ids is None:
+        print(f"🌟 Draining ALL pending posts for {'ALL' if not target_platform else target_platform.upper()} (User: {username})...")
+        jobs = cm.iter_pending(target_platform, username)
+    else:
+        jobs = (job for job in map(cm.get_post, job_ids)
+                if job and (job.get('status') or '').strip().lower() == 'pending')
+
+    def group_key(job):
+        return ((job.get('username') or '').strip() or username, job.get('platform', '').strip().lower())
+
+    posted, attempted = 0, 0
+    playwright = None
+    # Playwright is only started once a job really needs a browser, so API-only runs never start it.
+    with contextlib.ExitStack() as sessions:
+        for (row_user, platform), group in itertools.groupby(jobs, key=group_key):
+            with log_context.platform(platform):
+                loaded = load_poster(platform, username)
+                if not loaded:
+                    for job in group:
+                        if on_job_start:
+                            on_job_start(job)
+                        print(f"❌ Unknown platform '{platform}' for job #{job['id']}. Skipping.")
+                        cm.mark_post_as_failed(job['id'], f"Unknown platform '{platform}'")
+                        if on_job_done:
+                            on_job_done(job)
+                    continue
+                PosterClass, profile_path, display_name = loaded
+
+                # The browser is only started once we hit a job that can actually run,
+                # so a group full of missing/duplicate/bad media never boots Chrome at all.
+                context, page = None, None
+                session = None # the profile's login status, checked once per group
+                try:
+                    for job in group:
+                        if on_job_start:
+                            on_job_start(job)
+                        try:
+                            print(f"\n>>> Processing Batch Post: ID {job['id']} for {display_name} (User: {username})...")
+                            job_ok, absolute_media_path = prepare_job(job, platform, username, cm)
+                            if not job_ok:
+                                continue
+
+                            timer = new_timer(job, username)
+                            api_poster = api_posters.load_api_poster(platform, username, timer)
+                            if api_poster:
+                                attempted += 1
+                                print(f"🔑 Posting through the official {display_name} API (no browser).")
+                                if run_api_job(api_poster, job, absolute_media_path, cm, username, timer):
+                                    posted += 1
+                                continue
+
+                            if session is None and session_check.ENABLED:
+                                session = session_check.check_profile(platform, profile_path)
+                            if not session_ok(job, platform, profile_path, cm, session):
+                                continue
+
+                            # The group's browser launch is charged to the job that triggered it.
+                            if context is None:
+                                print(f"🧭 Opening one {display_name} browser for this group...")
+                                with timer.span("browser_launch"):
+                                    if playwright is None:
+                                        playwright = sessions.enter_context(playwright_session(p))
+                                    context, page = launch_browser(playwright, profile_path)
+
+                            attempted += 1
+                            try:
+                                if run_job(page, PosterClass, job, absolute_media_path, cm, username, timer, profile_path):
+                                    posted += 1
+                                if timer.extra.get("resources", {}).get("limit_breach"):
+                                    # Whatever bloated Chrome is probably still there; the next job gets a fresh browser.
+                                    print("♻️ Restarting the browser after the resource limit was hit.")
+                                    try:
+                                        context.close()
+                                    except Exception:
+                                        pass
+                                    context, page = None, None
+                            except Exception as e:
+                                # Something below the poster blew up (usually the browser itself died).
+                                # Throw this browser away; the next job in the group gets a fresh one.
+                                print(f"❌ Browser error on job #{job['id']}: {e}")
+                                cm.mark_post_as_failed(job['id'], f"Browser error: {e}", artifact_path=timer.extra.get('artifact_path'))
+                                try:
+                                    context.close()
+                                except Exception:
+                                    pass
+                                context, page = None, None
+                        finally:
+                            if on_job_done:
+                                on_job_done(job)
+                finally:
+                    # Shut down the browser to flush cookies and free up system memory
+                    if context is not None:
+                        context.close()
+                        time.sleep(3) # Small delay to give resources a break before opening the next browser
+
+    print(f"🏁 Batch finished: {posted}/{attempted} posts went live.")
+    return posted
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Shadow Poster - post the next job (or the whole queue)")
+    parser.add_argument("--platform", choices=sorted(PLATFORMS), default=None, help="only post to this platform")
+    parser.add_argument("--user", default="default", help="which saved account (Profiles/<user>) to post from")
+    parser.add_argument("--all", action="store_true", help="drain every pending post instead of just the next one")
+    parser.add_argument("--local", action="store_true", help="run in this process even if the poster service is up")
+    args = parser.parse_args()
+
+    if not args.local:
+        import poster_service
+        reply = poster_service.submit_job(args.platform, args.user, args.all)
+        if reply is not None:
+            sys.exit(0 if reply.get("ok") else 1)
+
+    import supervisor
+    if supervisor.ENABLED:
+        results = supervisor.run(args.platform, args.user, args.all)
+        sys.exit(0 if all(result['outcome'] in ('posted', 'skipped') for result in results) else 1)
+    if args.all:
+        drain(args.platform, args.user)
+    else:
+        main(args.platform, args.user)
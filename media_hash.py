@@ -0,0 +1,57 @@
+"""
+SHADOW POSTER - MEDIA FINGERPRINTS
+Content hashes for media files. The file is streamed through SHA-256 in fixed-size
+chunks (a 2GB video never sits in RAM), and the answer is cached in
+cache/hash_cache.json keyed by (path, mtime, size) so each file is only hashed once.
+"""
+
+import hashlib
+import os
+import threading
+
+import json_cache
+
+CACHE_PATH = os.path.join(os.getcwd(), "cache", "hash_cache.json")
+CHUNK_SIZE = 1024 * 1024 # 1MB reads: big enough to be fast, small enough to never matter for memory
+
+_cache_lock = threading.Lock()
+_cache = None
+
+
+def sha256_stream(path, chunk_size=CHUNK_SIZE):
+    """Hashes a file chunk by chunk. No caching, always reads the whole file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        _cache = json_cache.load(CACHE_PATH)
+    return _cache
+
+
+def _save_cache():
+    json_cache.save(CACHE_PATH, _cache)
+
+
+def file_sha256(path):
+    """sha256_stream() with the (path, mtime, size) cache in front of it."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _cache_lock:
+        entry = _load_cache().get(path)
+        if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+            return entry['sha256']
+
+    digest = sha256_stream(path)
+    with _cache_lock:
+        _load_cache()[path] = {'mtime': stat.st_mtime, 'size': stat.st_size, 'sha256': digest}
+        _save_cache()
+    return digest
@@ -0,0 +1,219 @@
+"""
+SHADOW POSTER - MEDIA PREP
+The offline 'get the media ready' step. Run it ahead of posting time and it uses your
+local ffmpeg to build a per-platform version of every queued file that needs one
+(too big, too high-res, wrong codec, wrong aspect ratio), several files at once in a process pool.
+
+Finished variants live in cache/variants/, named after the SOURCE file's content hash plus
+the target profile, so the same video attached to X, IG and TikTok rows is converted once
+per platform, and editing a profile's settings automatically produces fresh variants.
+main.py then swaps in the right variant by itself; if there isn't one, the original is used.
+
+    python media_prep.py                 (prepare everything pending)
+    python media_prep.py --platform ig --workers 2
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+import preflight
+from media_hash import file_sha256
+
+VARIANT_DIR = os.path.join(os.getcwd(), "cache", "variants")
+FFMPEG = os.environ.get("SHADOW_FFMPEG") or shutil.which("ffmpeg") or "ffmpeg"
+
+# ==========================================
+# 🎯 TARGET PROFILES
+# ==========================================
+# The box each platform's variant must fit in, plus encoder settings.
+# Aspect-ratio limits come from preflight.PLATFORM_LIMITS, so the two can never disagree.
+PROFILES = {
+    'x': {
+        'video': {'max_width': 1280, 'max_height': 1280, 'video_kbps': 5000, 'audio_kbps': 128, 'fps': 30},
+        'image': {'max_width': 2048, 'max_height': 2048, 'jpeg_quality': 3},
+    },
+    'ig': {
+        'video': {'max_width': 1080, 'max_height': 1920, 'video_kbps': 3500, 'audio_kbps': 128, 'fps': 30},
+        'image': {'max_width': 1080, 'max_height': 1350, 'jpeg_quality': 3},
+    },
+    'tiktok': {
+        'video': {'max_width': 1080, 'max_height': 1920, 'video_kbps': 4000, 'audio_kbps': 128, 'fps': 30},
+    },
+}
+
+
+def profile_key(platform, kind):
+    """Short fingerprint of a profile's settings (+ its aspect limits). Changes whenever the profile does."""
+    settings = {'profile': PROFILES[platform][kind], 'limits': preflight.PLATFORM_LIMITS[platform][kind]}
+    blob = json.dumps(settings, sort_keys=True, default=sorted).encode('utf-8')
+    return hashlib.sha256(blob).hexdigest()[:8]
+
+
+def variant_path(source_path, platform, kind):
+    extension = ".mp4" if kind == 'video' else ".jpg"
+    name = f"{file_sha256(source_path)[:24]}_{platform}_{profile_key(platform, kind)}{extension}"
+    return os.path.join(VARIANT_DIR, name)
+
+
+def needs_variant(platform, path, info):
+    """
+    Decides if the original can be posted as-is. We only re-encode when it actually buys
+    something: a failing preflight, a frame bigger than the profile's box, or a bloated bitrate.
+    """
+    kind = info.get('kind')
+    profile = PROFILES.get(platform, {}).get(kind)
+    if profile is None or info.get('error'):
+        return False
+    if preflight.check_media(platform, path):
+        return True
+    width, height = info.get('width') or 0, info.get('height') or 0
+    if width > profile['max_width'] or height > profile['max_height']:
+        return True
+    if kind == 'video' and info.get('duration'):
+        kbps = info['size_bytes'] * 8 / 1000 / info['duration']
+        # 1.5x headroom: a slightly high bitrate isn't worth a generation of quality loss.
+        if kbps > (profile['video_kbps'] + profile['audio_kbps']) * 1.5:
+            return True
+    return False
+
+
+def build_command(source_path, output_path, platform, kind):
+    """The ffmpeg command line for one variant."""
+    profile = PROFILES[platform][kind]
+    limits = preflight.PLATFORM_LIMITS[platform][kind]
+    min_aspect, max_aspect = limits.get('min_aspect'), limits.get('max_aspect')
+
+    # 1. Shrink (never enlarge) to fit the box, keeping the picture's own shape.
+    filters = [f"scale=w='min({profile['max_width']},iw)':h='min({profile['max_height']},ih)'"
+               f":force_original_aspect_ratio=decrease:force_divisible_by=2"]
+    # 2. Letterbox/pillarbox only if the shape is outside what the platform accepts.
+    if min_aspect or max_aspect:
+        pad_w = f"max(iw,ceil(ih*{min_aspect}/2)*2)" if min_aspect else "iw"
+        pad_h = f"max(ih,ceil(iw/{max_aspect}/2)*2)" if max_aspect else "ih"
+        filters.append(f"pad=w='{pad_w}':h='{pad_h}':x='(ow-iw)/2':y='(oh-ih)/2':color=black")
+
+    command = [FFMPEG, "-hide_banner", "-loglevel", "error", "-y", "-i", source_path, "-vf", ",".join(filters)]
+    if kind == 'video':
+        max_duration = limits.get('max_duration')
+        if max_duration:
+            command += ["-t", str(max_duration)]
+        command += [
+            "-r", str(profile['fps']),
+            "-c:v", "libx264", "-preset", "medium", "-profile:v", "high", "-pix_fmt", "yuv420p",
+            "-b:v", f"{profile['video_kbps']}k", "-maxrate", f"{profile['video_kbps']}k",
+            "-bufsize", f"{profile['video_kbps'] * 2}k",
+            "-c:a", "aac", "-b:a", f"{profile['audio_kbps']}k",
+            # moov atom up front: the upload can start being processed before the last byte arrives
+            "-movflags", "+faststart",
+            "-f", "mp4",
+        ]
+    else:
+        command += ["-q:v", str(profile['jpeg_quality']), "-frames:v", "1", "-f", "image2"]
+    return command + [output_path]
+
+
+def _transcode(task):
+    """Runs in a worker process. Writes to a temp name and renames, so a crash never leaves half a variant."""
+    source_path, output_path, platform, kind = task
+    tmp_path = output_path + ".part"
+    result = subprocess.run(build_command(source_path, tmp_path, platform, kind),
+                            capture_output=True, text=True, encoding='utf-8', errors='replace')
+    if result.returncode != 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return task, (result.stderr.strip().splitlines() or ["ffmpeg failed"])[-1]
+    os.replace(tmp_path, output_path)
+    return task, None
+
+
+def variant_for(platform, media_path):
+    """
+    What main.py calls right before posting: the prepared variant if one is ready, else the original.
+    Never converts anything itself, so it costs a hash-cache lookup and a stat.
+    """
+    if not media_path or platform not in PROFILES:
+        return media_path
+    try:
+        kind = preflight.probe(media_path).get('kind')
+        if kind not in PROFILES[platform]:
+            return media_path
+        candidate = variant_path(media_path, platform, kind)
+    except OSError:
+        return media_path
+    if os.path.exists(candidate):
+        print(f"🎞️ Using prepared {platform.upper()} variant: {os.path.basename(candidate)}")
+        return candidate
+    return media_path
+
+
+def plan_tasks(targets, force=False):
+    """Turns (platform, path) pairs into the unique list of transcodes that still need doing."""
+    tasks = {}
+    for platform, path in targets:
+        if platform not in PROFILES or not os.path.exists(path):
+            continue
+        info = preflight.probe(path)
+        kind = info.get('kind')
+        # GIFs are left alone: re-encoding to JPEG would freeze the animation.
+        if kind not in PROFILES[platform] or info.get('codec') == 'gif':
+            continue
+        if not force and not needs_variant(platform, path, info):
+            continue
+        output_path = variant_path(path, platform, kind)
+        if os.path.exists(output_path) and not force:
+            continue
+        # Keyed on the output name: two rows sharing a video + platform produce ONE job.
+        tasks[output_path] = (os.path.abspath(path), output_path, platform, kind)
+    return list(tasks.values())
+
+
+def prepare(targets, workers=None, force=False):
+    tasks = plan_tasks(targets, force)
+    if not tasks:
+        print("✅ Every queued file is already ready to post.")
+        return 0
+    if shutil.which(FFMPEG) is None and not os.path.exists(FFMPEG):
+        print(f"❌ ffmpeg not found ('{FFMPEG}'). Install it or point SHADOW_FFMPEG at it.")
+        return len(tasks)
+
+    os.makedirs(VARIANT_DIR, exist_ok=True)
+    # ffmpeg already uses several threads per encode, so half the cores is the sweet spot by default.
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+    print(f"🎬 Preparing {len(tasks)} variant(s) with {workers} worker(s)...")
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(_transcode, task) for task in tasks]):
+            (source_path, output_path, platform, kind), error = future.result()
+            if error:
+                failed += 1
+                print(f"❌ {platform.upper()} {os.path.basename(source_path)}: {error}")
+            else:
+                print(f"✅ {platform.upper()} {os.path.basename(source_path)} -> {os.path.basename(output_path)}")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build per-platform media variants ahead of posting time")
+    parser.add_argument("--platform", choices=sorted(PROFILES), default=None, help="only prepare for this platform")
+    parser.add_argument("--workers", type=int, default=None, help="parallel ffmpeg processes (default: half your CPU cores)")
+    parser.add_argument("--force", action="store_true", help="re-encode even files that look fine already")
+    args = parser.parse_args()
+
+    from content_manager import ContentManager
+    targets = []
+    for row in ContentManager().iter_rows(['pending']):
+        platform = (row.get('platform') or '').strip().lower()
+        path = (row.get('image_path') or '').strip()
+        if path and (args.platform is None or platform == args.platform):
+            targets.append((platform, os.path.join(os.getcwd(), path)))
+    sys.exit(1 if prepare(targets, args.workers, args.force) else 0)
@@ -0,0 +1,333 @@
+"""
+SHADOW POSTER - POSTER SERVICE
+A background process that keeps Python, the poster modules and the Playwright driver
+loaded and warm, and takes jobs over a local-only socket. main.py and the UI hand their
+jobs to it (when it's running) and stream the log lines back, so a button click no longer
+pays for importing Playwright and starting its driver every single time.
+
+    python poster_service.py start            (run the service in this terminal)
+    python poster_service.py status
+    python poster_service.py cancel           (kill the job that's running right now)
+    python poster_service.py stop
+
+The UI starts it in the background by itself the first time you post. Jobs run one at a
+time, in the order they arrive. Only programs that can read cache/poster_service.key
+(i.e. you) can talk to it.
+
+Each job actually runs in a supervised job process with a time budget (see supervisor.py),
+so a hung browser can be killed without taking the service down. With SHADOW_SUPERVISE=0
+jobs run inside the service itself on its warm Playwright driver, like they used to.
+"""
+
+import argparse
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener, AuthenticationError
+
+import log_context
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = int(os.environ.get("SHADOW_SERVICE_PORT", "47832"))
+KEY_PATH = os.path.join(os.getcwd(), "cache", "poster_service.key")
+LOG_PATH = os.path.join(os.getcwd(), "logs", "poster_service.log")
+
+
+def _authkey(create=False):
+    """The shared secret. Created by the service on first start; a client without it can't connect."""
+    try:
+        with open(KEY_PATH, 'rb') as file:
+            return file.read()
+    except OSError:
+        if not create:
+            return None
+    os.makedirs(os.path.dirname(KEY_PATH), exist_ok=True)
+    key = secrets.token_bytes(32)
+    with open(KEY_PATH, 'wb') as file:
+        file.write(key)
+    return key
+
+
+class _ClientStream:
+    """
+    Stands in for sys.stdout while a job runs: every print() goes to the service's own
+    console AND is sent to the client that asked for the job. If the client goes away
+    (window closed, Ctrl+C) the job carries on and we just stop sending.
+    """
+
+    def __init__(self, conn, console):
+        self.conn = conn
+        self.console = console
+
+    def write(self, text):
+        try:
+            self.console.write(text)
+        except Exception:
+            pass
+        if self.conn is not None and text:
+            try:
+                self.conn.send({"type": "log", "text": text, "platform": log_context.current_platform()})
+            except (OSError, ValueError):
+                self.conn = None
+        return len(text)
+
+    def flush(self):
+        try:
+            self.console.flush()
+        except Exception:
+            pass
+
+
+class PosterService:
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.running = True
+        self.started = time.time()
+        self.completed = 0
+        self.current = None
+        self.playwright = None
+        self.supervisor = None
+
+    # ==========================================
+    # 🔥 PHASE 1: WARM UP AND SERVE
+    # ==========================================
+    def serve(self):
+        listener = Listener((SERVICE_HOST, SERVICE_PORT), authkey=_authkey(create=True))
+        threading.Thread(target=self._accept_loop, args=(listener,), daemon=True).start()
+
+        # The Playwright sync API belongs to the thread that started it, so every job runs on THIS thread.
+        import main  # loads the posters' dependencies once, up front
+        import supervisor
+        self.main = main
+        if supervisor.ENABLED:
+            # Jobs run in their own job processes, so the service itself never touches a browser.
+            supervisor.cleanup_orphans()  # Chrome left behind by a crash before this start
+            self.supervisor = supervisor.Supervisor()
+        else:
+            self._start_playwright()
+        print(f"🔌 Poster service ready on {SERVICE_HOST}:{SERVICE_PORT} (pid {os.getpid()}).")
+        try:
+            while self.running:
+                item = self.jobs.get()
+                if item is None:
+                    break
+                self._run(*item)
+        finally:
+            self.running = False
+            listener.close()
+            self._stop_playwright()
+            print("🛑 Poster service stopped.")
+
+    def _start_playwright(self):
+        from playwright.sync_api import sync_playwright
+        began = time.perf_counter()
+        self.playwright = sync_playwright().start()
+        print(f"🎭 Playwright driver started in {time.perf_counter() - began:.1f}s and will stay warm.")
+
+    def _stop_playwright(self):
+        if self.playwright is not None:
+            try:
+                self.playwright.stop()
+            except Exception:
+                pass
+            self.playwright = None
+
+    def _accept_loop(self, listener):
+        while self.running:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                continue # a stranger without the key, or the listener closing on shutdown
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    # ==========================================
+    # 📨 PHASE 2: REQUESTS
+    # ==========================================
+    def _handle(self, conn):
+        try:
+            request = conn.recv()
+        except (OSError, EOFError):
+            conn.close()
+            return
+        command = request.get("cmd")
+        if command in ("next", "drain"):
+            # The job thread owns the connection from here on and closes it when the job is done.
+            conn.send({"type": "status", "state": "queued", "ahead": self.jobs.qsize() + (1 if self.current else 0)})
+            self.jobs.put((request, conn))
+            return
+        if command == "ping":
+            reply = {"type": "done", "ok": True, "pid": os.getpid(), "uptime": round(time.time() - self.started),
+                     "completed": self.completed, "waiting": self.jobs.qsize(), "current": self.current,
+                     "supervised": self.supervisor is not None}
+        elif command == "cancel":
+            if self.supervisor is None:
+                reply = {"type": "done", "ok": False, "error": "jobs aren't supervised (SHADOW_SUPERVISE=0), so they can't be cancelled"}
+            else:
+                reply = {"type": "done", "ok": True, "cancelled": self.supervisor.cancel()}
+        elif command == "stop":
+            self.running = False
+            self.jobs.put(None)
+            reply = {"type": "done", "ok": True}
+        else:
+            reply = {"type": "done", "ok": False, "error": f"unknown command '{command}'"}
+        try:
+            conn.send(reply)
+        finally:
+            conn.close()
+
+    # ==========================================
+    # 🚀 PHASE 3: RUNNING A JOB
+    # ==========================================
+    def _run(self, request, conn):
+        platform, username = request.get("platform"), request.get("user") or "default"
+        self.current = f"{request['cmd']} {platform or 'ALL'} for {username}"
+        stream = _ClientStream(conn, sys.__stdout__)
+        ok, error, result = True, None, None
+        previous_stdout, sys.stdout = sys.stdout, stream
+        try:
+            try:
+                conn.send({"type": "status", "state": "running"})
+            except (OSError, ValueError):
+                stream.conn = None # the client gave up while waiting in line; run the job anyway
+            if self.supervisor is not None:
+                result = self.supervisor.run(platform, username, drain=request["cmd"] == "drain")
+            elif request["cmd"] == "drain":
+                result = self.main.drain(platform, username, p=self.playwright)
+            else:
+                result = self.main.main(platform, username, p=self.playwright)
+        except Exception as e:
+            ok, error = False, str(e)
+            print(f"❌ Critical Error: {e}")
+            if self.playwright is not None:
+                # The driver may be what broke. A fresh one costs a second; a dead one costs every later job.
+                self._stop_playwright()
+                self._start_playwright()
+        finally:
+            sys.stdout = previous_stdout
+            self.current = None
+            self.completed += 1
+        try:
+            if stream.conn is not None:
+                conn.send({"type": "done", "ok": ok, "error": error, "result": result})
+            conn.close()
+        except (OSError, ValueError):
+            pass
+
+
+# ==========================================
+# 📞 CLIENT SIDE (used by main.py and ui.py)
+# ==========================================
+def request(message, on_log=None):
+    """
+    Sends one request and follows it to the end. Log lines are passed to on_log as they arrive.
+    Returns the final reply, or None if no service is running (or it vanished mid-job).
+    """
+    key = _authkey()
+    if key is None:
+        return None
+    try:
+        conn = Client((SERVICE_HOST, SERVICE_PORT), authkey=key)
+    except (OSError, EOFError, AuthenticationError):
+        return None
+    on_log = on_log or (lambda text: (sys.stdout.write(text), sys.stdout.flush()))
+    try:
+        conn.send(message)
+        while True:
+            event = conn.recv()
+            if event["type"] == "log":
+                # Replayed under the job's platform tag, so the caller's own log filters still work.
+                with log_context.platform(event.get("platform") or log_context.current_platform()):
+                    on_log(event["text"])
+            elif event["type"] == "status":
+                if event["state"] == "queued" and event.get("ahead"):
+                    on_log(f"⏳ Poster service is busy: {event['ahead']} job(s) ahead of this one.\n")
+                elif event["state"] == "running":
+                    on_log("🔌 Running on the warm poster service...\n")
+            else:
+                return event
+    except (OSError, EOFError):
+        on_log("⚠️ Lost the connection to the poster service.\n")
+        return None
+    finally:
+        conn.close()
+
+
+def ping():
+    return request({"cmd": "ping"})
+
+
+def submit_job(platform=None, username="default", drain=False, on_log=None):
+    """Runs main.main() / main.drain() on the service. None means 'no service, run it yourself'."""
+    return request({"cmd": "drain" if drain else "next", "platform": platform, "user": username}, on_log)
+
+
+def cancel_job():
+    """Kills the job the service is running right now. None means no service is running."""
+    return request({"cmd": "cancel"})
+
+
+def ensure_running(wait_seconds=30):
+    """Starts the service in the background if it isn't up yet. Returns True once it answers."""
+    if ping():
+        return True
+    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+    log = open(LOG_PATH, 'a', encoding='utf-8')
+    options = {}
+    if sys.platform == "win32":
+        options["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+    else:
+        options["start_new_session"] = True  # survives the UI being closed
+    subprocess.Popen([sys.executable, os.path.abspath(__file__), "start"], cwd=os.getcwd(),
+                     stdin=subprocess.DEVNULL, stdout=log, stderr=log, **options)
+    log.close()
+    deadline = time.time() + wait_seconds
+    while time.time() < deadline:
+        time.sleep(0.25)
+        if ping():
+            return True
+    return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shadow Poster - warm background poster service")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("start", help="run the service in this terminal")
+    sub.add_parser("status", help="is it running, and what is it doing")
+    sub.add_parser("cancel", help="kill the job that's running right now (the rest of the queue is untouched)")
+    sub.add_parser("stop", help="stop a running service (after the current job)")
+    args = parser.parse_args()
+
+    if args.command == "start":
+        if ping():
+            print("⚠️ The poster service is already running.")
+            sys.exit(1)
+        try:
+            PosterService().serve()
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "status":
+        reply = ping()
+        if not reply:
+            print("💤 No poster service is running.")
+        else:
+            print(f"🔌 Running (pid {reply['pid']}, up {reply['uptime']}s, {reply['completed']} job(s) done, "
+                  f"{reply['waiting']} waiting). Now: {reply['current'] or 'idle'}")
+    elif args.command == "cancel":
+        reply = cancel_job()
+        if not reply:
+            print("💤 No poster service is running.")
+        elif not reply.get("ok"):
+            print(f"⚠️ Can't cancel: {reply['error']}")
+        else:
+            print("⛔ Cancelling the running job." if reply["cancelled"] else "💤 No job is running right now.")
+    else:
+        reply = request({"cmd": "stop"})
+        print("🔔 Stopping after the current job." if reply else "💤 No poster service is running.")
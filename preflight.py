@@ -0,0 +1,347 @@
+"""
+SHADOW POSTER - MEDIA PREFLIGHT
+Catches bad media BEFORE we spend 30-60 seconds booting Chrome and scrolling a feed.
+We never decode the file: we only read the container headers (MP4/MOV atoms,
+JPEG/PNG/GIF headers) to learn the duration, dimensions, codec and size, then check
+them against each platform's upload limits.
+
+Probe results are cached in cache/preflight_cache.json keyed by (path, mtime, size),
+so a 500MB video is only ever probed once until you replace it.
+
+    python preflight.py            (check every pending row in the queue)
+    python preflight.py media/x.mp4 --platform tiktok
+"""
+
+import argparse
+import os
+import struct
+import sys
+import threading
+
+import json_cache
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+CACHE_PATH = os.path.join(os.getcwd(), "cache", "preflight_cache.json")
+
+MB = 1024 * 1024
+GB = 1024 * MB
+
+# ==========================================
+# 📏 PLATFORM LIMITS
+# ==========================================
+# What each platform's web uploader accepts. None means 'no limit we know of'.
+# 'video: None' / 'image: None' means that kind of media isn't supported by our poster at all.
+PLATFORM_LIMITS = {
+    'x': {
+        'image': {'max_bytes': 5 * MB, 'formats': {'jpeg', 'png', 'gif'},
+                  'min_aspect': 1 / 3, 'max_aspect': 3.0},
+        'video': {'max_bytes': 512 * MB, 'min_duration': 0.5, 'max_duration': 140,
+                  'codecs': {'avc1'}, 'max_width': 1920, 'max_height': 1920,
+                  'min_aspect': 1 / 3, 'max_aspect': 3.0},
+    },
+    'ig': {
+        'image': {'max_bytes': 8 * MB, 'formats': {'jpeg', 'png'},
+                  'min_aspect': 0.8, 'max_aspect': 1.91},
+        'video': {'max_bytes': 4 * GB, 'min_duration': 3, 'max_duration': 15 * 60,
+                  'codecs': {'avc1', 'hvc1', 'hev1'}, 'max_width': None, 'max_height': None,
+                  'min_aspect': 0.5625, 'max_aspect': 1.91},
+    },
+    'tiktok': {
+        'image': None,
+        'video': {'max_bytes': 10 * GB, 'min_duration': 1, 'max_duration': 60 * 60,
+                  'codecs': {'avc1', 'hvc1', 'hev1'}, 'max_width': 4096, 'max_height': 4096,
+                  'min_aspect': 0.4, 'max_aspect': 2.5},
+    },
+}
+
+
+# ==========================================
+# 🔬 HEADER PARSERS
+# ==========================================
+# MP4 boxes we need to descend into to reach the track headers and sample descriptions.
+_CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+# Anything bigger than this claiming to be 'moov' is almost certainly a corrupt file.
+_MAX_MOOV_BYTES = 64 * MB
+
+
+def _iter_boxes(data, offset=0, end=None):
+    """Yields (type, payload_start, payload_end) for MP4 boxes inside an in-memory buffer."""
+    end = len(data) if end is None else end
+    while offset + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+
+
+def _find_moov(file, file_size):
+    """
+    Walks the top-level boxes by SEEKING over them, so a multi-GB 'mdat' costs one seek.
+    Returns the raw bytes of the 'moov' box payload, or None.
+    """
+    offset = 0
+    while offset + 8 <= file_size:
+        file.seek(offset)
+        header = file.read(16)
+        if len(header) < 8:
+            return None
+        size, box_type = struct.unpack(">I4s", header[:8])
+        header_len = 8
+        if size == 1:
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_len = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header_len:
+            return None
+        if box_type == b'moov':
+            if size > _MAX_MOOV_BYTES:
+                return None
+            file.seek(offset + header_len)
+            return file.read(size - header_len)
+        offset += size
+    return None
+
+
+def _probe_mp4(file, file_size):
+    moov = _find_moov(file, file_size)
+    if moov is None:
+        return {'kind': 'video', 'container': 'mp4', 'error': "no 'moov' atom (file truncated or not an MP4)"}
+
+    info = {'kind': 'video', 'container': 'mp4', 'duration': None, 'width': None, 'height': None,
+            'codec': None, 'audio_codec': None}
+
+    def walk(start, end, track):
+        for box_type, p_start, p_end in _iter_boxes(moov, start, end):
+            if box_type == b'mvhd':
+                version = moov[p_start]
+                if version == 1:
+                    timescale, duration = struct.unpack(">IQ", moov[p_start + 20:p_start + 32])
+                else:
+                    timescale, duration = struct.unpack(">II", moov[p_start + 12:p_start + 20])
+                if timescale:
+                    info['duration'] = round(duration / timescale, 3)
+            elif box_type == b'tkhd':
+                # The 3x3 matrix sits after the times/ids/layer/volume fields, then width and height (16.16 fixed point).
+                version = moov[p_start]
+                matrix_start = p_start + (52 if version == 1 else 40)
+                matrix = struct.unpack(">9i", moov[matrix_start:matrix_start + 36])
+                width, height = struct.unpack(">II", moov[matrix_start + 36:matrix_start + 44])
+                track['width'], track['height'] = width >> 16, height >> 16
+                # A 90/270 degree rotation matrix (phone videos!) means the displayed frame is turned on its side.
+                track['rotated'] = matrix[0] == 0 and abs(matrix[1]) == 0x10000
+            elif box_type == b'hdlr':
+                track['handler'] = moov[p_start + 8:p_start + 12]
+            elif box_type == b'stsd':
+                # version/flags (4) + entry count (4), then the first entry: size (4) + format (4)
+                track['codec'] = moov[p_start + 12:p_start + 16].decode('latin-1').strip()
+            elif box_type in _CONTAINER_BOXES:
+                if box_type == b'trak':
+                    child = {}
+                    walk(p_start, p_end, child)
+                    if child.get('handler') == b'vide' and info['codec'] is None:
+                        width, height = child.get('width'), child.get('height')
+                        if child.get('rotated'):
+                            width, height = height, width
+                        info.update(width=width, height=height, codec=child.get('codec'))
+                    elif child.get('handler') == b'soun' and info['audio_codec'] is None:
+                        info['audio_codec'] = child.get('codec')
+                else:
+                    walk(p_start, p_end, track)
+
+    walk(0, len(moov), {})
+    return info
+
+
+def _probe_jpeg(file):
+    file.seek(2)
+    while True:
+        marker = file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return {'kind': 'image', 'codec': 'jpeg', 'error': 'corrupt JPEG header'}
+        code = marker[1]
+        if code == 0xFF:
+            # Padding byte between markers, step forward one byte.
+            file.seek(-1, os.SEEK_CUR)
+            continue
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue
+        length = struct.unpack(">H", file.read(2))[0]
+        # SOF0..SOF15 carry the frame size (C4/C8/CC are other tables that share the range).
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            _, height, width = struct.unpack(">BHH", file.read(5))
+            return {'kind': 'image', 'codec': 'jpeg', 'width': width, 'height': height}
+        file.seek(length - 2, os.SEEK_CUR)
+
+
+def probe_file(path):
+    """Reads just enough of the file to describe it. Never loads the whole thing."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        head = file.read(32)
+        try:
+            if head[:8] == b'\x89PNG\r\n\x1a\n':
+                width, height = struct.unpack(">II", head[16:24])
+                info = {'kind': 'image', 'codec': 'png', 'width': width, 'height': height}
+            elif head[:6] in (b'GIF87a', b'GIF89a'):
+                width, height = struct.unpack("<HH", head[6:10])
+                info = {'kind': 'image', 'codec': 'gif', 'width': width, 'height': height}
+            elif head[:3] == b'\xff\xd8\xff':
+                info = _probe_jpeg(file)
+            elif head[4:8] in (b'ftyp', b'moov', b'mdat', b'free', b'wide', b'skip'):
+                info = _probe_mp4(file, size)
+            else:
+                info = {'kind': 'unknown', 'error': 'not a JPEG, PNG, GIF or MP4/MOV file'}
+        except (struct.error, IndexError):
+            # A header that ends mid-field: the file was cut off during download/copy.
+            info = {'kind': 'unknown', 'error': 'truncated or corrupt media header'}
+    info['size_bytes'] = size
+    return info
+
+
+# ==========================================
+# 🗃️ PROBE CACHE
+# ==========================================
+_cache_lock = threading.Lock()
+_cache = None
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        _cache = json_cache.load(CACHE_PATH)
+    return _cache
+
+
+def _save_cache():
+    json_cache.save(CACHE_PATH, _cache)
+
+
+def probe(path):
+    """probe_file() with the (path, mtime, size) cache in front of it."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _cache_lock:
+        cache = _load_cache()
+        entry = cache.get(path)
+        if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+            return entry['info']
+
+    info = probe_file(path)
+    with _cache_lock:
+        cache[path] = {'mtime': stat.st_mtime, 'size': stat.st_size, 'info': info}
+        _save_cache()
+    return info
+
+
+# ==========================================
+# ✅ THE VERDICT
+# ==========================================
+def check_media(platform, path):
+    """
+    Returns a list of human-readable problems (empty list = good to go).
+    Missing information (e.g. an exotic codec we can't read) is not treated as a problem.
+    """
+    limits = PLATFORM_LIMITS.get(platform)
+    if limits is None or not path:
+        return []
+    try:
+        info = probe(path)
+    except OSError as e:
+        return [f"can't read media: {e}"]
+
+    if info.get('error'):
+        return [info['error']]
+
+    kind = info['kind']
+    rules = limits.get(kind)
+    if rules is None:
+        return [f"{platform.upper()} posting doesn't support {kind} files"]
+
+    problems = []
+    size = info['size_bytes']
+    if rules.get('max_bytes') and size > rules['max_bytes']:
+        problems.append(f"file is {size / MB:.1f}MB, limit is {rules['max_bytes'] / MB:.0f}MB")
+
+    if kind == 'image' and info.get('codec') not in rules['formats']:
+        problems.append(f"image format '{info.get('codec')}' not accepted (use {', '.join(sorted(rules['formats']))})")
+
+    if kind == 'video':
+        duration = info.get('duration')
+        if duration is not None:
+            if rules.get('min_duration') and duration < rules['min_duration']:
+                problems.append(f"video is {duration:.1f}s, minimum is {rules['min_duration']}s")
+            if rules.get('max_duration') and duration > rules['max_duration']:
+                problems.append(f"video is {duration:.0f}s, maximum is {rules['max_duration']}s")
+        codec = info.get('codec')
+        if codec and rules.get('codecs') and codec not in rules['codecs']:
+            problems.append(f"video codec '{codec}' not accepted (use {', '.join(sorted(rules['codecs']))})")
+        width, height = info.get('width'), info.get('height')
+        if width and rules.get('max_width') and width > rules['max_width']:
+            problems.append(f"video is {width}px wide, maximum is {rules['max_width']}px")
+        if height and rules.get('max_height') and height > rules['max_height']:
+            problems.append(f"video is {height}px tall, maximum is {rules['max_height']}px")
+
+    width, height = info.get('width'), info.get('height')
+    if width and height:
+        aspect = width / height
+        if rules.get('min_aspect') and aspect < rules['min_aspect'] - 0.01:
+            problems.append(f"aspect ratio {width}x{height} is too tall (min {rules['min_aspect']:.2f}:1)")
+        if rules.get('max_aspect') and aspect > rules['max_aspect'] + 0.01:
+            problems.append(f"aspect ratio {width}x{height} is too wide (max {rules['max_aspect']:.2f}:1)")
+
+    return problems
+
+
+def describe(info):
+    if info.get('error'):
+        return info['error']
+    parts = [info.get('kind', '?'), info.get('codec') or '?']
+    if info.get('width'):
+        parts.append(f"{info['width']}x{info['height']}")
+    if info.get('duration') is not None:
+        parts.append(f"{info['duration']:.1f}s")
+    parts.append(f"{info['size_bytes'] / MB:.1f}MB")
+    return ", ".join(parts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check media files against platform upload limits without opening a browser")
+    parser.add_argument("path", nargs="?", help="a single file to check (default: every pending row in the queue)")
+    parser.add_argument("--platform", choices=sorted(PLATFORM_LIMITS), default=None)
+    args = parser.parse_args()
+
+    if args.path:
+        targets = [(args.platform, args.path, None)]
+    else:
+        from content_manager import ContentManager
+        targets = [((row.get('platform') or '').strip().lower(), row['image_path'].strip(), row.get('id'))
+                   for row in ContentManager().iter_rows(['pending']) if (row.get('image_path') or '').strip()]
+
+    bad = 0
+    for platform, path, post_id in targets:
+        label = f"#{post_id} " if post_id else ""
+        if not os.path.exists(path):
+            print(f"❌ {label}{path}: file not found")
+            bad += 1
+            continue
+        print(f"🔬 {label}{path}: {describe(probe(path))}")
+        for plat in ([platform] if platform else sorted(PLATFORM_LIMITS)):
+            problems = check_media(plat, path)
+            if problems:
+                bad += 1
+                print(f"   ❌ {plat.upper()}: " + "; ".join(problems))
+            else:
+                print(f"   ✅ {plat.upper()}: OK")
+    sys.exit(1 if bad else 0)
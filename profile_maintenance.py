@@ -0,0 +1,298 @@
+"""
+SHADOW POSTER - PROFILE MAINTENANCE
+Every job boots Chrome on Profiles/<user>/<Platform>_Profile. Chrome keeps piling caches
+into those folders (HTTP cache, compiled code, GPU shaders, Service Worker caches...), which
+eats disk and makes every browser start slower. None of that is needed to stay logged in.
+
+    python profile_maintenance.py report                       (size per profile and per part)
+    python profile_maintenance.py prune                        (delete the caches, keep the logins)
+    python profile_maintenance.py prune --user brand_account --platform tiktok --measure
+    python profile_maintenance.py prune --dry-run              (just show what would go)
+
+Pruning never touches cookies, local/session storage, IndexedDB or saved logins, and it
+skips any profile Chrome currently has open. --measure times a real browser start on the
+profile before and after, so you can see what the cleanup bought you.
+
+Set SHADOW_PROFILE_MAX_MB (e.g. 1500) and main.py prunes a profile by itself, right before
+launching it, whenever it has grown past that size.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import sys
+import time
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROFILES_ROOT = os.path.join(os.getcwd(), "Profiles")
+HISTORY_PATH = os.path.join(os.getcwd(), "logs", "profile_maintenance.jsonl")
+AUTO_PRUNE_MB = float(os.environ.get("SHADOW_PROFILE_MAX_MB", "0"))
+AUTO_CHECK_SECONDS = 3600 # a long-running service re-measures a profile at most once an hour
+
+# component -> folders inside each Chrome profile ('Default', 'Profile 1', ...). Chrome rebuilds all of these.
+CACHE_COMPONENTS = {
+    'http_cache': ["Cache"],
+    'code_cache': ["Code Cache"],
+    'gpu_cache': ["GPUCache", "DawnCache", "DawnGraphiteCache", "DawnWebGPUCache"],
+    'service_worker_cache': ["Service Worker/CacheStorage", "Service Worker/ScriptCache"],
+    'media_cache': ["Media Cache"],
+}
+# component -> folders at the top of the user-data dir (shared by all its profiles). Also rebuildable.
+ROOT_CACHE_COMPONENTS = {
+    'shader_cache': ["ShaderCache", "GrShaderCache", "GraphiteDawnCache"],
+    'crash_reports': ["Crashpad/reports", "Crashpad/completed"],
+}
+# What keeps you logged in. Only reported, never deleted.
+SESSION_COMPONENTS = {
+    'cookies': ["Cookies", "Cookies-journal", "Network/Cookies", "Network/Cookies-journal"],
+    'local_storage': ["Local Storage"],
+    'session_storage': ["Session Storage"],
+    'indexeddb': ["IndexedDB"],
+    'logins': ["Login Data", "Login Data-journal", "Web Data", "Web Data-journal"],
+}
+
+_last_auto_check = {}
+
+
+def _size(path):
+    """Bytes used by a file or a whole folder (0 if it doesn't exist)."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for folder, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(folder, name))
+            except OSError:
+                pass # a file Chrome just removed
+    return total
+
+
+def mb(size):
+    return size / (1024 * 1024)
+
+
+def chrome_profiles(user_data_dir):
+    """The Chrome profile folders inside a user-data dir (normally just 'Default')."""
+    found = []
+    try:
+        entries = list(os.scandir(user_data_dir))
+    except OSError:
+        return found
+    for entry in entries:
+        if entry.is_dir() and (entry.name == "Default" or entry.name.startswith("Profile ")):
+            found.append(entry.path)
+    return found
+
+
+def find_profiles(username=None, platform=None):
+    """Profiles/<user>/<X|IG|TikTok>_Profile folders, optionally only one user / platform."""
+    folder_filter = None
+    if platform:
+        from main import PLATFORMS
+        folder_filter = PLATFORMS[platform][3]
+    found = []
+    if not os.path.isdir(PROFILES_ROOT):
+        return found
+    for user in sorted(os.listdir(PROFILES_ROOT)):
+        if username and user != username:
+            continue
+        user_dir = os.path.join(PROFILES_ROOT, user)
+        if not os.path.isdir(user_dir):
+            continue
+        for folder in sorted(os.listdir(user_dir)):
+            path = os.path.join(user_dir, folder)
+            if folder.endswith("_Profile") and os.path.isdir(path) and (folder_filter is None or folder == folder_filter):
+                found.append(path)
+    return found
+
+
+def profile_in_use(user_data_dir):
+    """True if a Chrome is running on this profile right now (pruning under it would break it)."""
+    lock = os.path.join(user_data_dir, "SingletonLock") # Mac / Linux: a symlink to 'hostname-pid'
+    if os.path.lexists(lock):
+        try:
+            host, _, pid = os.readlink(lock).rpartition("-")
+            if host != socket.gethostname():
+                return True # another machine's Chrome (shared drive): don't risk it
+            os.kill(int(pid), 0)
+            return True
+        except (OSError, ValueError):
+            return False # stale lock from a crashed Chrome
+    lock = os.path.join(user_data_dir, "lockfile") # Windows: held open by the running Chrome
+    if os.path.exists(lock):
+        try:
+            os.remove(lock)
+        except OSError:
+            return True
+    return False
+
+
+# ==========================================
+# 📊 PHASE 1: WHAT IS TAKING THE SPACE
+# ==========================================
+def _component_paths(user_data_dir, components, inside_profiles):
+    bases = chrome_profiles(user_data_dir) if inside_profiles else [user_data_dir]
+    for name, relative_paths in components.items():
+        yield name, [os.path.join(base, *rel.split("/")) for base in bases for rel in relative_paths]
+
+
+def measure_profile(user_data_dir):
+    """{'total': bytes, 'components': {name: bytes}, 'prunable': bytes} for one profile."""
+    components = {}
+    prunable = 0
+    for group, inside, is_cache in ((CACHE_COMPONENTS, True, True), (ROOT_CACHE_COMPONENTS, False, True),
+                                    (SESSION_COMPONENTS, True, False)):
+        for name, paths in _component_paths(user_data_dir, group, inside):
+            size = sum(_size(path) for path in paths if os.path.exists(path))
+            components[name] = size
+            if is_cache:
+                prunable += size
+    total = _size(user_data_dir)
+    components['other'] = max(0, total - sum(components.values()))
+    return {'total': total, 'components': components, 'prunable': prunable}
+
+
+def print_report(profiles):
+    if not profiles:
+        print(f"📭 No profiles found under {PROFILES_ROOT}.")
+        return
+    grand_total = grand_prunable = 0
+    for path in profiles:
+        stats = measure_profile(path)
+        grand_total += stats['total']
+        grand_prunable += stats['prunable']
+        busy = "  (in use)" if profile_in_use(path) else ""
+        print(f"\n🗂️ {os.path.relpath(path)}  {mb(stats['total']):,.1f} MB  (prunable {mb(stats['prunable']):,.1f} MB){busy}")
+        for name, size in sorted(stats['components'].items(), key=lambda item: -item[1]):
+            if not size:
+                continue
+            marker = "✂️" if name in CACHE_COMPONENTS or name in ROOT_CACHE_COMPONENTS else ("🔒" if name in SESSION_COMPONENTS else "  ")
+            print(f"   {marker} {name:<22} {mb(size):>10,.1f} MB")
+    print(f"\n📦 {len(profiles)} profile(s), {mb(grand_total):,.1f} MB in total, {mb(grand_prunable):,.1f} MB of it prunable.")
+
+
+# ==========================================
+# ✂️ PHASE 2: PRUNING
+# ==========================================
+def prune_profile(user_data_dir, dry_run=False):
+    """Deletes the cache folders. Returns the bytes freed, or None if the profile is in use."""
+    if profile_in_use(user_data_dir):
+        print(f"⏭️ {os.path.relpath(user_data_dir)} is open in Chrome right now. Skipping it.")
+        return None
+    freed = 0
+    for group, inside in ((CACHE_COMPONENTS, True), (ROOT_CACHE_COMPONENTS, False)):
+        for _, paths in _component_paths(user_data_dir, group, inside):
+            for path in paths:
+                if not os.path.exists(path):
+                    continue
+                size = _size(path)
+                if dry_run:
+                    freed += size
+                    continue
+                try:
+                    if os.path.isdir(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+                    freed += size
+                except OSError as e:
+                    print(f"⚠️ Couldn't remove {path}: {e}")
+    return freed
+
+
+def measure_startup(user_data_dir, runs=1):
+    """Seconds for main.launch_browser() to hand over a usable page on this profile (best of `runs`)."""
+    import main
+    best = None
+    with main.playwright_session() as p:
+        for _ in range(runs):
+            began = time.perf_counter()
+            context, page = main.launch_browser(p, user_data_dir)
+            try:
+                page.goto("about:blank")
+                elapsed = time.perf_counter() - began
+            finally:
+                context.close()
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _record(entry):
+    try:
+        os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+        with open(HISTORY_PATH, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"⚠️ Couldn't write the maintenance history: {e}")
+
+
+def prune(profiles, dry_run=False, measure=False, runs=1, reason="manual"):
+    total_freed = 0
+    for path in profiles:
+        name = os.path.relpath(path)
+        before = measure_profile(path)['total']
+        startup_before = measure_startup(path, runs) if measure and not dry_run else None
+        freed = prune_profile(path, dry_run)
+        if freed is None:
+            continue
+        total_freed += freed
+        verb = "would free" if dry_run else "freed"
+        print(f"✂️ {name}: {verb} {mb(freed):,.1f} MB ({mb(before):,.1f} -> {mb(before - freed):,.1f} MB)")
+        if dry_run:
+            continue
+        entry = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "profile": name, "reason": reason,
+                 "size_before_mb": round(mb(before), 1), "freed_mb": round(mb(freed), 1)}
+        if startup_before is not None:
+            startup_after = measure_startup(path, runs)
+            entry.update(startup_before_s=round(startup_before, 2), startup_after_s=round(startup_after, 2))
+            print(f"   ⏱️ Browser start: {startup_before:.2f}s before, {startup_after:.2f}s after "
+                  f"({startup_after - startup_before:+.2f}s)")
+        _record(entry)
+    print(f"🧹 {'Would free' if dry_run else 'Freed'} {mb(total_freed):,.1f} MB in total.")
+    return total_freed
+
+
+def maybe_auto_prune(user_data_dir):
+    """
+    Called by main.py right before a profile is launched. If SHADOW_PROFILE_MAX_MB is set and
+    the profile has grown past it, its caches are pruned first. Cheap when there's nothing to do.
+    """
+    if AUTO_PRUNE_MB <= 0 or not os.path.isdir(user_data_dir):
+        return
+    now = time.time()
+    if now - _last_auto_check.get(user_data_dir, 0) < AUTO_CHECK_SECONDS:
+        return
+    _last_auto_check[user_data_dir] = now
+    size = mb(_size(user_data_dir))
+    if size <= AUTO_PRUNE_MB:
+        return
+    print(f"🧹 {os.path.relpath(user_data_dir)} is {size:,.0f} MB (limit {AUTO_PRUNE_MB:,.0f} MB). Pruning its caches first...")
+    prune([user_data_dir], reason="auto")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report on and prune the saved browser profiles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, description in (("report", "size per profile and per part"), ("prune", "delete the caches, keep the logins")):
+        command = sub.add_parser(name, help=description)
+        command.add_argument("--user", default=None, help="only this account (default: all)")
+        command.add_argument("--platform", choices=["ig", "tiktok", "x"], default=None)
+    prune_parser = sub.choices["prune"]
+    prune_parser.add_argument("--dry-run", action="store_true", help="show what would be deleted, delete nothing")
+    prune_parser.add_argument("--measure", action="store_true", help="time a browser start before and after")
+    prune_parser.add_argument("--runs", type=int, default=1, help="browser starts per measurement (best is kept)")
+    args = parser.parse_args()
+
+    profiles = find_profiles(args.user, args.platform)
+    if args.command == "report":
+        print_report(profiles)
+    elif not profiles:
+        print(f"📭 No profiles found under {PROFILES_ROOT}.")
+    else:
+        prune(profiles, args.dry_run, args.measure, args.runs)
@@ -0,0 +1,940 @@
+"""
+SHADOW POSTER - QUEUE BACKENDS
+These are the storage engines that sit behind the ContentManager.
+The CSV backend is the classic 'edit content.csv by hand' workflow. The SQLite
+backend keeps the exact same queue in an indexed database so finding the next job
+and flipping one status no longer means re-reading (and rewriting) the whole file.
+"""
+
+import contextlib
+import csv
+import itertools
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+try:
+    import fcntl   # POSIX file locks
+    msvcrt = None
+except ImportError:
+    fcntl = None
+    import msvcrt  # Windows file locks
+
+# The columns every queue row is guaranteed to have, in the order content.csv uses them.
+FIELDNAMES = ["id", "platform", "username", "caption", "image_path", "status"]
+
+# Bookkeeping columns the bot adds by itself the first time a job fails.
+RETRY_FIELDNAMES = ["attempts", "last_error", "next_attempt_at"]
+
+# Optional scheduling columns: when a post may go out, and which post wins a tie (higher first).
+SCHEDULE_FIELDNAMES = ["scheduled_at", "priority"]
+
+# Where the evidence bundle of the job's latest failure is (see artifacts.py).
+ARTIFACT_FIELDNAMES = ["artifact_path"]
+
+# Timestamps are stored as plain local 'YYYY-MM-DD HH:MM:SS' text: readable in Excel
+# and, because every field has a fixed width, they sort correctly as strings too.
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# CSV backend safety: how long a writer waits for another one, and when the status journal
+# (content.csv.journal) is folded back into content.csv.
+LOCK_TIMEOUT = 30
+REPLACE_RETRIES = 10
+JOURNAL_MAX_ENTRIES = int(os.environ.get("SHADOW_CSV_JOURNAL_MAX", "200"))
+JOURNAL_MAX_SECONDS = float(os.environ.get("SHADOW_CSV_JOURNAL_SECONDS", "600"))
+
+
+def now_stamp(offset_seconds=0):
+    return time.strftime(TIME_FORMAT, time.localtime(time.time() + offset_seconds))
+
+
+def parse_stamp(text):
+    """
+    Reads a hand-typed time like '2026-05-01 18:30', '2026-05-01T18:30:00' or '2026-05-01'.
+    Returns epoch seconds, None for an empty cell, and raises ValueError for garbage.
+    """
+    text = (text or "").strip().replace("T", " ")
+    if not text:
+        return None
+    for fmt in (TIME_FORMAT, "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(text, fmt))
+        except ValueError:
+            pass
+    raise ValueError(f"Unreadable time '{text}' (use YYYY-MM-DD HH:MM)")
+
+
+def normalize_stamp(text):
+    """Rewrites any accepted time format into the canonical TIME_FORMAT ('' stays '')."""
+    epoch = parse_stamp(text)
+    return "" if epoch is None else time.strftime(TIME_FORMAT, time.localtime(epoch))
+
+
+def row_matches(row, platform_name=None, username=None, now=None):
+    """
+    The one rule that decides if a row is 'next in line' for a given platform/user.
+    Shared by both backends so they can never disagree about what 'pending' means.
+    """
+    # We clean the text with .strip() and .lower() so a stray space like " Pending "
+    # or a capital "X" doesn't break our strict logic.
+    status = (row.get('status') or '').strip().lower()
+    platform = (row.get('platform') or '').strip().lower()
+    row_user = (row.get('username') or '').strip()
+
+    # If a username is specified and the row has one, they must match.
+    # If the row has no username it can be posted by any user.
+    if username and row_user and row_user != username:
+        return False
+
+    # A job that failed recently is still 'pending', but it sits out its backoff window first.
+    now = now or now_stamp()
+    next_attempt_at = (row.get('next_attempt_at') or '').strip()
+    if next_attempt_at and next_attempt_at > now:
+        return False
+
+    # Scheduled posts stay invisible until their time comes. An unreadable time never fires.
+    try:
+        scheduled_at = normalize_stamp(row.get('scheduled_at'))
+    except ValueError:
+        return False
+    if scheduled_at and scheduled_at > now:
+        return False
+
+    return status == 'pending' and (platform_name is None or platform == platform_name)
+
+
+def priority_of(row):
+    """The row's priority as a number (higher goes first). Blank or unreadable counts as 0."""
+    try:
+        return int(row.get('priority') or 0)
+    except ValueError:
+        return 0
+
+
+def failure_update(attempts, error, max_attempts, backoff_seconds):
+    """
+    Works out the new bookkeeping values for a job that just failed for the Nth time.
+    Returns the dict of fields to write back to the row.
+    """
+    # Errors can be whole stack traces; keep the queue readable.
+    error = " ".join(str(error or "").split())[:300]
+    fields = {"attempts": str(attempts), "last_error": error}
+    if attempts >= max_attempts:
+        # Out of retries. 'failed' is terminal: nothing picks it up until someone requeues it.
+        fields["status"] = "failed"
+        fields["next_attempt_at"] = ""
+    else:
+        fields["next_attempt_at"] = now_stamp(backoff_seconds(attempts))
+    return fields
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        if file.tell() == 0:
+            return True
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) in (b"\n", b"\r")
+
+
+def _with_columns(header, overlay, fields=None):
+    """The CSV header plus any column the journal (or `fields`) introduces, like 'attempts' after a first failure."""
+    fieldnames = list(header or FIELDNAMES)
+    for changes in list(overlay.values()) + [fields or {}]:
+        fieldnames += [name for name in changes if name not in fieldnames]
+    return fieldnames
+
+
+class QueueLockTimeout(TimeoutError):
+    """Another thread or process kept the queue locked for longer than LOCK_TIMEOUT."""
+
+
+def _try_lock(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+def _unlock(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class QueueLock:
+    """
+    An exclusive lock on a lock file (content.csv.lock), so only one writer at a time touches
+    the CSV, whether the others are threads in this process (UI batch runs) or other processes
+    (a CLI run, the scheduler, the poster service). Re-entrant within a thread, so a locked
+    method can call another one. Use for_path() so every backend on the same file shares it.
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path):
+        key = os.path.normcase(os.path.abspath(path))
+        with cls._registry_lock:
+            if key not in cls._registry:
+                cls._registry[key] = cls(path)
+            return cls._registry[key]
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        if not self._thread_lock.acquire(timeout=LOCK_TIMEOUT):
+            raise QueueLockTimeout(f"{self.path} stayed locked by another thread for over {LOCK_TIMEOUT}s")
+        if self._depth == 0:
+            try:
+                self._file = self._lock_file()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                _unlock(self._file)
+            finally:
+                self._file.close()
+                self._file = None
+        self._thread_lock.release()
+
+    def _lock_file(self):
+        file = open(self.path, 'a+b')
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                _try_lock(file)
+                return file
+            except OSError:
+                if time.monotonic() > deadline:
+                    file.close()
+                    raise QueueLockTimeout(f"{self.path} stayed locked by another process for over {LOCK_TIMEOUT}s")
+                time.sleep(0.05)
+
+
+def _replace(tmp_path, path):
+    """os.replace, retried for a moment: on Windows it fails while someone is still reading the old file."""
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(tmp_path, path)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(0.2)
+
+
+def atomic_write(path, write):
+    """
+    Calls write(file) on a temp file next to `path`. If it returns something truthy, the temp
+    file is fsynced and swapped in over `path` with one rename, so a crash at any moment leaves
+    either the old file or the new one, never half of either. Returns write()'s result.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode='w', encoding='utf-8', newline='') as file:
+            result = write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        if result:
+            _replace(tmp_path, path)
+            if hasattr(os, "O_DIRECTORY"):
+                # Make the rename itself survive a power cut (POSIX only; Windows has no directory handles).
+                folder = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(folder)
+                finally:
+                    os.close(folder)
+        return result
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class CSVQueueBackend:
+    """
+    The original behaviour: content.csv IS the queue. Writes are crash-safe and locked:
+      - every writer holds content.csv.lock, so a UI batch run and a CLI run can't drop each other's updates
+      - whole-file rewrites go to a temp file, are fsynced and renamed over content.csv in one step
+      - single-row changes (done, failed, paused...) are appended to content.csv.journal instead of
+        rewriting the file, and folded back into content.csv every so often (compact())
+    Readers always see content.csv with the journal applied.
+    """
+
+    name = "csv"
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.journal_path = csv_path + ".journal"
+        self.lock = QueueLock.for_path(csv_path + ".lock")
+        # (journal size after our last append, entries, first entry's ts): lets _journal_due() count
+        # without re-reading the journal, as long as nobody else has written to it since.
+        self._journal_stats = None
+        # (content.csv's stat signature, {ids}): which ids exist, rebuilt only when the file changes.
+        self._ids = None
+
+    def exists(self):
+        return os.path.exists(self.csv_path)
+
+    # ==========================================
+    # 📓 THE STATUS JOURNAL
+    # ==========================================
+    def _journal(self):
+        """{post id: {column: value}} from the journal, later entries winning."""
+        overlay = {}
+        try:
+            with open(self.journal_path, mode='r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                        overlay.setdefault(str(entry['id']), {}).update(entry['fields'])
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        continue # a line torn by a crash mid-append; everything before it is intact
+        except FileNotFoundError:
+            pass
+        return overlay
+
+    def _append_journal(self, post_id, fields):
+        """Records one row's change as one fsynced line. The caller holds the lock."""
+        ts = round(time.time(), 3)
+        line = json.dumps({"id": str(post_id), "fields": fields, "ts": ts}, ensure_ascii=False)
+        try:
+            size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            size = 0
+        if size and not _ends_with_newline(self.journal_path):
+            line = "\n" + line # don't glue this entry onto a torn one
+        with open(self.journal_path, mode='a', encoding='utf-8', newline='') as file:
+            file.write(line + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+            new_size = file.tell()
+        if self._journal_due(size, new_size, ts):
+            try:
+                self.compact()
+            except OSError as e:
+                # e.g. content.csv is open in Excel on Windows. Nothing is lost; we try again next time.
+                print(f"⚠️ Couldn't fold the status journal into {os.path.basename(self.csv_path)} yet: {e}")
+
+    def _journal_due(self, size_before, size_after, ts):
+        """
+        True once the journal is long enough, or old enough, to be folded back into the CSV.
+        The entry count is kept in memory; the file is only re-read when its size shows that
+        another process wrote to it (or compacted it) since our last append.
+        """
+        stats = self._journal_stats
+        if size_before == 0:
+            entries, first_ts = 1, ts
+        elif stats is not None and stats[0] == size_before:
+            entries, first_ts = stats[1] + 1, stats[2]
+        else:
+            with open(self.journal_path, mode='r', encoding='utf-8') as file:
+                first = file.readline()
+                entries = 1 + sum(1 for _ in file)
+            try:
+                first_ts = json.loads(first)['ts']
+            except (ValueError, KeyError, TypeError):
+                first_ts = ts
+        self._journal_stats = (size_after, entries, first_ts)
+        return entries >= JOURNAL_MAX_ENTRIES or time.time() - first_ts >= JOURNAL_MAX_SECONDS
+
+    def _csv_signature(self):
+        stat = os.stat(self.csv_path)
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _has_id(self, post_id):
+        """
+        Is there a row with this id? The journal never adds rows, so the answer only changes when
+        content.csv itself does: the id index is rebuilt then, not on every status update.
+        """
+        try:
+            signature = self._csv_signature()
+        except FileNotFoundError:
+            return False
+        if self._ids is None or self._ids[0] != signature:
+            with open(self.csv_path, mode='r', encoding='utf-8', newline='') as file:
+                ids = {row.get('id') for row in csv.DictReader(file)}
+            self._ids = (signature, ids)
+        return str(post_id) in self._ids[1]
+
+    def compact(self):
+        """Folds the journal into content.csv (one atomic rewrite) and starts a fresh one. Returns the rows changed."""
+        with self.lock:
+            if not os.path.exists(self.journal_path):
+                return 0
+            overlay = self._journal()
+            changed = 0
+            if overlay and self.exists():
+                ids = set()
+
+                def write(out):
+                    nonlocal changed
+                    with open(self.csv_path, mode='r', encoding='utf-8', newline='') as src:
+                        reader = csv.DictReader(src)
+                        fieldnames = _with_columns(reader.fieldnames, overlay)
+                        writer = csv.DictWriter(out, fieldnames=fieldnames)
+                        writer.writeheader()
+                        for row in reader:
+                            ids.add(row.get('id'))
+                            if row.get('id') in overlay:
+                                row.update(overlay[row['id']])
+                                changed += 1
+                            writer.writerow(row)
+                    return True
+                atomic_write(self.csv_path, write)
+                self._ids = (self._csv_signature(), ids) # we just read every id anyway
+            # Only now: a crash before this line just means the (idempotent) journal gets applied twice.
+            os.remove(self.journal_path)
+            return changed
+
+    # ==========================================
+    # 📖 READING
+    # ==========================================
+    def get_next_post(self, platform_name=None, username=None):
+        """The highest-priority due row; among equals, the first one in the file."""
+        now = now_stamp()
+        # The rows are streamed, so only the best match so far is kept in memory.
+        best, best_priority = None, None
+        with contextlib.closing(self.iter_rows()) as rows:
+            for row in rows:
+                if row_matches(row, platform_name, username, now):
+                    priority = priority_of(row)
+                    if best is None or priority > best_priority:
+                        best, best_priority = row, priority
+        return best
+
+    def iter_pending(self, platform_name=None, username=None):
+        """
+        One pass over the file for a whole batch run, highest priority first, then file order.
+        We collect the matches first and close the file before handing them out, because the
+        caller will be rewriting it.
+        """
+        now = now_stamp()
+        matches = [row for row in self.iter_rows() if row_matches(row, platform_name, username, now)]
+        matches.sort(key=priority_of, reverse=True) # stable: equal priorities keep their file order
+        yield from matches
+
+    def iter_rows(self, statuses=None):
+        """Every row (optionally only those whose status is in `statuses`), in file order."""
+        # Journal first, CSV second: if a compaction slips in between, the journal is merely redundant.
+        overlay = self._journal()
+        with open(self.csv_path, mode='r', encoding='utf-8', newline='') as file:
+            for row in csv.DictReader(file):
+                changes = overlay.get(row.get('id'))
+                if changes:
+                    row.update(changes)
+                if statuses is None or (row.get('status') or '').strip().lower() in statuses:
+                    yield row
+
+    def get_post(self, post_id):
+        with contextlib.closing(self.iter_rows()) as rows:
+            for row in rows:
+                if row.get('id') == str(post_id):
+                    return row
+        return None
+
+    # ==========================================
+    # ✏️ WRITING
+    # ==========================================
+    def update_fields(self, post_id, fields):
+        """Changes some columns of one row (one journal line, not a rewrite). New columns are added at compaction."""
+        with self.lock:
+            if not self._has_id(post_id):
+                return False
+            self._append_journal(post_id, dict(fields))
+        return True
+
+    def update_status(self, post_id, status):
+        return self.update_fields(post_id, {'status': status})
+
+    def next_id(self):
+        """One more than the biggest numeric id in the file (1 for an empty queue)."""
+        ids = [int(row['id']) for row in self.iter_rows() if (row.get('id') or '').strip().isdigit()] if self.exists() else []
+        return max(ids, default=0) + 1
+
+    def append_rows(self, rows, fieldnames):
+        """
+        Adds new rows to the end of the file, streamed from any iterable, and gives them fresh ids.
+        The new rows are first spooled to a side file (without the lock, so a slow import never holds
+        up the bot's status updates). Then, under the lock, the ids are handed out and content.csv +
+        the new rows are written to a temp copy and swapped in with one rename: the queue shows either
+        the whole batch or none of it. Returns (first id, last id), or (None, None) if there were no rows.
+        """
+        fieldnames = list(fieldnames) if 'id' in fieldnames else ['id'] + list(fieldnames)
+        spool_path = f"{self.csv_path}.{os.getpid()}.incoming"
+        appended = 0
+        first_id = None
+        try:
+            with open(spool_path, mode='w', encoding='utf-8', newline='') as spool:
+                writer = csv.DictWriter(spool, fieldnames=list(fieldnames), extrasaction='ignore')
+                for row in rows:
+                    writer.writerow(row)
+                    appended += 1
+            if not appended:
+                return None, None
+
+            with self.lock:
+                self.compact() # the byte-for-byte copy below must not leave journal entries behind
+                # Read under the lock: another import (or the UI) appending at the same time waits its turn.
+                first_id = self.next_id()
+
+                def write(out):
+                    if self.exists():
+                        with open(self.csv_path, mode='r', encoding='utf-8', newline='') as src:
+                            header = next(csv.reader(src), None) or list(FIELDNAMES)
+                        missing = [name for name in fieldnames if name not in header]
+                        with open(self.csv_path, mode='r', encoding='utf-8', newline='') as src:
+                            if missing:
+                                # New columns: every existing row needs the extra (empty) cells too.
+                                header += missing
+                                writer = csv.DictWriter(out, fieldnames=header)
+                                writer.writeheader()
+                                writer.writerows(csv.DictReader(src))
+                            else:
+                                # Same columns: copy the existing bytes untouched (fast, and hand-edits survive).
+                                shutil.copyfileobj(src, out, 1024 * 1024)
+                                if out.tell() and not _ends_with_newline(self.csv_path):
+                                    out.write("\r\n")
+                                writer = csv.DictWriter(out, fieldnames=header, extrasaction='ignore')
+                    else:
+                        header = list(FIELDNAMES) + [name for name in fieldnames if name not in FIELDNAMES]
+                        writer = csv.DictWriter(out, fieldnames=header, extrasaction='ignore')
+                        writer.writeheader()
+                    with open(spool_path, mode='r', encoding='utf-8', newline='') as spool:
+                        for offset, row in enumerate(csv.DictReader(spool, fieldnames=fieldnames)):
+                            row['id'] = str(first_id + offset)
+                            writer.writerow(row)
+                    return True
+
+                atomic_write(self.csv_path, write)
+        finally:
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+        return first_id, first_id + appended - 1
+
+    def count_by_status(self):
+        """{status: number of rows}, from one streaming pass."""
+        return dict(Counter((row.get('status') or '').strip().lower() for row in self.iter_rows()))
+
+    def read_page(self, offset, limit, statuses=None):
+        """Rows offset .. offset+limit-1 of the queue (optionally only some statuses). Stops reading once the page is full."""
+        with contextlib.closing(self.iter_rows(statuses)) as rows:
+            return list(itertools.islice(rows, offset, offset + limit))
+
+    def update_many(self, post_ids, fields, only_statuses=None):
+        """
+        Sets the same columns on many rows in ONE streamed, atomic rewrite (which also folds in
+        the journal), instead of one journal line per row. Rows whose status isn't in
+        `only_statuses` are left alone. Returns how many rows changed.
+        """
+        wanted = {str(post_id) for post_id in post_ids}
+        changed = 0
+        with self.lock:
+            overlay = self._journal()
+
+            def write(out):
+                nonlocal changed
+                with open(self.csv_path, mode='r', encoding='utf-8', newline='') as src:
+                    reader = csv.DictReader(src)
+                    fieldnames = _with_columns(reader.fieldnames, overlay, fields)
+                    writer = csv.DictWriter(out, fieldnames=fieldnames)
+                    writer.writeheader()
+                    for row in reader:
+                        row.update(overlay.get(row.get('id'), {}))
+                        if row.get('id') in wanted and (only_statuses is None or (row.get('status') or '').strip().lower() in only_statuses):
+                            row.update(fields)
+                            changed += 1
+                        writer.writerow(row)
+                return changed or overlay
+
+            if atomic_write(self.csv_path, write) and os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+        return changed
+
+    def record_failure(self, post_id, error, max_attempts, backoff_seconds, extra=None):
+        # Read-modify-write of 'attempts' under the lock, so two runners can't both write 'attempts = 2'.
+        with self.lock:
+            row = self.get_post(post_id)
+            if row is None:
+                return None
+            fields = failure_update(int(row.get('attempts') or 0) + 1, error, max_attempts, backoff_seconds)
+            fields.update(extra or {})
+            self._append_journal(post_id, fields)
+            return fields
+
+
+class SQLiteQueueBackend:
+    """
+    The same queue, stored in content.db. Every lookup goes through an index and
+    every status change is a single-row transaction, so the UI thread and a CLI run
+    can both write without stomping on each other's updates.
+    """
+
+    name = "sqlite"
+
+    # column name -> SQL type. New columns added here are migrated into old databases automatically.
+    COLUMNS = {
+        "id": "TEXT NOT NULL UNIQUE",
+        "platform": "TEXT NOT NULL DEFAULT ''",
+        "username": "TEXT NOT NULL DEFAULT ''",
+        "caption": "TEXT NOT NULL DEFAULT ''",
+        "image_path": "TEXT NOT NULL DEFAULT ''",
+        "status": "TEXT NOT NULL DEFAULT 'pending'",
+        "attempts": "INTEGER NOT NULL DEFAULT 0",
+        "last_error": "TEXT NOT NULL DEFAULT ''",
+        "next_attempt_at": "TEXT NOT NULL DEFAULT ''",
+        "scheduled_at": "TEXT NOT NULL DEFAULT ''",
+        "priority": "INTEGER NOT NULL DEFAULT 0",
+        "artifact_path": "TEXT NOT NULL DEFAULT ''",
+    }
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._init_schema()
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    def _connect(self):
+        # A fresh connection per call keeps us safe across the UI's worker threads.
+        # The 30s timeout makes a second writer wait its turn instead of erroring out.
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        try:
+            # WAL lets readers keep reading while a status update is being written.
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f"{name} {sql_type}" for name, sql_type in self.COLUMNS.items())
+            # 'seq' remembers the original file order, so 'next in queue' means the same thing as in the CSV.
+            conn.execute(f"CREATE TABLE IF NOT EXISTS posts (seq INTEGER PRIMARY KEY AUTOINCREMENT, {columns})")
+            existing = {r["name"] for r in conn.execute("PRAGMA table_info(posts)")}
+            for name, sql_type in self.COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE posts ADD COLUMN {name} {sql_type.replace('UNIQUE', '')}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_queue ON posts (status, platform, username)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(record):
+        """Hands rows back exactly like csv.DictReader would: plain strings, no None."""
+        row = {}
+        for key in record.keys():
+            if key == "seq":
+                continue
+            value = record[key]
+            row[key] = "" if value is None else str(value)
+        return row
+
+    def count(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        finally:
+            conn.close()
+
+    def get_next_post(self, platform_name=None, username=None):
+        conn = self._connect()
+        try:
+            record = conn.execute(
+                """
+                SELECT * FROM posts
+                WHERE status = 'pending'
+                  AND (:platform IS NULL OR platform = :platform)
+                  AND (:username IS NULL OR username = '' OR username = :username)
+                  AND next_attempt_at <= :now
+                  AND scheduled_at <= :now
+                ORDER BY priority DESC, seq
+                LIMIT 1
+                """,
+                {"platform": platform_name, "username": username or None, "now": now_stamp()},
+            ).fetchone()
+            return self._to_dict(record) if record else None
+        finally:
+            conn.close()
+
+    def iter_pending(self, platform_name=None, username=None, page_size=100):
+        """
+        Walks the pending rows, highest priority first and then in queue order, with a keyset
+        cursor ('everything after (priority P, seq N)'). Each page is a short read, so no
+        transaction is held open while a post is being made.
+        """
+        last_priority, last_seq = None, 0
+        now = now_stamp()
+        while True:
+            conn = self._connect()
+            try:
+                records = conn.execute(
+                    """
+                    SELECT * FROM posts
+                    WHERE status = 'pending'
+                      AND (:last_priority IS NULL OR priority < :last_priority
+                           OR (priority = :last_priority AND seq > :last_seq))
+                      AND (:platform IS NULL OR platform = :platform)
+                      AND (:username IS NULL OR username = '' OR username = :username)
+                      AND next_attempt_at <= :now
+                      AND scheduled_at <= :now
+                    ORDER BY priority DESC, seq
+                    LIMIT :limit
+                    """,
+                    {"platform": platform_name, "username": username or None, "last_priority": last_priority,
+                     "last_seq": last_seq, "limit": page_size, "now": now},
+                ).fetchall()
+            finally:
+                conn.close()
+            if not records:
+                return
+            last_priority, last_seq = records[-1]["priority"], records[-1]["seq"]
+            for record in records:
+                yield self._to_dict(record)
+
+    def iter_rows(self, statuses=None):
+        """Every row (optionally only those whose status is in `statuses`), in queue order."""
+        conn = self._connect()
+        try:
+            if statuses is None:
+                cursor = conn.execute("SELECT * FROM posts ORDER BY seq")
+            else:
+                statuses = list(statuses)
+                cursor = conn.execute(
+                    f"SELECT * FROM posts WHERE status IN ({', '.join('?' for _ in statuses)}) ORDER BY seq",
+                    statuses,
+                )
+            for record in cursor:
+                yield self._to_dict(record)
+        finally:
+            conn.close()
+
+    def get_post(self, post_id):
+        conn = self._connect()
+        try:
+            record = conn.execute("SELECT * FROM posts WHERE id = ?", (str(post_id),)).fetchone()
+            return self._to_dict(record) if record else None
+        finally:
+            conn.close()
+
+    def update_fields(self, post_id, fields):
+        """Changes some columns of one row, in one transaction."""
+        names = [name for name in fields if name in self.COLUMNS and name != "id"]
+        if not names:
+            return False
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    f"UPDATE posts SET {', '.join(f'{n} = ?' for n in names)} WHERE id = ?",
+                    [fields[n] for n in names] + [str(post_id)],
+                )
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    def update_status(self, post_id, status):
+        return self.update_fields(post_id, {"status": status})
+
+    def record_failure(self, post_id, error, max_attempts, backoff_seconds, extra=None):
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front, so two runners failing the same
+            # job can't both read 'attempts = 1' and both write 'attempts = 2'.
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                record = conn.execute("SELECT attempts FROM posts WHERE id = ?", (str(post_id),)).fetchone()
+                if record is None:
+                    conn.execute("ROLLBACK")
+                    return None
+                fields = failure_update(int(record["attempts"] or 0) + 1, error, max_attempts, backoff_seconds)
+                fields.update({name: value for name, value in (extra or {}).items() if name in self.COLUMNS})
+                conn.execute(
+                    f"UPDATE posts SET {', '.join(f'{n} = ?' for n in fields)} WHERE id = ?",
+                    list(fields.values()) + [str(post_id)],
+                )
+                conn.execute("COMMIT")
+                return fields
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _next_id(conn):
+        record = conn.execute("SELECT MAX(CAST(id AS INTEGER)) FROM posts WHERE id NOT GLOB '*[^0-9]*'").fetchone()
+        return (record[0] or 0) + 1
+
+    def next_id(self):
+        conn = self._connect()
+        try:
+            return self._next_id(conn)
+        finally:
+            conn.close()
+
+    def append_rows(self, rows, fieldnames=None):
+        """
+        Adds new rows at the end of the queue in ONE transaction (all of them or none) and gives them
+        fresh ids. BEGIN IMMEDIATE holds the write lock from picking the first id to the commit, so two
+        imports can't hand out the same ids. Returns (first id, last id), or (None, None) for no rows.
+        """
+        appended = 0
+        conn = self._connect()
+        try:
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                first_id = self._next_id(conn)
+                for row in rows:
+                    values = self._normalize(row)
+                    values["id"] = str(first_id + appended)
+                    names = [n for n in self.COLUMNS if n in values]
+                    conn.execute(
+                        f"INSERT INTO posts ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})",
+                        [values[n] for n in names],
+                    )
+                    appended += 1
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        return (first_id, first_id + appended - 1) if appended else (None, None)
+
+    def count_by_status(self):
+        conn = self._connect()
+        try:
+            return {record[0]: record[1] for record in conn.execute("SELECT status, COUNT(*) FROM posts GROUP BY status")}
+        finally:
+            conn.close()
+
+    def read_page(self, offset, limit, statuses=None):
+        """Rows offset .. offset+limit-1 in queue order (optionally only some statuses)."""
+        statuses = list(statuses or [])
+        where = f"WHERE status IN ({', '.join('?' for _ in statuses)})" if statuses else ""
+        conn = self._connect()
+        try:
+            records = conn.execute(f"SELECT * FROM posts {where} ORDER BY seq LIMIT ? OFFSET ?",
+                                   statuses + [limit, offset]).fetchall()
+            return [self._to_dict(record) for record in records]
+        finally:
+            conn.close()
+
+    def update_many(self, post_ids, fields, only_statuses=None):
+        """One UPDATE per few hundred ids, all in one transaction. Returns how many rows changed."""
+        values = self._normalize(fields)
+        names = [name for name in values if name != "id"]
+        ids = [str(post_id) for post_id in post_ids]
+        if not names or not ids:
+            return 0
+        statuses = list(only_statuses or [])
+        changed = 0
+        conn = self._connect()
+        try:
+            with conn:
+                for start in range(0, len(ids), 500): # SQLite limits the number of ? in one statement
+                    chunk = ids[start:start + 500]
+                    sql = (f"UPDATE posts SET {', '.join(f'{n} = ?' for n in names)} "
+                           f"WHERE id IN ({', '.join('?' for _ in chunk)})")
+                    if statuses:
+                        sql += f" AND status IN ({', '.join('?' for _ in statuses)})"
+                    changed += conn.execute(sql, [values[n] for n in names] + chunk + statuses).rowcount
+        finally:
+            conn.close()
+        return changed
+
+    # ==========================================
+    # 🔁 CSV IMPORT / EXPORT
+    # ==========================================
+    def import_csv(self, csv_path):
+        """
+        Loads content.csv into the database. Rows are matched on 'id', so re-importing
+        the same file updates existing rows instead of duplicating them.
+        """
+        imported = 0
+        conn = self._connect()
+        try:
+            with conn, open(csv_path, mode='r', encoding='utf-8', newline='') as file:
+                for row in csv.DictReader(file):
+                    values = self._normalize(row)
+                    if not values.get("id"):
+                        continue
+                    names = [n for n in self.COLUMNS if n in values]
+                    placeholders = ", ".join("?" for _ in names)
+                    updates = ", ".join(f"{n} = excluded.{n}" for n in names if n != "id")
+                    conn.execute(
+                        f"INSERT INTO posts ({', '.join(names)}) VALUES ({placeholders}) "
+                        f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                        [values[n] for n in names],
+                    )
+                    imported += 1
+        finally:
+            conn.close()
+        return imported
+
+    def export_csv(self, csv_path):
+        """Writes the whole queue back out in content.csv format (queue order preserved)."""
+        conn = self._connect()
+        try:
+            records = conn.execute("SELECT * FROM posts ORDER BY seq").fetchall()
+        finally:
+            conn.close()
+        fieldnames = [n for n in self.COLUMNS]
+        tmp_path = csv_path + ".tmp"
+        with open(tmp_path, mode='w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            for record in records:
+                writer.writerow(self._to_dict(record))
+        # Swap the finished file in one move so a half-written export never replaces the real one.
+        os.replace(tmp_path, csv_path)
+        return len(records)
+
+    def _normalize(self, row):
+        values = {}
+        for name in self.COLUMNS:
+            if name in row and row[name] is not None:
+                # Captions are kept byte-for-byte; everything else gets the usual whitespace trim.
+                values[name] = str(row[name]) if name == "caption" else str(row[name]).strip()
+        # Same cleaning the CSV reader does on every lookup, done once at import time instead.
+        if "platform" in values:
+            values["platform"] = values["platform"].lower()
+        if "status" in values:
+            values["status"] = values["status"].lower() or "pending"
+        if "attempts" in values:
+            values["attempts"] = int(values["attempts"]) if values["attempts"].isdigit() else 0
+        if "priority" in values:
+            try:
+                values["priority"] = int(values["priority"] or 0)
+            except ValueError:
+                values["priority"] = 0
+        if "scheduled_at" in values:
+            # Stored in one canonical format so 'scheduled_at <= now' works as a plain string compare.
+            try:
+                values["scheduled_at"] = normalize_stamp(values["scheduled_at"])
+            except ValueError as e:
+                print(f"⚠️ Row #{values.get('id')}: {e}. Parking it as 'paused'.")
+                values["scheduled_at"] = ""
+                values["status"] = "paused"
+        return values
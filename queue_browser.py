@@ -0,0 +1,313 @@
+"""
+SHADOW POSTER - QUEUE BROWSER
+A window onto the posting queue for the control panel, so nobody has to open a
+100,000-row content.csv by hand just to see what's pending.
+
+  - rows are fetched from the queue backend a page at a time, only when scrolled into view
+  - the table only ever holds the rows on screen (the scrollbar is 'virtual')
+  - the per-status counts refresh by themselves whenever the queue changes
+  - bulk actions on the selected rows: requeue failed, cancel, set priority
+
+Every queue read and write happens on ONE worker thread; only the Tk main loop touches widgets.
+"""
+
+import collections
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, simpledialog
+
+from content_manager import ContentManager
+
+PAGE_SIZE = 200      # rows fetched from the backend in one go
+CACHED_PAGES = 20    # pages kept in memory (least recently shown are dropped first)
+VISIBLE_ROWS = 20    # rows actually drawn
+REFRESH_MS = 2000    # how often we check whether the queue changed on disk
+POLL_MS = 50         # how often finished worker results are picked up
+
+# column -> (heading, width)
+COLUMNS = {
+    'id': ("ID", 60),
+    'status': ("Status", 80),
+    'platform': ("Platform", 65),
+    'username': ("User", 100),
+    'scheduled_at': ("Scheduled", 130),
+    'priority': ("Prio", 45),
+    'attempts': ("Tries", 45),
+    'caption': ("Caption", 300),
+}
+STATUS_FILTERS = ["All", "pending", "paused", "needs_login", "failed", "completed", "cancelled"]
+
+
+class QueueBrowser:
+    def __init__(self, root, cm=None):
+        self.cm = cm or ContentManager()
+        self.window = tk.Toplevel(root)
+        self.window.title("Shadow Poster - Queue")
+        self.window.geometry("900x560")
+        self.alive = True
+
+        self.tasks = queue.SimpleQueue()    # (function, on_done) for the worker thread
+        self.results = queue.SimpleQueue()  # (on_done, value) back to the main loop
+        threading.Thread(target=self._worker, daemon=True).start()
+
+        self.statuses = None          # None = every status
+        self.counts = {}
+        self.total = 0                # rows matching the filter
+        self.offset = 0               # index of the first row on screen
+        self.pages = collections.OrderedDict()  # page number -> rows
+        self.requested = set()        # page numbers on their way from the worker
+        self.generation = 0           # bumped whenever cached pages become stale
+        self.signature = None
+        self.checking = False
+        self.recheck = False
+        self.visible = {}             # treeview item -> post id
+        self.selected = set()         # post ids, kept across pages
+
+        # ---------------------
+        # TOP: COUNTS + FILTER
+        # ---------------------
+        top = ttk.Frame(self.window, padding=(10, 10, 10, 5))
+        top.pack(fill=tk.X)
+        self.counts_var = tk.StringVar(value="Counting...")
+        ttk.Label(top, textvariable=self.counts_var).pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar(value="All")
+        status_box = ttk.Combobox(top, textvariable=self.filter_var, values=STATUS_FILTERS, state="readonly", width=12)
+        status_box.pack(side=tk.RIGHT)
+        status_box.bind("<<ComboboxSelected>>", lambda _: self.set_filter(self.filter_var.get()))
+        ttk.Label(top, text="Show: ").pack(side=tk.RIGHT)
+
+        # ---------------------
+        # MIDDLE: THE VIRTUAL TABLE
+        # ---------------------
+        middle = ttk.Frame(self.window, padding=(10, 0))
+        middle.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(middle, columns=list(COLUMNS), show="headings", height=VISIBLE_ROWS, selectmode="extended")
+        for name, (heading, width) in COLUMNS.items():
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width, stretch=(name == 'caption'))
+        # The scrollbar drives self.offset, not the tree: the tree never holds more than one screen of rows.
+        self.scrollbar = ttk.Scrollbar(middle, orient=tk.VERTICAL, command=self.on_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_to(self.offset - (3 if e.delta > 0 else -3)))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.offset - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.offset + 3))
+        self.tree.bind("<Prior>", lambda e: self.scroll_to(self.offset - VISIBLE_ROWS))
+        self.tree.bind("<Next>", lambda e: self.scroll_to(self.offset + VISIBLE_ROWS))
+
+        # ---------------------
+        # BOTTOM: BULK ACTIONS
+        # ---------------------
+        bottom = ttk.Frame(self.window, padding=10)
+        bottom.pack(fill=tk.X)
+        ttk.Button(bottom, text="🔁 Requeue Failed", command=self.requeue).pack(side=tk.LEFT)
+        ttk.Button(bottom, text="🚫 Cancel", command=self.cancel).pack(side=tk.LEFT, padx=5)
+        ttk.Button(bottom, text="⬆️ Set Priority...", command=self.reprioritize).pack(side=tk.LEFT)
+        ttk.Button(bottom, text="🔄 Refresh", command=lambda: self.check_for_changes(force=True)).pack(side=tk.LEFT, padx=5)
+        self.selection_var = tk.StringVar(value="")
+        ttk.Label(bottom, textvariable=self.selection_var).pack(side=tk.RIGHT)
+
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.window.after(POLL_MS, self._poll)
+        self._refresh_loop()
+
+    # ==========================================
+    # 🧵 WORKER THREAD
+    # ==========================================
+    def _worker(self):
+        while True:
+            function, on_done = self.tasks.get()
+            if function is None:
+                return
+            try:
+                value = function()
+            except Exception as e:
+                value = e
+            self.results.put((on_done, value))
+
+    def submit(self, function, on_done):
+        self.tasks.put((function, on_done))
+
+    def _poll(self):
+        if not self.alive:
+            return
+        while True:
+            try:
+                on_done, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(value, Exception):
+                print(f"❌ Queue browser: {value}")
+                self.checking = False
+                self.requested.clear() # let a failed page be asked for again
+                continue
+            on_done(value)
+        self.window.after(POLL_MS, self._poll)
+
+    # ==========================================
+    # 📊 COUNTS & CHANGE DETECTION
+    # ==========================================
+    def _refresh_loop(self):
+        if self.alive:
+            self.check_for_changes()
+            self.window.after(REFRESH_MS, self._refresh_loop)
+
+    def check_for_changes(self, force=False):
+        """Recounts (and drops the cached pages) only when the queue files actually changed."""
+        if force:
+            self.signature = None
+        if self.checking:
+            self.recheck = self.recheck or force
+            return
+        self.checking = True
+        known = self.signature
+
+        def look():
+            signature = self.cm.signature()
+            if signature == known:
+                return None
+            return signature, self.cm.count_by_status()
+
+        self.submit(look, self._on_counts)
+
+    def _on_counts(self, result):
+        self.checking = False
+        if self.recheck:
+            self.recheck = False
+            self.check_for_changes(force=True)
+        if result is None:
+            return
+        self.signature, self.counts = result
+        parts = [f"{status or 'blank'} {count:,}" for status, count in sorted(self.counts.items(), key=lambda item: -item[1])]
+        self.counts_var.set("  ·  ".join(parts + [f"total {sum(self.counts.values()):,}"]))
+        self._invalidate()
+
+    def _invalidate(self):
+        self.generation += 1
+        self.pages.clear()
+        self.requested.clear()
+        if self.statuses is None:
+            self.total = sum(self.counts.values())
+        else:
+            self.total = sum(self.counts.get(status, 0) for status in self.statuses)
+        self.scroll_to(self.offset)
+
+    def set_filter(self, choice):
+        self.statuses = None if choice == "All" else (choice,)
+        self.offset = 0
+        self._invalidate()
+
+    # ==========================================
+    # 📜 VIRTUAL SCROLLING
+    # ==========================================
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.total))
+        elif action == "scroll":
+            self.scroll_to(self.offset + int(amount) * (VISIBLE_ROWS if unit == "pages" else 1))
+
+    def scroll_to(self, first):
+        self.offset = max(0, min(first, self.total - VISIBLE_ROWS))
+        self.render()
+
+    def _row_at(self, index):
+        page_number = index // PAGE_SIZE
+        page = self.pages.get(page_number)
+        if page is None:
+            self.fetch_page(page_number)
+            return None
+        self.pages.move_to_end(page_number)
+        position = index % PAGE_SIZE
+        return page[position] if position < len(page) else None
+
+    def fetch_page(self, page_number):
+        if page_number in self.requested or page_number * PAGE_SIZE >= self.total:
+            return
+        self.requested.add(page_number)
+        generation, statuses = self.generation, self.statuses
+
+        def on_done(rows):
+            if generation != self.generation:
+                return # the queue or the filter changed while this page was loading
+            self.requested.discard(page_number)
+            self.pages[page_number] = rows
+            while len(self.pages) > CACHED_PAGES:
+                self.pages.popitem(last=False)
+            self.render()
+
+        self.submit(lambda: self.cm.read_page(page_number * PAGE_SIZE, PAGE_SIZE, statuses), on_done)
+
+    def render(self):
+        last = min(self.offset + VISIBLE_ROWS, self.total)
+        rows = [(index, self._row_at(index)) for index in range(self.offset, last)]
+        # Load the next page a little before it's needed, so steady scrolling never shows 'loading'.
+        self.fetch_page((last + VISIBLE_ROWS) // PAGE_SIZE)
+
+        self.tree.delete(*self.tree.get_children())
+        self.visible = {}
+        for index, row in rows:
+            item = f"row{index}"
+            if row is None:
+                self.tree.insert("", tk.END, iid=item, values=("…", "loading"))
+                continue
+            caption = " ".join((row.get('caption') or "").split())
+            values = [row.get(name) or "" for name in COLUMNS if name != 'caption'] + [caption[:120]]
+            self.tree.insert("", tk.END, iid=item, values=values)
+            self.visible[item] = row.get('id')
+        self.tree.selection_set([item for item, post_id in self.visible.items() if post_id in self.selected])
+
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, last / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def on_select(self, _event=None):
+        chosen = set(self.tree.selection())
+        for item, post_id in self.visible.items():
+            if item in chosen:
+                self.selected.add(post_id)
+            else:
+                self.selected.discard(post_id)
+        self.selection_var.set(f"{len(self.selected):,} selected" if self.selected else "")
+
+    # ==========================================
+    # 🛠️ BULK ACTIONS
+    # ==========================================
+    def _run_action(self, function):
+        def on_done(_changed):
+            self.selected.clear()
+            self.selection_var.set("")
+            self.check_for_changes(force=True)
+        self.submit(function, on_done)
+
+    def requeue(self):
+        ids = sorted(self.selected)
+        if not ids:
+            if not messagebox.askyesno("Requeue failed", "Nothing is selected. Requeue EVERY failed post?", parent=self.window):
+                return
+            ids = None
+        self._run_action(lambda: self.cm.requeue_failed(ids))
+
+    def cancel(self):
+        ids = sorted(self.selected)
+        if not ids:
+            messagebox.showinfo("Cancel", "Select the posts to cancel first.", parent=self.window)
+            return
+        if messagebox.askyesno("Cancel", f"Cancel {len(ids):,} post(s)? Only pending and paused ones are touched.", parent=self.window):
+            self._run_action(lambda: self.cm.cancel_posts(ids))
+
+    def reprioritize(self):
+        ids = sorted(self.selected)
+        if not ids:
+            messagebox.showinfo("Set priority", "Select the posts to change first.", parent=self.window)
+            return
+        priority = simpledialog.askinteger("Set priority", f"New priority for {len(ids):,} post(s) (higher goes first):", parent=self.window)
+        if priority is not None:
+            self._run_action(lambda: self.cm.reprioritize(ids, priority))
+
+    def close(self):
+        self.alive = False
+        self.tasks.put((None, None))
+        self.window.destroy()
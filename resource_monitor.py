@@ -0,0 +1,205 @@
+"""
+SHADOW POSTER - BROWSER RESOURCE MONITOR
+Samples CPU, memory (RSS) and open file handles of the whole Chrome process tree while
+a job runs, and stores the peak and average next to the job's timings in logs/timings.jsonl
+(see `python timing.py report`).
+
+Optional limits stop one runaway upload from taking the whole machine down with it:
+
+    SHADOW_CHROME_MAX_RSS_MB=3000   all Chrome processes together may use at most ~3 GB
+    SHADOW_CHROME_MAX_CPU=350       at most 3.5 cores' worth of CPU...
+    SHADOW_CHROME_CPU_SECONDS=30    ...for longer than 30 seconds in a row
+    SHADOW_CHROME_MAX_FDS=4000      open files/sockets (handles on Windows)
+
+When a limit is crossed the job is aborted at its next pause, with the usual failure
+screenshot, and counts as an ordinary failed attempt. Once the post has been submitted the
+job is never aborted (that could double-post); the breach is only recorded and the browser
+is recycled afterwards.
+
+Needs psutil (pip install psutil). Without it jobs run exactly as before, just unmeasured.
+"""
+
+import os
+import sys
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # optional: no numbers, no limits, nothing breaks
+    psutil = None
+
+SAMPLE_SECONDS = 1.0
+OVER_LIMIT_SAMPLES = 2 # RSS / handle limits must be crossed this many samples in a row (one blip is fine)
+
+LIMITS = {
+    'rss_mb': float(os.environ.get("SHADOW_CHROME_MAX_RSS_MB", "0")),
+    'cpu': float(os.environ.get("SHADOW_CHROME_MAX_CPU", "0")),
+    'fds': float(os.environ.get("SHADOW_CHROME_MAX_FDS", "0")),
+}
+CPU_SUSTAIN_SECONDS = float(os.environ.get("SHADOW_CHROME_CPU_SECONDS", "30"))
+
+# From here on the post may already be live, so a breach no longer aborts the job.
+NO_ABORT_PHASES = {"submit", "confirmation", "cooldown"}
+
+_warned_missing = False
+
+
+class ResourceLimitExceeded(Exception):
+    """Chrome went over one of the configured limits; the job is being aborted."""
+
+
+def _same_path(a, b):
+    return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+
+def _profile_of(proc):
+    for arg in proc.cmdline():
+        if arg.startswith("--user-data-dir="):
+            return arg.split("=", 1)[1].strip('"')
+    return None
+
+
+def browser_processes(profile_path=None):
+    """
+    The Chrome processes this Python process started (directly or via the Playwright driver).
+    With a profile path, only the browser running on that profile and all of its children.
+    """
+    chrome = []
+    for proc in psutil.Process().children(recursive=True):
+        try:
+            name = proc.name().lower()
+            if "chrom" in name or "headless_shell" in name:
+                chrome.append(proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    if not profile_path:
+        return chrome
+    tree = {}
+    for proc in chrome:
+        try:
+            profile = _profile_of(proc)
+            if profile and _same_path(profile, profile_path):
+                tree.setdefault(proc.pid, proc)
+                # Renderers / GPU / network helpers mostly don't carry the flag, so take the whole subtree.
+                for child in proc.children(recursive=True):
+                    tree.setdefault(child.pid, child)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return list(tree.values())
+
+
+class ResourceMonitor:
+    """
+    Start it when the job starts, stop() it when the job ends (returns the summary).
+    check() is the guard that the job's own thread calls between steps: it raises
+    ResourceLimitExceeded once a limit has been crossed, because only that thread may drive the page.
+    """
+
+    def __init__(self, profile_path=None, timer=None, limits=None, interval=SAMPLE_SECONDS):
+        self.profile_path = profile_path
+        self.timer = timer
+        self.limits = dict(LIMITS if limits is None else limits)
+        self.interval = interval
+        self.samples = []       # (rss_mb, cpu %, fds, processes)
+        self.breach = None      # why the job has to stop, once a limit is crossed
+        self._procs = {}        # pid -> psutil.Process (kept so cpu_percent() measures since the last sample)
+        self._over = {'rss_mb': 0, 'fds': 0}
+        self._cpu_over_since = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return psutil is not None
+
+    def start(self):
+        global _warned_missing
+        if not self.enabled:
+            if not _warned_missing and any(self.limits.values()):
+                print("⚠️ Chrome resource limits are set, but psutil isn't installed (pip install psutil). Not enforced.")
+                _warned_missing = True
+            return self
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    # ==========================================
+    # 📈 SAMPLING (background thread)
+    # ==========================================
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception:
+                pass # a process vanishing mid-sample is normal; never let the monitor hurt the job
+
+    def _sample(self):
+        current = {}
+        for proc in browser_processes(self.profile_path):
+            current[proc.pid] = self._procs.get(proc.pid, proc)
+        self._procs = current
+        rss = cpu = fds = 0
+        for proc in current.values():
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    cpu += proc.cpu_percent(None) # 0.0 the first time we see a process
+                    fds += proc.num_handles() if sys.platform == "win32" else proc.num_fds()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        if not current:
+            return
+        sample = (rss / (1024 * 1024), cpu, fds, len(current))
+        self.samples.append(sample)
+        self._check_limits(*sample[:3])
+
+    def _check_limits(self, rss_mb, cpu, fds):
+        if self.breach:
+            return
+        for key, value, unit in (('rss_mb', rss_mb, "MB RSS"), ('fds', fds, "open handles")):
+            limit = self.limits.get(key)
+            self._over[key] = self._over[key] + 1 if limit and value > limit else 0
+            if self._over[key] >= OVER_LIMIT_SAMPLES:
+                self.breach = f"Chrome over its resource limit: {value:.0f} {unit} > {limit:.0f}"
+                return
+        limit = self.limits.get('cpu')
+        if limit and cpu > limit:
+            self._cpu_over_since = self._cpu_over_since or time.monotonic()
+            if time.monotonic() - self._cpu_over_since >= CPU_SUSTAIN_SECONDS:
+                self.breach = f"Chrome over its resource limit: {cpu:.0f}% CPU for {CPU_SUSTAIN_SECONDS:.0f}s > {limit:.0f}%"
+        else:
+            self._cpu_over_since = None
+
+    # ==========================================
+    # 🛑 THE GUARD (job thread)
+    # ==========================================
+    def check(self):
+        if self.breach is None:
+            return
+        phase = self.timer.current_phase() if self.timer else None
+        if phase in NO_ABORT_PHASES:
+            return
+        raise ResourceLimitExceeded(self.breach)
+
+    def stop(self):
+        """Stops sampling and returns {peak/avg per metric, samples, limit_breach} (None if nothing was measured)."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2)
+        if not self.samples:
+            return None
+        columns = list(zip(*self.samples))
+        summary = {"samples": len(self.samples)}
+        for name, values, digits in (("rss_mb", columns[0], 0), ("cpu", columns[1], 0), ("fds", columns[2], 0)):
+            summary[f"peak_{name}"] = round(max(values), digits)
+            summary[f"avg_{name}"] = round(sum(values) / len(values), digits)
+        summary["peak_processes"] = max(columns[3])
+        summary["limit_breach"] = self.breach
+        return summary
+
+
+def describe(summary):
+    return (f"peak {summary['peak_rss_mb']:.0f} MB RSS / {summary['peak_cpu']:.0f}% CPU / {summary['peak_fds']:.0f} handles "
+            f"(avg {summary['avg_rss_mb']:.0f} MB / {summary['avg_cpu']:.0f}% / {summary['avg_fds']:.0f}) "
+            f"across {summary['peak_processes']} processes")
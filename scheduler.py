@@ -0,0 +1,264 @@
+"""
+SHADOW POSTER - SCHEDULER
+The always-on mode. Put a time in a row's 'scheduled_at' column (and optionally a
+'priority', higher goes first when two posts are due together) and leave this running:
+it keeps every upcoming post in a min-heap ordered by due time, sleeps until exactly the
+moment the next one is due, and posts it through the same poster classes as main.py.
+
+    python scheduler.py run --user brand_account     (start the daemon)
+    python scheduler.py list                         (what's coming up)
+    python scheduler.py pause 12 / resume 12         (hold back / release a post)
+    python scheduler.py reload                       (tell the daemon you edited the queue)
+
+The daemon listens on a local-only control port (127.0.0.1) so these commands can wake it up.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from content_manager import ContentManager
+from queue_backend import parse_stamp, priority_of, row_matches, TIME_FORMAT
+
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = int(os.environ.get("SHADOW_SCHEDULER_PORT", "47831"))
+
+
+def due_time(row):
+    """
+    When a row may go out: the later of its scheduled time and its retry backoff.
+    Returns None for rows that aren't scheduled at all (and aren't backing off).
+    """
+    times = [parse_stamp(row.get('scheduled_at')), parse_stamp(row.get('next_attempt_at'))]
+    times = [t for t in times if t is not None]
+    return max(times) if times else None
+
+
+def upcoming_jobs(cm, username=None, platform=None, include_unscheduled=False, include_paused=False, warned=None):
+    """
+    Lists (due_epoch, -priority, position, row) for everything the scheduler would post, soonest first.
+    Unscheduled rows only count when include_unscheduled is set (they are due 'now').
+    Pass a set as `warned` to only complain once about each unreadable row.
+    """
+    statuses = ['pending', 'paused'] if include_paused else ['pending']
+    jobs = []
+    for index, row in enumerate(cm.iter_rows(statuses)):
+        row_user = (row.get('username') or '').strip()
+        if username and row_user and row_user != username:
+            continue
+        if platform and (row.get('platform') or '').strip().lower() != platform:
+            continue
+        try:
+            due = due_time(row)
+        except ValueError as e:
+            if warned is None or row.get('id') not in warned:
+                print(f"⚠️ Skipping post #{row.get('id')}: {e}")
+                if warned is not None:
+                    warned.add(row.get('id'))
+            continue
+        if due is None:
+            if not include_unscheduled:
+                continue
+            due = time.time()
+        # (due, -priority, queue position) is the heap key: earliest first, then most important, then queue order.
+        jobs.append((due, -priority_of(row), index, row))
+    jobs.sort(key=lambda item: item[:3])
+    return jobs
+
+
+class Scheduler:
+    def __init__(self, username="default", platform=None, include_unscheduled=False):
+        self.username = username
+        self.platform = platform
+        self.include_unscheduled = include_unscheduled
+        self.cm = ContentManager()
+
+        self.heap = []
+        self.lock = threading.Lock()
+        # Set by the control port to cut a sleep short (new job added, job paused, stop requested...)
+        self.wake = threading.Event()
+        self.running = True
+        self.warned = set()
+
+    def reload(self):
+        """Rebuilds the heap from the queue. Cheap compared to a single browser launch."""
+        jobs = upcoming_jobs(self.cm, self.username, self.platform, self.include_unscheduled, warned=self.warned)
+        heap = [(due, neg_priority, index, row['id']) for due, neg_priority, index, row in jobs]
+        heapq.heapify(heap)
+        with self.lock:
+            self.heap = heap
+        return len(heap)
+
+    def snapshot(self):
+        with self.lock:
+            return sorted(self.heap)
+
+    def poke(self):
+        self.wake.set()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+
+    def run(self):
+        print(f"🗓️ Scheduler online for user '{self.username}' ({'ALL' if not self.platform else self.platform.upper()}).")
+        server = start_control_server(self)
+        print(f"🎛️ Control port listening on {CONTROL_HOST}:{CONTROL_PORT}")
+        try:
+            self.reload()
+            while self.running:
+                with self.lock:
+                    top = self.heap[0] if self.heap else None
+
+                # ==========================================
+                # 💤 PHASE 1: SLEEP UNTIL THE NEXT DUE TIME
+                # ==========================================
+                if top is None:
+                    print("💤 Nothing scheduled. Sleeping until the queue changes (python scheduler.py reload).")
+                    self.wake.wait()
+                    self.wake.clear()
+                    self.reload()
+                    continue
+
+                due, _, _, post_id = top
+                delay = due - time.time()
+                if delay > 0:
+                    print(f"⏰ Next up: post #{post_id} at {time.strftime(TIME_FORMAT, time.localtime(due))} (in {delay:.0f}s).")
+                    # Windows can't wait longer than TIMEOUT_MAX (~49 days) in one go; we just loop around.
+                    if self.wake.wait(min(delay, threading.TIMEOUT_MAX)):
+                        # Somebody poked us: the queue changed, so the heap may be stale.
+                        self.wake.clear()
+                        self.reload()
+                        continue
+                    if due > time.time():
+                        continue
+
+                # ==========================================
+                # 🚀 PHASE 2: DISPATCH
+                # ==========================================
+                with self.lock:
+                    if self.heap and self.heap[0] == top:
+                        heapq.heappop(self.heap)
+
+                # Re-read the row right before posting: it may have been paused, posted by a CLI run or edited.
+                job = self.cm.get_post(post_id)
+                if job and row_matches(job, self.platform, self.username):
+                    print(f"\n>>> Scheduled post #{post_id} is due. Dispatching...")
+                    # Imported here so 'list', 'pause' and 'resume' never pay for loading Playwright.
+                    import supervisor
+                    try:
+                        if supervisor.ENABLED:
+                            # A job process with a time budget, so one hung browser can't stall the schedule.
+                            supervisor.Supervisor().run_jobs([job], self.username, self.cm)
+                        else:
+                            import main
+                            main.post_job(job, self.username, self.cm)
+                    except Exception as e:
+                        print(f"❌ Critical Error on post #{post_id}: {e}")
+                        self.cm.mark_post_as_failed(post_id, f"Critical error: {e}")
+                self.reload()
+        finally:
+            server.shutdown()
+            server.server_close()
+            print("🛑 Scheduler stopped.")
+
+
+# ==========================================
+# 🎛️ LOCAL CONTROL PORT
+# ==========================================
+class _ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        scheduler = self.server.scheduler
+        command = self.rfile.readline().decode('utf-8').strip().lower()
+        if command == "reload":
+            scheduler.poke()
+            reply = {"ok": True}
+        elif command == "list":
+            reply = {"ok": True, "heap": [[due, post_id] for due, _, _, post_id in scheduler.snapshot()]}
+        elif command == "stop":
+            scheduler.stop()
+            reply = {"ok": True}
+        else:
+            reply = {"ok": False, "error": f"unknown command '{command}'"}
+        self.wfile.write((json.dumps(reply) + "\n").encode('utf-8'))
+
+
+def start_control_server(scheduler):
+    server = socketserver.ThreadingTCPServer((CONTROL_HOST, CONTROL_PORT), _ControlHandler)
+    server.daemon_threads = True
+    server.scheduler = scheduler
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def send_command(command, timeout=3):
+    """Sends one command to a running scheduler. Returns its reply, or None if no daemon is running."""
+    try:
+        with socket.create_connection((CONTROL_HOST, CONTROL_PORT), timeout=timeout) as conn:
+            conn.sendall((command + "\n").encode('utf-8'))
+            reply = conn.makefile('r', encoding='utf-8').readline()
+            return json.loads(reply) if reply else None
+    except OSError:
+        return None
+
+
+def print_upcoming(cm, username, platform):
+    jobs = upcoming_jobs(cm, username, platform, include_unscheduled=False, include_paused=True)
+    if not jobs:
+        print("📭 Nothing scheduled.")
+        return
+    print(f"{'ID':>6}  {'PLATFORM':<8}  {'USER':<14}  {'DUE':<19}  {'PRIO':>4}  STATUS")
+    for due, neg_priority, _, row in jobs:
+        print(f"{row.get('id', ''):>6}  {row.get('platform', ''):<8}  {(row.get('username') or '-'):<14}  "
+              f"{time.strftime(TIME_FORMAT, time.localtime(due)):<19}  {-neg_priority:>4}  {row.get('status', '')}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shadow Poster - time-based scheduler")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="start the scheduler daemon")
+    run_parser.add_argument("--user", default="default", help="which saved account (Profiles/<user>) to post from")
+    run_parser.add_argument("--platform", choices=["ig", "tiktok", "x"], default=None)
+    run_parser.add_argument("--include-unscheduled", action="store_true",
+                            help="also post pending rows that have no scheduled_at (treated as due now)")
+
+    list_parser = sub.add_parser("list", help="show upcoming and paused scheduled posts")
+    list_parser.add_argument("--user", default=None)
+    list_parser.add_argument("--platform", choices=["ig", "tiktok", "x"], default=None)
+
+    for name in ("pause", "resume"):
+        id_parser = sub.add_parser(name, help=f"{name} one post by id")
+        id_parser.add_argument("post_id")
+
+    sub.add_parser("reload", help="make a running daemon re-read the queue")
+    sub.add_parser("stop", help="stop a running daemon")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        scheduler = Scheduler(args.user, args.platform, args.include_unscheduled)
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "list":
+        print_upcoming(ContentManager(), args.user, args.platform)
+    elif args.command in ("pause", "resume"):
+        cm = ContentManager()
+        changed = cm.pause_post(args.post_id) if args.command == "pause" else cm.resume_post(args.post_id)
+        # The daemon sleeps until the next due time, so wake it up to notice the change.
+        if changed and send_command("reload"):
+            print("🔔 Running scheduler notified.")
+    else:
+        reply = send_command(args.command)
+        print("🔔 Done." if reply and reply.get("ok") else "⚠️ No scheduler is running.")
@@ -0,0 +1,193 @@
+"""
+SHADOW POSTER - SESSION CHECK
+Tells whether a saved login (Profiles/<user>/<Platform>_Profile) is still good WITHOUT
+starting Chrome: it opens the profile's cookie database read-only and looks for the
+platform's login cookies and their expiry dates.
+
+An expired login used to cost a full browser start, the warm-up scroll and a string of
+timeouts before the poster gave up on a missing composer. Now main.py checks first and
+parks the job as 'needs_login' in milliseconds. Logging in again with the login helper
+puts that account's 'needs_login' posts back to 'pending' by itself.
+
+    python session_check.py report                   (every profile's login status)
+    python session_check.py report --user brand_account --platform tiktok
+    python session_check.py requeue --user brand_account --platform x   ('needs_login' -> 'pending')
+
+Only the cookie names and expiry dates are read; the (encrypted) values are never touched.
+SHADOW_SESSION_CHECK=0 turns the check off, SHADOW_SESSION_WARN_DAYS (3) sets how early
+the report starts warning about a login that is about to run out.
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from profile_maintenance import chrome_profiles, find_profiles
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+ENABLED = os.environ.get("SHADOW_SESSION_CHECK", "1") != "0"
+WARN_DAYS = float(os.environ.get("SHADOW_SESSION_WARN_DAYS", "3"))
+
+# platform -> (cookie domains, login cookies). Each entry of the second list is a set of
+# alternatives, and every entry must be there: X needs auth_token, TikTok any one of its three.
+AUTH_COOKIES = {
+    'x': (("x.com", "twitter.com"), [("auth_token",)]),
+    'ig': (("instagram.com",), [("sessionid",)]),
+    'tiktok': (("tiktok.com",), [("sessionid", "sessionid_ss", "sid_tt")]),
+}
+
+# Chrome moved the cookie store into Network/ in version 96; older profiles still have it at the top.
+COOKIE_DB_PATHS = ("Network/Cookies", "Cookies")
+CHROME_EPOCH_OFFSET = 11644473600 # seconds between 1601-01-01 (Chrome's epoch) and 1970-01-01
+
+# Statuses that mean "don't bother starting the browser". 'unreadable' isn't one of them:
+# when Chrome has the file locked we simply don't know, so the job goes ahead as before.
+BLOCKING = {'missing', 'expired', 'no_profile'}
+STATUS_ICONS = {'valid': "✅", 'expiring': "⏳", 'expired': "⌛", 'missing': "🚪", 'no_profile': "📭", 'unreadable': "❔"}
+
+
+def cookie_databases(profile_path):
+    """Every cookie database inside a Chrome user-data dir (normally just Default/Network/Cookies)."""
+    found = []
+    for chrome_profile in chrome_profiles(profile_path):
+        for relative in COOKIE_DB_PATHS:
+            path = os.path.join(chrome_profile, *relative.split("/"))
+            if os.path.isfile(path):
+                found.append(path)
+                break
+    return found
+
+
+def _query(db_path, domains):
+    sql = ("SELECT name, expires_utc, has_expires, is_persistent FROM cookies WHERE "
+           + " OR ".join("host_key = ? OR host_key LIKE ?" for _ in domains))
+    params = [value for domain in domains for value in (domain, "%." + domain)]
+    # immutable=1: read the file as it is on disk, without taking a lock a running Chrome could trip over.
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro&immutable=1", uri=True)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def read_cookies(db_path, domains):
+    """[(name, expires epoch or None, persistent)] for the given domains. Raises OSError/sqlite3.Error."""
+    try:
+        rows = _query(db_path, domains)
+    except sqlite3.OperationalError:
+        # Windows Chrome keeps the file open without sharing; a copy can sometimes still be read.
+        with tempfile.TemporaryDirectory() as folder:
+            copy = os.path.join(folder, "Cookies")
+            shutil.copyfile(db_path, copy)
+            rows = _query(copy, domains)
+    cookies = []
+    for name, expires_utc, has_expires, is_persistent in rows:
+        expires = expires_utc / 1_000_000 - CHROME_EPOCH_OFFSET if has_expires and expires_utc else None
+        cookies.append((name, expires, bool(is_persistent)))
+    return cookies
+
+
+def check_profile(platform, profile_path, now=None):
+    """
+    Looks at one saved login. Returns {'platform', 'profile', 'status', 'detail', 'expires'} where
+    status is 'valid', 'expiring' (valid, but not for long), 'expired', 'missing' (never logged in,
+    or logged out), 'no_profile' or 'unreadable'. 'expires' is when the first login cookie runs out.
+    """
+    now = now or time.time()
+    result = {'platform': platform, 'profile': profile_path, 'status': None, 'detail': None, 'expires': None}
+    if platform not in AUTH_COOKIES:
+        result.update(status='unreadable', detail=f"no login cookies known for '{platform}'")
+        return result
+    if not os.path.isdir(profile_path):
+        result.update(status='no_profile', detail="the profile folder doesn't exist (never logged in)")
+        return result
+    databases = cookie_databases(profile_path)
+    if not databases:
+        result.update(status='no_profile', detail="the profile has no cookie database yet")
+        return result
+
+    domains, required = AUTH_COOKIES[platform]
+    cookies = []
+    try:
+        for db_path in databases:
+            cookies.extend(read_cookies(db_path, domains))
+    except (OSError, sqlite3.Error) as e:
+        result.update(status='unreadable', detail=f"couldn't read the cookie database: {e}")
+        return result
+
+    expires_at = []
+    for alternatives in required:
+        found = [cookie for cookie in cookies if cookie[0] in alternatives and cookie[2]]
+        if not found:
+            result.update(status='missing', detail=f"no '{' / '.join(alternatives)}' cookie (not logged in)")
+            return result
+        # A cookie without an expiry date (rare for logins) lasts until Chrome drops it; count it as valid.
+        best = max(float('inf') if expires is None else expires for _, expires, _ in found)
+        if best <= now:
+            when = time.strftime('%Y-%m-%d %H:%M', time.localtime(best))
+            result.update(status='expired', detail=f"'{found[0][0]}' expired on {when}", expires=best)
+            return result
+        expires_at.append(best)
+
+    first = min(expires_at)
+    result['expires'] = None if first == float('inf') else first
+    if result['expires'] is not None and first - now < WARN_DAYS * 86400:
+        result.update(status='expiring', detail=f"logged in, but it runs out in {(first - now) / 3600:.0f}h")
+    else:
+        result.update(status='valid', detail="logged in")
+    return result
+
+
+def needs_login(result):
+    return result['status'] in BLOCKING
+
+
+def check_all(username=None, platform=None):
+    """check_profile() for every saved profile (optionally one user / platform)."""
+    from main import PLATFORMS
+    folders = {entry[3]: code for code, entry in PLATFORMS.items()}
+    results = []
+    for path in find_profiles(username, platform):
+        code = folders.get(os.path.basename(path))
+        if code:
+            result = check_profile(code, path)
+            result['username'] = os.path.basename(os.path.dirname(path))
+            results.append(result)
+    return results
+
+
+def print_report(results):
+    if not results:
+        print("📭 No saved profiles found.")
+        return
+    for result in results:
+        expires = time.strftime('%Y-%m-%d', time.localtime(result['expires'])) if result['expires'] else "-"
+        print(f"{STATUS_ICONS[result['status']]} {result['username']:<20} {result['platform']:<7} "
+              f"{result['status']:<11} until {expires:<10}  {result['detail']}")
+    blocked = sum(1 for result in results if needs_login(result))
+    if blocked:
+        print(f"🔑 {blocked} profile(s) need a fresh login (use the login buttons in the UI or Login scripts/login_helper.py).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the saved logins without opening a browser")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, description in (("report", "login status of every saved profile"),
+                              ("requeue", "put 'needs_login' posts back to 'pending' (after logging in again)")):
+        command = sub.add_parser(name, help=description)
+        command.add_argument("--user", default=None, help="only this account (default: all)")
+        command.add_argument("--platform", choices=sorted(AUTH_COOKIES), default=None)
+    args = parser.parse_args()
+
+    if args.command == "report":
+        print_report(check_all(args.user, args.platform))
+    else:
+        from content_manager import ContentManager
+        ContentManager().requeue_needs_login(args.platform, args.user)
@@ -0,0 +1,459 @@
+"""
+SHADOW POSTER - JOB SUPERVISOR
+Runs the posting jobs in a separate "job process" and keeps an eye on it from the outside.
+A Chrome that hangs forever, a Playwright call that never returns or a poster stuck in a
+loop can no longer freeze the service or the UI: every job gets a wall-clock budget, and
+when it runs out the whole process tree (Python, the Playwright driver, every Chrome
+process) is killed and the next job starts in a fresh job process.
+
+    SHADOW_BUDGET_X=300         seconds an X job may take (default 5 min)
+    SHADOW_BUDGET_IG=600        an Instagram job (default 10 min)
+    SHADOW_BUDGET_TIKTOK=900    a TikTok job (default 15 min)
+    SHADOW_SUPERVISE=0          run jobs in-process like before (no budgets, no cancel)
+
+All the jobs for the same account + platform share one job process (and so one
+browser, like main.drain). The job process reports back which job it's on and which phase
+that job is in, so a killed job is recorded for what it is:
+  - killed before it submitted the post  -> an ordinary failed attempt (it will be retried)
+  - killed while submitting / confirming -> 'failed' straight away, because the post may
+                                            already be live: check before requeueing it
+  - cancelled before it submitted        -> 'paused', untouched (resume it from the queue browser)
+
+On start-up the service also kills Chrome processes left behind by an earlier crash
+(orphans still holding a Profiles/ folder). Killing whole process trees and finding
+orphans needs psutil (pip install psutil); without it only the job process itself is killed.
+
+    python supervisor.py run --all          (post everything, supervised, in this terminal)
+    python supervisor.py cleanup            (kill orphaned Chrome processes now)
+"""
+
+import argparse
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # optional: without it we can only kill the job process itself
+    psutil = None
+
+import log_context
+from content_manager import ContentManager
+from resource_monitor import NO_ABORT_PHASES
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+ENABLED = os.environ.get("SHADOW_SUPERVISE", "1") != "0"
+BUDGETS = {
+    'x': float(os.environ.get("SHADOW_BUDGET_X", "300")),
+    'ig': float(os.environ.get("SHADOW_BUDGET_IG", "600")),
+    'tiktok': float(os.environ.get("SHADOW_BUDGET_TIKTOK", "900")),
+}
+DEFAULT_BUDGET = 600
+STARTUP_GRACE = 60   # seconds a job process may take to import everything (and between two jobs)
+POLL_SECONDS = 0.2   # how often the budget and the cancel button are checked
+CONTROL_PREFIX = "\x1eSHADOW "  # marks the job process's report lines among its ordinary log lines
+PROFILES_DIR = os.path.join(os.getcwd(), "Profiles")
+
+
+def budget_for(platform):
+    return BUDGETS.get(platform, DEFAULT_BUDGET)
+
+
+# ==========================================
+# 🔪 KILLING PROCESS TREES
+# ==========================================
+def kill_tree(proc):
+    """Kills a job process and everything it started (Playwright's driver, Chrome and its helpers)."""
+    descendants = []
+    if psutil is not None:
+        try:
+            # Collected BEFORE the kill: afterwards Chrome is re-parented and can't be found this way.
+            descendants = psutil.Process(proc.pid).children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    if sys.platform == "win32":
+        subprocess.run(["taskkill", "/T", "/F", "/PID", str(proc.pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)  # the job process leads its own process group
+        except OSError:
+            pass
+    for child in descendants:
+        try:
+            child.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    try:
+        proc.kill()
+        proc.wait(timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+
+
+def _profile_dir(cmdline):
+    """The Profiles/ folder a Chrome command line is using, or None if it isn't one of ours."""
+    for arg in cmdline or []:
+        if arg.startswith("--user-data-dir="):
+            path = os.path.abspath(arg.split("=", 1)[1].strip('"'))
+            if path.startswith(PROFILES_DIR + os.sep):
+                return path
+    return None
+
+
+def _owned_by_python(proc):
+    """True if a Python process (the service, a job process, a login script) still owns this Chrome."""
+    try:
+        return any("python" in (parent.name() or "").lower() for parent in proc.parents())
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+
+
+def cleanup_orphans():
+    """Kills Chrome processes holding a Profiles/ folder that no running poster owns. Returns how many went."""
+    if psutil is None:
+        print("⚠️ Can't look for orphaned Chrome processes without psutil (pip install psutil).")
+        return 0
+    killed = 0
+    for proc in psutil.process_iter(["pid", "cmdline"]):
+        cmdline = proc.info.get("cmdline") or []
+        # Only the browser process itself; its helpers (--type=renderer etc.) go down with it.
+        if any(arg.startswith("--type=") for arg in cmdline):
+            continue
+        profile = _profile_dir(cmdline)
+        if not profile or _owned_by_python(proc):
+            continue
+        try:
+            victims = proc.children(recursive=True) + [proc]
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        for victim in victims:
+            try:
+                victim.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        killed += 1
+        print(f"🧟 Killed an orphaned Chrome (pid {proc.pid}) still holding {os.path.relpath(profile)}.")
+    return killed
+
+
+# ==========================================
+# 👀 THE SUPERVISOR (parent side)
+# ==========================================
+class Supervisor:
+    """
+    Runs jobs in a job process and enforces the budgets. One job at a time; cancel() may be
+    called from any thread and stops the running job (and the rest of the run) within a moment.
+    run() returns one result dict per job it dealt with:
+        {'job_id', 'outcome', 'success', 'status', 'error', 'artifact_path', 'seconds'}
+    where outcome is 'posted', 'failed', 'needs_login', 'skipped', 'timeout', 'cancelled' or 'crashed'.
+    """
+
+    def __init__(self):
+        self.cancel_event = threading.Event()
+        self.running = False
+        self.proc = None
+        self.current = None  # (job id, phase) of the job in flight
+
+    def cancel(self):
+        """Stops the job in flight. Returns False if nothing was running."""
+        if not self.running:
+            return False
+        self.cancel_event.set()
+        return True
+
+    def run(self, target_platform=None, username="default", drain=False):
+        """The supervised version of main.main() (drain=False) and main.drain() (drain=True)."""
+        cm = ContentManager()
+        if drain:
+            print(f"🌟 Draining ALL pending posts for {'ALL' if not target_platform else target_platform.upper()} (User: {username}), supervised...")
+            jobs = list(cm.iter_pending(target_platform, username))
+        else:
+            job = cm.get_next_post(target_platform, username)
+            jobs = [job] if job else []
+        if not jobs:
+            print(f"🛑 Nothing to do: no pending posts for '{target_platform or 'any platform'}'.")
+            return []
+        return self.run_jobs(jobs, username, cm)
+
+    def run_jobs(self, jobs, username="default", cm=None):
+        """Supervised run over queue rows the caller already picked (the scheduler's due post, say)."""
+        cm = cm or ContentManager()
+        self.cancel_event.clear()
+        self.running = True
+        results = []
+        # One job process (one browser) per account + platform. Every job of the pair goes in the same
+        # bucket, wherever it sits in the queue, and keeps its queue order inside the bucket.
+        groups = {}
+        for job in jobs:
+            key = ((job.get('username') or '').strip() or username, job.get('platform', '').strip().lower())
+            groups.setdefault(key, []).append(job['id'])
+        try:
+            for (_, platform), job_ids in groups.items():
+                if self.cancel_event.is_set():
+                    break
+                with log_context.platform(platform):
+                    results.extend(self._run_group(cm, platform, username, job_ids))
+        finally:
+            self.running = False
+
+        posted = sum(1 for result in results if result['outcome'] == 'posted')
+        left = len(jobs) - len(results)
+        print(f"🏁 Supervised run finished: {posted}/{len(results)} posts went live"
+              + (f", {left} left in the queue untouched." if left else "."))
+        return results
+
+    def _run_group(self, cm, platform, username, job_ids):
+        results = []
+        remaining = list(job_ids)
+        while remaining and not self.cancel_event.is_set():
+            reported, ended = self._run_process(cm, platform, username, remaining)
+            results.extend(reported)
+            done = {result['job_id'] for result in reported}
+            remaining = [job_id for job_id in remaining if job_id not in done]
+            if ended == "exited":
+                # The job process walked the whole list; anything it never started wasn't pending any more.
+                for job_id in remaining:
+                    results.append(self._result(cm, job_id, 'skipped', 0))
+                break
+            if ended == "failed_to_start":
+                print(f"❌ The job process died before starting a job. Leaving {len(remaining)} job(s) in the queue.")
+                break
+            # A job was killed (or crashed). The rest of the group gets a fresh job process.
+            if remaining and not self.cancel_event.is_set():
+                print(f"♻️ Starting a fresh job process for the {len(remaining)} job(s) left in this group.")
+        return results
+
+    def _spawn(self, username, job_ids):
+        env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8")
+        options = {}
+        if sys.platform == "win32":
+            options["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            options["start_new_session"] = True  # its own process group, so killpg() takes everything down
+        command = [sys.executable, os.path.abspath(__file__), "child", "--user", username]
+        proc = subprocess.Popen(command, cwd=os.getcwd(), env=env, stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                encoding="utf-8", errors="replace", bufsize=1, **options)
+
+        # The job ids go in through stdin, one per line: a big group (tens of thousands of rows)
+        # would go over the OS limit on a single command-line argument. Written from a thread so a
+        # job process that starts printing before it has read them all can't deadlock us.
+        def feed():
+            try:
+                proc.stdin.write("".join(f"{job_id}\n" for job_id in job_ids))
+                proc.stdin.close()
+            except OSError:
+                pass  # it died before reading them; _run_process sees that
+        threading.Thread(target=feed, daemon=True).start()
+        return proc
+
+    def _run_process(self, cm, platform, username, job_ids):
+        """
+        One job process from start to end. Returns (results it reported, how it ended), where the
+        end is 'exited' (ran the whole list), 'killed' (timeout/cancel) or 'crashed'.
+        """
+        budget = budget_for(platform)
+        self.proc = proc = self._spawn(username, job_ids)
+        lines = queue.Queue()
+
+        def read():
+            for line in proc.stdout:
+                lines.put(line)
+            lines.put(None)
+        threading.Thread(target=read, daemon=True).start()
+
+        results = []
+        job_id, phase, began = None, None, time.monotonic()
+        attempts = None  # the job's 'attempts' when it started, to tell whether it recorded a failure itself
+        deadline = began + STARTUP_GRACE
+        reason = None
+        try:
+            while True:
+                try:
+                    line = lines.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    if proc.poll() is not None:
+                        break  # it exited, but something it started is still holding its output open
+                    line = ""
+                if line is None:
+                    break  # the job process closed its output: it's exiting
+                event = None
+                if line.startswith(CONTROL_PREFIX):
+                    try:
+                        event = json.loads(line[len(CONTROL_PREFIX):])
+                    except ValueError:
+                        pass  # a report line torn by another thread's print; show it as text
+                if event:
+                    if event["event"] == "start":
+                        job_id, phase, began = event["job_id"], None, time.monotonic()
+                        attempts = event.get("attempts")
+                        deadline = began + budget
+                    elif event["event"] == "phase" and event.get("job_id") == job_id:
+                        phase = event["phase"]
+                    elif event["event"] == "done":
+                        results.append(self._result(cm, event["job_id"], None, time.monotonic() - began, event))
+                        job_id, phase = None, None
+                        deadline = time.monotonic() + STARTUP_GRACE
+                    self.current = (job_id, phase) if job_id else None
+                elif line:
+                    print(line, end="")
+                if self.cancel_event.is_set():
+                    reason = "cancelled"
+                elif time.monotonic() > deadline:
+                    reason = "timeout"
+                if reason:
+                    kill_tree(proc)
+                    break
+            proc.wait()
+            if not reason:
+                kill_tree(proc)  # sweeps up anything the job process left running behind it
+        finally:
+            if proc.poll() is None:
+                kill_tree(proc)  # Ctrl+C (or a bug) in the supervisor itself: don't leave the job process running
+            self.proc, self.current = None, None
+
+        elapsed = time.monotonic() - began
+        if reason == "timeout":
+            limit = f"{budget:g}s" if job_id else f"{STARTUP_GRACE}s of start-up"
+            print(f"⏱️ The job process went over its {limit} budget" + (f" on job #{job_id}" if job_id else "")
+                  + ". Killed it and everything it started.")
+        elif reason == "cancelled":
+            print("⛔ Cancelled. Killed the job process and everything it started.")
+        if reason:
+            if psutil is not None:
+                cleanup_orphans()  # any Chrome that slipped out of the tree
+            if job_id:
+                results.append(self._record_abort(cm, job_id, phase, reason, elapsed, budget, attempts=attempts))
+            elif not results:
+                return results, "failed_to_start"  # stuck before its first job; a new one would be too
+            return results, "killed"
+        if job_id:
+            # The process died in the middle of a job (Chrome took Python down with it, out of memory, ...).
+            print(f"💥 The job process crashed (exit code {proc.returncode}) during job #{job_id}.")
+            results.append(self._record_abort(cm, job_id, phase, "crashed", elapsed, budget, proc.returncode, attempts))
+            return results, "crashed"
+        if proc.returncode != 0:
+            # Died between two jobs: the ones it reported are done, the rest get another go.
+            return results, ("crashed" if results else "failed_to_start")
+        return results, "exited"
+
+    def _record_abort(self, cm, job_id, phase, reason, seconds, budget, returncode=None, attempts=None):
+        """
+        Writes a killed/crashed job's fate to the queue and returns its result.
+        attempts is the row's 'attempts' when the job started (as the job process reported it).
+        """
+        row = cm.get_post(job_id)
+        status = (row.get('status') or '').strip().lower() if row else None
+        if row and (status != 'pending' or (attempts is not None and (row.get('attempts') or '0') != attempts)):
+            # It got as far as recording its own outcome before it was stopped (a retryable
+            # failure leaves the row 'pending', but with one more attempt on the clock).
+            return self._result(cm, job_id, None, seconds)
+        where = f" (in phase '{phase}')" if phase else ""
+        if reason == "timeout":
+            error = f"Timed out after {budget:g}s{where}; the job process was killed"
+        elif reason == "cancelled":
+            error = f"Cancelled by the user{where}"
+        else:
+            error = f"Job process crashed with exit code {returncode}{where}"
+        if phase in NO_ABORT_PHASES:
+            # The post button was already pressed. Retrying blindly could post it twice.
+            error += ". The post may already be live, check before requeueing"
+            cm.mark_post_as_failed(job_id, error, permanent=True)
+        elif reason == "cancelled":
+            cm.pause_post(job_id)
+        else:
+            cm.mark_post_as_failed(job_id, error)
+        return self._result(cm, job_id, reason, seconds, {"error": error})
+
+    def _result(self, cm, job_id, outcome, seconds, event=None):
+        event = event or {}
+        row = cm.get_post(job_id) or {}
+        status = (row.get('status') or '').strip().lower()
+        if outcome is None:
+            outcome = event.get("outcome") or ('posted' if status == 'completed' else 'failed')
+        error = None if outcome in ('posted', 'skipped') else (event.get("error") or row.get('last_error') or None)
+        return {
+            "job_id": str(job_id),
+            "outcome": outcome,
+            "success": outcome == 'posted',
+            "status": status,
+            "error": error,
+            "artifact_path": row.get('artifact_path') or None,
+            "seconds": round(seconds, 1),
+        }
+
+
+def run(target_platform=None, username="default", drain=False):
+    """Convenience wrapper: one supervised run with a fresh Supervisor."""
+    return Supervisor().run(target_platform, username, drain)
+
+
+# ==========================================
+# 🧒 THE JOB PROCESS (child side)
+# ==========================================
+def _report(event, **fields):
+    sys.stdout.write(CONTROL_PREFIX + json.dumps(dict(fields, event=event), ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def child_main(username, job_ids):
+    """Runs main.drain() over exactly these job ids, reporting every job's start, phases and outcome."""
+    import main
+    import timing
+
+    timing.phase_listener = lambda timer, name: _report("phase", job_id=str(timer.job_id), phase=name)
+    attempts = {}
+
+    def on_job_start(job):
+        attempts[job['id']] = job.get('attempts') or '0'
+        _report("start", job_id=str(job['id']), attempts=attempts[job['id']])
+
+    def on_job_done(job):
+        row = main.ContentManager().get_post(job['id']) or {}
+        status = (row.get('status') or '').strip().lower()
+        if status == 'completed':
+            outcome = 'posted'
+        elif status == 'needs_login':
+            outcome = 'needs_login'  # parked before a browser was started (see session_check.py)
+        elif status == 'duplicate':
+            outcome = 'skipped'  # already live on this account (see dedupe.py); nothing to post
+        elif status == 'pending' and (row.get('attempts') or '0') == attempts.get(job['id']):
+            outcome = 'skipped'  # turned away without an attempt and left in the queue as it was
+        else:
+            outcome = 'failed'
+        _report("done", job_id=str(job['id']), outcome=outcome, error=(row.get('last_error') or None) if outcome in ('failed', 'needs_login') else None)
+
+    main.drain(username=username, job_ids=job_ids, on_job_start=on_job_start, on_job_done=on_job_done)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shadow Poster - supervised job runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="post the next job (or all of them) in a supervised job process")
+    run_parser.add_argument("--platform", default=None, help="only post to this platform")
+    run_parser.add_argument("--user", default="default", help="which saved account (Profiles/<user>) to post from")
+    run_parser.add_argument("--all", action="store_true", help="drain every pending post instead of just the next one")
+    sub.add_parser("cleanup", help="kill Chrome processes left behind by a crashed run")
+    child_parser = sub.add_parser("child", help=argparse.SUPPRESS)  # started by the supervisor itself; job ids on stdin
+    child_parser.add_argument("--user", default="default")
+    args = parser.parse_args()
+
+    if args.command == "child":
+        child_main(args.user, [line.strip() for line in sys.stdin if line.strip()])
+    elif args.command == "cleanup":
+        print(f"🧹 Killed {cleanup_orphans()} orphaned Chrome process(es).")
+    else:
+        supervisor = Supervisor()
+        try:
+            results = supervisor.run(args.platform, args.user, args.all)
+        except KeyboardInterrupt:
+            sys.exit(130)
+        sys.exit(0 if all(result['outcome'] in ('posted', 'skipped') for result in results) else 1)
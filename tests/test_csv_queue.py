@@ -0,0 +1,181 @@
+"""
+SHADOW POSTER - CSV QUEUE CRASH-SAFETY TEST
+The csv backend writes status changes to content.csv.journal and folds them back into
+content.csv from time to time. These tests check that a journaled status survives a restart,
+that compaction swaps the new content.csv in whole (or not at all), and that updates racing
+each other under the queue lock (threads and separate processes) lose nothing.
+
+    python -m unittest discover tests
+"""
+
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import queue_backend
+from queue_backend import CSVQueueBackend, FIELDNAMES
+
+ROWS = 40
+
+
+def no_backoff(attempts):
+    return 0
+
+
+class CSVQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.folder.name, "content.csv")
+        self.backend = CSVQueueBackend(self.csv_path)
+        self.backend.append_rows(({'platform': 'x', 'caption': f"post {i}", 'status': 'pending'} for i in range(ROWS)), FIELDNAMES)
+        self.max_entries = queue_backend.JOURNAL_MAX_ENTRIES
+        queue_backend.JOURNAL_MAX_ENTRIES = 1000 # nothing compacts unless a test asks for it
+
+    def tearDown(self):
+        queue_backend.JOURNAL_MAX_ENTRIES = self.max_entries
+        self.folder.cleanup()
+
+    def raw_rows(self):
+        """content.csv as it is on disk, without the journal."""
+        with open(self.csv_path, 'r', encoding='utf-8', newline='') as file:
+            return {row['id']: row for row in csv.DictReader(file)}
+
+    def leftovers(self):
+        return [name for name in os.listdir(self.folder.name) if name not in ("content.csv", "content.csv.lock", "content.csv.journal")]
+
+    # ==========================================
+    # 📓 THE JOURNAL
+    # ==========================================
+    def test_journaled_status_survives_a_restart(self):
+        self.assertTrue(self.backend.update_status('2', 'completed'))
+        self.backend.record_failure('3', "boom", 3, no_backoff)
+        self.assertEqual(self.raw_rows()['2']['status'], 'pending') # not in content.csv yet
+        self.assertTrue(os.path.exists(self.backend.journal_path))
+
+        restarted = CSVQueueBackend(self.csv_path) # a fresh process knows nothing but the files
+        self.assertEqual(restarted.get_post('2')['status'], 'completed')
+        self.assertEqual(restarted.get_post('3')['attempts'], '1')
+        self.assertEqual(restarted.get_post('3')['last_error'], "boom")
+        self.assertNotIn('2', [row['id'] for row in restarted.iter_pending()])
+
+    def test_torn_journal_line_keeps_everything_before_it(self):
+        self.backend.update_status('2', 'completed')
+        with open(self.backend.journal_path, 'a', encoding='utf-8') as file:
+            file.write('{"id": "4", "fields": {"sta') # the process died mid-append
+
+        restarted = CSVQueueBackend(self.csv_path)
+        self.assertEqual(restarted.get_post('2')['status'], 'completed')
+        self.assertEqual(restarted.get_post('4')['status'], 'pending')
+        # The next entry starts on a line of its own instead of being glued onto the torn one.
+        self.assertTrue(restarted.update_status('5', 'paused'))
+        self.assertEqual(CSVQueueBackend(self.csv_path).get_post('5')['status'], 'paused')
+
+    def test_unknown_id_is_not_journaled(self):
+        self.assertFalse(self.backend.update_status('999', 'completed'))
+        self.assertFalse(os.path.exists(self.backend.journal_path))
+
+    # ==========================================
+    # 🗜️ COMPACTION
+    # ==========================================
+    def test_compaction_folds_the_journal_into_the_csv(self):
+        self.backend.update_status('2', 'completed')
+        self.backend.update_fields('3', {'status': 'paused', 'artifact_path': "artifacts/job3"})
+
+        self.assertEqual(self.backend.compact(), 2)
+        self.assertFalse(os.path.exists(self.backend.journal_path))
+        rows = self.raw_rows()
+        self.assertEqual(len(rows), ROWS)
+        self.assertEqual(rows['2']['status'], 'completed')
+        self.assertEqual(rows['3']['status'], 'paused')
+        self.assertEqual(rows['3']['artifact_path'], "artifacts/job3") # new column added at compaction
+        self.assertEqual(self.leftovers(), [])
+
+    def test_interrupted_compaction_leaves_the_old_csv_and_the_journal(self):
+        self.backend.update_status('2', 'completed')
+        with open(self.csv_path, 'rb') as file:
+            before = file.read()
+
+        def crash(tmp_path, path):
+            raise OSError("power cut before the rename")
+        original, queue_backend._replace = queue_backend._replace, crash
+        try:
+            with self.assertRaises(OSError):
+                self.backend.compact()
+        finally:
+            queue_backend._replace = original
+
+        with open(self.csv_path, 'rb') as file:
+            self.assertEqual(file.read(), before) # untouched, not half-written
+        self.assertTrue(os.path.exists(self.backend.journal_path))
+        self.assertEqual(self.leftovers(), []) # the temp copy is gone
+        self.assertEqual(CSVQueueBackend(self.csv_path).get_post('2')['status'], 'completed')
+
+    def test_full_journal_compacts_itself(self):
+        queue_backend.JOURNAL_MAX_ENTRIES = 3
+        for post_id in ('1', '2', '3'):
+            self.backend.update_status(post_id, 'completed')
+        self.assertFalse(os.path.exists(self.backend.journal_path))
+        self.assertEqual([self.raw_rows()[post_id]['status'] for post_id in ('1', '2', '3')], ['completed'] * 3)
+
+    # ==========================================
+    # 🔒 CONCURRENT WRITERS
+    # ==========================================
+    def test_concurrent_threads_lose_no_updates(self):
+        queue_backend.JOURNAL_MAX_ENTRIES = 7 # compactions happen in the middle of the race
+        ids = [str(i) for i in range(2, ROWS + 1)]
+        errors = []
+
+        def worker(my_ids):
+            try:
+                backend = CSVQueueBackend(self.csv_path) # like separate ContentManagers in the UI
+                for post_id in my_ids:
+                    backend.update_status(post_id, 'completed')
+                    backend.record_failure('1', "boom", 10_000, no_backoff)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(ids[n::4],)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        rows = {row['id']: row for row in CSVQueueBackend(self.csv_path).iter_rows()}
+        self.assertEqual(len(rows), ROWS)
+        self.assertEqual({rows[post_id]['status'] for post_id in ids}, {'completed'})
+        self.assertEqual(rows['1']['attempts'], str(len(ids))) # no read-modify-write was lost
+
+    def test_concurrent_processes_lose_no_updates(self):
+        ids = [str(i) for i in range(2, ROWS + 1)]
+        script = (
+            "import sys\n"
+            f"sys.path.insert(0, {REPO!r})\n"
+            "from queue_backend import CSVQueueBackend\n"
+            "backend = CSVQueueBackend(sys.argv[1])\n"
+            "for post_id in sys.argv[2:]:\n"
+            "    assert backend.update_status(post_id, 'completed')\n"
+            "    backend.record_failure('1', 'boom', 10000, lambda attempts: 0)\n"
+        )
+        env = dict(os.environ, SHADOW_CSV_JOURNAL_MAX="5")
+        workers = [subprocess.Popen([sys.executable, "-c", script, self.csv_path] + ids[n::3], env=env,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) for n in range(3)]
+        for worker in workers:
+            _, stderr = worker.communicate(timeout=120)
+            self.assertEqual(worker.returncode, 0, stderr.decode(errors="replace"))
+
+        rows = {row['id']: row for row in CSVQueueBackend(self.csv_path).iter_rows()}
+        self.assertEqual(len(rows), ROWS)
+        self.assertEqual({rows[post_id]['status'] for post_id in ids}, {'completed'})
+        self.assertEqual(rows['1']['attempts'], str(len(ids)))
+
+
+if __name__ == "__main__":
+    unittest.main()
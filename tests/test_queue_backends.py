@@ -0,0 +1,145 @@
+"""
+SHADOW POSTER - QUEUE BACKEND PARITY TEST
+The csv and sqlite backends are interchangeable (SHADOW_QUEUE_BACKEND), so the same queue
+operations must give the same answers on both: what's next, what's pending and in which
+order, what a status change or a bulk action touches, and what a requeue brings back.
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_manager import ContentManager
+from queue_backend import FIELDNAMES, SCHEDULE_FIELDNAMES
+
+ROWS = [
+    # platform, username, status, priority, scheduled_at
+    ('x', '', 'pending', '', ''),
+    ('ig', 'brand', 'pending', '2', ''),
+    ('tiktok', 'brand', 'pending', '', ''),
+    ('x', 'other', 'pending', '5', ''),
+    ('x', 'brand', 'paused', '', ''),
+    ('ig', '', 'pending', '2', ''),
+    ('x', 'brand', 'pending', '', '2999-01-01 00:00'), # scheduled far in the future
+    ('tiktok', 'other', 'pending', '-1', ''),
+    ('x', 'brand', 'pending', '', ''),
+]
+
+
+def ids(rows):
+    return [row['id'] for row in rows]
+
+
+def snapshot(cm):
+    """The columns both backends must agree on, for every row."""
+    return [(row['id'], row['status'], int(row.get('attempts') or 0), row.get('last_error') or '',
+             int(row.get('priority') or 0), bool((row.get('next_attempt_at') or '').strip()))
+            for row in cm.iter_rows()]
+
+
+def exercise(backend):
+    """Runs one fixed sequence of queue operations and returns everything it observed."""
+    seen = {}
+    cm = ContentManager(backend=backend)
+    seen['appended'] = cm.append_posts(
+        ({'platform': platform, 'username': user, 'caption': f"caption {n}", 'image_path': "",
+          'status': status, 'priority': priority, 'scheduled_at': scheduled_at}
+         for n, (platform, user, status, priority, scheduled_at) in enumerate(ROWS)),
+        FIELDNAMES + SCHEDULE_FIELDNAMES)
+
+    def look(label):
+        seen[label] = {
+            'next': (cm.get_next_post() or {}).get('id'),
+            'next x/brand': (cm.get_next_post('x', 'brand') or {}).get('id'),
+            'next ig/other': (cm.get_next_post('ig', 'other') or {}).get('id'),
+            'next tiktok/nobody': (cm.get_next_post('tiktok', 'nobody') or {}).get('id'),
+            'pending': ids(cm.iter_pending()),
+            'pending x': ids(cm.iter_pending('x')),
+            'pending brand': ids(cm.iter_pending(None, 'brand')),
+            'counts': cm.count_by_status(),
+            'page': ids(cm.read_page(1, 3)),
+            'page pending': ids(cm.read_page(0, 2, ['pending'])),
+            'rows': snapshot(cm),
+        }
+
+    look('fresh')
+
+    # Single-row updates
+    cm.mark_post_as_complete('4')
+    seen['pause 3'] = cm.pause_post('3')
+    seen['pause 5 (already paused)'] = cm.pause_post('5')
+    seen['resume 5'] = cm.resume_post('5')
+    seen['fail 1'] = sorted((cm.mark_post_as_failed('1', "timed out") or {}).keys())
+    seen['fail 2 permanently'] = (cm.mark_post_as_failed('2', "bad video", permanent=True) or {}).get('status')
+    seen['fail missing'] = cm.mark_post_as_failed('999', "nope")
+    cm.mark_needs_login('6', "cookie expired")
+    cm.mark_needs_login('9', "cookie expired")
+    cm.mark_duplicate('8', "Duplicate of post #1")
+    look('after updates')
+
+    # Bulk actions (update_many)
+    seen['cancel'] = cm.cancel_posts(['3', '4', '7', '999']) # 4 is completed: left alone
+    seen['reprioritize'] = cm.reprioritize(['5'], 9)
+    look('after bulk actions')
+
+    # Requeues
+    seen['requeue failed'] = cm.requeue_failed()
+    seen['requeue needs_login x'] = cm.requeue_needs_login('x')
+    seen['requeue needs_login all'] = cm.requeue_needs_login()
+    look('after requeues')
+    return seen
+
+
+class QueueBackendParityTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+
+    def run_on(self, backend):
+        # ContentManager keeps its queue in the working directory; give each backend its own.
+        folder = os.path.join(self.folder.name, backend)
+        os.makedirs(folder)
+        os.chdir(folder)
+        try:
+            return exercise(backend)
+        finally:
+            os.chdir(self.cwd)
+
+    def test_both_backends_agree(self):
+        on_csv, on_sqlite = self.run_on("csv"), self.run_on("sqlite")
+        for key in on_csv:
+            self.assertEqual(on_csv[key], on_sqlite[key], f"csv and sqlite disagree on '{key}'")
+
+    def test_results_are_the_expected_ones(self):
+        # Both agreeing isn't enough if both are wrong; spot-check one of them.
+        seen = self.run_on("sqlite")
+        self.assertEqual(seen['appended'], (1, 9))
+        fresh = seen['fresh']
+        self.assertEqual(fresh['next'], '4')                      # priority 5 goes first
+        self.assertEqual(fresh['pending'], ['4', '2', '6', '1', '3', '9', '8'])
+        self.assertEqual(fresh['next x/brand'], '1')              # a row without a username fits any account
+        self.assertEqual(fresh['next tiktok/nobody'], None)       # 3 and 8 belong to other accounts
+        self.assertEqual(fresh['counts'], {'pending': 8, 'paused': 1})
+        self.assertEqual(seen['pause 5 (already paused)'], False)
+        self.assertEqual(seen['fail 2 permanently'], 'failed')
+        self.assertIsNone(seen['fail missing'])
+        self.assertNotIn('1', seen['after updates']['pending'])   # backing off after its failure
+        self.assertEqual(seen['cancel'], 2)                       # 3 (paused) and 7 (scheduled pending)
+        self.assertEqual(seen['after bulk actions']['next'], '5') # reprioritized to 9
+        self.assertEqual(seen['requeue failed'], 1)
+        self.assertEqual(seen['requeue needs_login x'], 1)
+        self.assertEqual(seen['requeue needs_login all'], 1)
+        self.assertEqual(seen['after requeues']['counts'], {'pending': 5, 'completed': 1, 'cancelled': 2, 'duplicate': 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+SHADOW POSTER - RESOURCE GUARD TEST
+A tripped resource limit has to abort the job even when it fires inside a locators.resolve()
+action: resolve() must not take it for a missed selector and retry the action somewhere else.
+
+Runs against a fake page, no browser needed (and no Playwright either):
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import playwright.sync_api  # noqa: F401
+except ImportError:
+    # The posters import a few names from Playwright at the top. This test never starts a browser,
+    # so stand-ins are enough when it isn't installed.
+    class Error(Exception):
+        pass
+
+    class TimeoutError(Error):
+        pass
+
+    sync_api = types.ModuleType("playwright.sync_api")
+    sync_api.Error, sync_api.TimeoutError, sync_api.Page = Error, TimeoutError, object
+    sys.modules["playwright"] = types.ModuleType("playwright")
+    sys.modules["playwright.sync_api"] = sync_api
+
+import human
+import locators
+import main
+import tiktok_poster
+from resource_monitor import ResourceMonitor
+from timing import JobTimer
+
+BREACH = "Chrome over its resource limit: 9000 MB RSS > 2048"
+
+
+class FakeMonitor(ResourceMonitor):
+    """The real guard (check()), without sampling any processes. The test decides when it trips."""
+    current = None
+
+    def start(self):
+        FakeMonitor.current = self
+        return self
+
+    def stop(self):
+        return None
+
+
+class FakeArtifacts:
+    def __init__(self, page, **kwargs):
+        pass
+
+    def start(self):
+        return self
+
+    def capture(self, label):
+        pass
+
+    def finish(self, success, error=None):
+        return None
+
+
+class FakeUpload:
+    def __init__(self, page, platform, media_path, guard=None):
+        pass
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def wait(self):
+        return "fake upload"
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    @property
+    def first(self):
+        return self
+
+    def count(self):
+        return 1
+
+    def is_visible(self, timeout=None):
+        return False
+
+    def click(self, timeout=None):
+        self.page.clicks.append(self.selector)
+        if self.selector == tiktok_poster.CAPTION_SELECTOR:
+            # Chrome blows past its memory limit right as the caption box gets focus.
+            FakeMonitor.current.breach = BREACH
+
+    def set_input_files(self, path, timeout=None):
+        pass
+
+
+class FakeKeyboard:
+    def __init__(self):
+        self.typed = []
+
+    def press(self, key):
+        pass
+
+    def type(self, char):
+        self.typed.append(char)
+
+
+class FakeMouse:
+    def wheel(self, x, y):
+        pass
+
+
+class FakePage:
+    def __init__(self):
+        self.clicks = []
+        self.keyboard = FakeKeyboard()
+        self.mouse = FakeMouse()
+        self.frames = []
+
+    def goto(self, url, **kwargs):
+        pass
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+    def frame_locator(self, selector):
+        return self
+
+    def wait_for_selector(self, selector, timeout=None):
+        pass
+
+
+class FakeQueue:
+    def __init__(self):
+        self.failed = []
+        self.completed = []
+
+    def mark_post_as_failed(self, post_id, error, permanent=False, artifact_path=None):
+        self.failed.append((post_id, error))
+
+    def mark_post_as_complete(self, post_id):
+        self.completed.append(post_id)
+
+
+class ResourceGuardTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        patches = [
+            (main, 'ResourceMonitor', FakeMonitor),
+            (main, 'JobArtifacts', FakeArtifacts),
+            (tiktok_poster, 'UploadWatcher', FakeUpload),
+            (human, 'HUMAN_SPEED', 0),
+        ]
+        self.originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+        for module, name, value in patches:
+            setattr(module, name, value)
+        locators.use_cache(os.path.join(self.folder.name, "locators.json"))
+
+    def tearDown(self):
+        for module, name, value in self.originals:
+            setattr(module, name, value)
+        self.folder.cleanup()
+
+    def test_limit_tripped_inside_resolve_action_fails_the_job(self):
+        page, cm = FakePage(), FakeQueue()
+        job = {'id': '7', 'platform': 'tiktok', 'caption': "hello", 'image_path': "media/clip.mp4"}
+
+        posted = main.run_job(page, tiktok_poster.TikTokPoster, job, "media/clip.mp4", cm, "default", JobTimer())
+
+        self.assertFalse(posted)
+        self.assertEqual(cm.completed, [])
+        self.assertEqual(cm.failed, [('7', BREACH)])
+        # The caption box was clicked once: the other frames weren't tried, nothing was typed, nothing was posted.
+        self.assertEqual(page.clicks.count(tiktok_poster.CAPTION_SELECTOR), 1)
+        self.assertEqual(page.keyboard.typed, [])
+        self.assertNotIn(tiktok_poster.POST_SELECTOR, page.clicks)
+
+
+if __name__ == "__main__":
+    unittest.main()
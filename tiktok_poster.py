@@ -4,18 +4,58 @@ This script handles the physical interaction with TikTok.com.
 TikTok's anti-bot is aggressive, so we rely heavily on the Human behavior engine.
 """
 
-import time
 import os
-from playwright.sync_api import Page
+from playwright.sync_api import Page, Error as PlaywrightError
+from timing import JobTimer
+from artifacts import JobArtifacts
+import locators
+from locators import TOP, ANY_FRAME, LocatorNotFound
+from upload_wait import UploadWatcher
+
+# Where the site lives. Point it at fixture_server.py to rehearse the whole flow offline.
+BASE_URL = os.environ.get("SHADOW_TIKTOK_BASE_URL", "https://www.tiktok.com")
+
+# TikTok's upload center is sometimes direct DOM, sometimes this iframe, sometimes a frame
+# with no useful name. locators.py remembers which one worked last time and tries it first.
+UPLOAD_IFRAME = 'iframe[data-tt="Upload_index_iframe"]'
+CAPTION_SELECTOR = '.public-DraftEditor-content, div[contenteditable="true"]'
+# We use the specific data-e2e attribute provided by TikTok for the post button.
+# This is much more reliable than searching for the text "Post" which can match other elements.
+POST_SELECTOR = '[data-e2e="post_video_button"]'
+
+# (frame, selector, timeout in ms), in the order a fresh install tries them
+FILE_INPUT_STRATEGIES = [
+    (TOP, 'input[type="file"]', 8000),
+    (UPLOAD_IFRAME, 'input[type="file"]', 8000),
+    (ANY_FRAME, 'input[type="file"]', 5000),
+]
+CAPTION_STRATEGIES = [
+    (TOP, CAPTION_SELECTOR, 8000),
+    (UPLOAD_IFRAME, CAPTION_SELECTOR, 8000),
+    (ANY_FRAME, CAPTION_SELECTOR, 5000),
+]
+POST_BUTTON_STRATEGIES = [
+    (TOP, POST_SELECTOR, 60000),
+    (UPLOAD_IFRAME, POST_SELECTOR, 60000),
+    (ANY_FRAME, POST_SELECTOR, 10000),
+]
 
 class TikTokPoster:
-    def __init__(self, page: Page, human):
+    def __init__(self, page: Page, human, timer=None, base_url=None, artifacts=None):
         self.page = page
         self.human = human
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        # Phase stopwatch (see timing.py). main.py passes a real one; otherwise it's a throwaway.
+        self.timer = timer or JobTimer()
+        # Where failure screenshots / DOM snapshots go (see artifacts.py). main.py passes the job's bundle.
+        self.artifacts = artifacts or JobArtifacts(page, platform='tiktok')
+        # Why the last create_post() failed. main.py stores it in the queue's 'last_error' column.
+        self.last_error = None
 
     def create_post(self, text: str, media_path: str = None) -> bool:
         if not media_path:
             print("❌ TikTok requires a video to post!")
+            self.last_error = "TikTok requires a video to post!"
             return False
             
         if not media_path.lower().endswith('.mp4'):
@@ -25,8 +65,9 @@ class TikTokPoster:
             # ==========================================
             # 🏃‍♂️ PHASE 1: THE WARM UP
             # ==========================================
+            self.timer.phase("warmup")
             print("🏠 Navigating to TikTok for warm-up...")
-            self.page.goto("https://www.tiktok.com/", wait_until="domcontentloaded")
+            self.page.goto(f"{self.base_url}/", wait_until="domcontentloaded")
             
             # Big pause here needed because TikTok loves to show captchas or login modals 
             # if we jump too fast to the upload center.
@@ -36,10 +77,11 @@ class TikTokPoster:
             # ==========================================
             # ✍️ PHASE 2: OPENING THE UPLOAD CENTER
             # ==========================================
+            self.timer.phase("navigation")
             print("🎥 Opening TikTok Upload Center...")
             # 'networkidle' fails on TikTok because they constantly stream analytics.
             # Using 'domcontentloaded' prevents the 30000ms timeout error.
-            self.page.goto("https://www.tiktok.com/creator-center/upload", wait_until="domcontentloaded", timeout=60000)
+            self.page.goto(f"{self.base_url}/creator-center/upload", wait_until="domcontentloaded", timeout=60000)
             self.human.sleep(5, 8)
 
             # Switch to iframe if necessary (TikTok's upload center is heavily dynamic)
@@ -48,44 +90,28 @@ class TikTokPoster:
             # ==========================================
             # 📎 PHASE 3: HANDLING MEDIA
             # ==========================================
+            self.timer.phase("media_attach")
             print(f"📎 Attaching media: {media_path}")
             
-            # Wait for either the iframe or the file input
-            file_uploaded = False
+            # Start listening BEFORE the file goes in, or we'd miss the first upload request
+            upload = UploadWatcher(self.page, 'tiktok', media_path, guard=self.human.guard).start()
             try:
-                # Direct DOM method (newer TikTok layout)
-                self.page.locator('input[type="file"]').first.set_input_files(media_path, timeout=8000)
-                file_uploaded = True
-            except:
-                print("⚠️ Direct DOM failed. Searching specific iframes...")
-                try:
-                    frame_locator = self.page.frame_locator('iframe[data-tt="Upload_index_iframe"]')
-                    frame_locator.locator('input[type="file"]').first.set_input_files(media_path, timeout=8000)
-                    file_uploaded = True
-                except:
-                    pass
-                
-                if not file_uploaded:
-                    print("⚠️ Searching all frames for input... TikTok may have disguised the iframe.")
-                    for f in self.page.frames:
-                        try:
-                            if f.locator('input[type="file"]').count() > 0:
-                                f.locator('input[type="file"]').first.set_input_files(media_path, timeout=5000)
-                                file_uploaded = True
-                                break
-                        except:
-                            pass
-
-            if not file_uploaded:
+                locators.resolve(self.page, 'tiktok', 'file_input', FILE_INPUT_STRATEGIES,
+                                 lambda file_input, timeout: file_input.set_input_files(media_path, timeout=timeout))
+            except LocatorNotFound:
+                upload.stop()
                 raise Exception("Could not locate the file upload input anywhere. Page structure changed or captcha present.")
 
+            self.timer.phase("upload_wait")
             print("⏳ Uploading video to TikTok's servers... this takes a while.")
-            # Videos take time to process on their end.
-            self.human.sleep(15, 25) 
+            # Returns as soon as the upload is really done; raises with the reason if it stalls.
+            print(f"✅ Upload finished ({upload.wait()}).")
+            self.human.sleep(1, 3)
 
             # ==========================================
             # 🛡️ NEW PHASE: CLEARING BLOCKING MODALS
             # ==========================================
+            self.timer.phase("modal_check")
             # TikTok sometimes shows a "Discard video?" or "Are you sure you want to exit?" 
             # modal if it thinks we are trying to navigate away.
             try:
@@ -100,122 +126,73 @@ class TikTokPoster:
                     # We look for 'Cancel' or 'Stay' to keep the video
                     try:
                         self.page.locator('button:has-text("Cancel")').first.click(timeout=2000)
-                    except:
+                    except PlaywrightError:
                         self.page.locator('button:has-text("Stay")').first.click(timeout=2000)
                     self.human.sleep(1, 2)
-            except:
+            except PlaywrightError:
                 pass # Modal didn't appear, proceeding as normal
             
             # ==========================================
             # 🗣️ PHASE 4: TYPING THE CAPTION
             # ==========================================
+            self.timer.phase("caption")
             print("✍️ Typing caption...")
             
-            caption_entered = False
-            caption_selector = '.public-DraftEditor-content, div[contenteditable="true"]'
-            
-            try:
-                # Direct DOM
-                self.page.locator(caption_selector).first.click(timeout=8000)
+            def enter_caption(caption_box, timeout):
+                caption_box.click(timeout=timeout)
                 self.page.keyboard.press("Control+A")
                 self.page.keyboard.press("Backspace")
                 self.human.sleep(1, 2)
-                self.human.human_type(caption_selector, text)
-                caption_entered = True
-            except:
-                print("⚠️ Direct DOM caption failed. Searching iframes...")
-                try:
-                    frame_locator = self.page.frame_locator('iframe[data-tt="Upload_index_iframe"]')
-                    frame_locator.locator(caption_selector).first.click(timeout=8000)
-                    self.page.keyboard.press("Control+A")
-                    self.page.keyboard.press("Backspace")
-                    self.human.sleep(1, 2)
-                    for char in text:
-                        self.page.keyboard.type(char)
-                        import random
-                        time.sleep(random.uniform(0.05, 0.15))
-                    caption_entered = True
-                except:
-                    pass
-                    
-                if not caption_entered:
-                    for f in self.page.frames:
-                        try:
-                            if f.locator(caption_selector).count() > 0:
-                                f.locator(caption_selector).first.click(timeout=5000)
-                                self.page.keyboard.press("Control+A")
-                                self.page.keyboard.press("Backspace")
-                                self.human.sleep(1, 2)
-                                for char in text:
-                                    self.page.keyboard.type(char)
-                                    import random
-                                    time.sleep(random.uniform(0.05, 0.15))
-                                caption_entered = True
-                                break
-                        except:
-                            pass
+                # The box has focus now, wherever it lives (the page or an iframe)
+                self.human.type_keys(text)
+
+            try:
+                locators.resolve(self.page, 'tiktok', 'caption_box', CAPTION_STRATEGIES, enter_caption)
+            except LocatorNotFound:
+                print("⚠️ Caption box not found anywhere. Continuing without a caption.")
 
             self.human.sleep(2, 4)
             
             # ==========================================
             # 🚀 PHASE 5: THE STEALTH POST METHOD
             # ==========================================
+            self.timer.phase("submit")
             print("🚀 Clicking Post...")
             
             # Scroll down to the bottom of the page to reveal the Post button
             self.page.mouse.wheel(0, 2000)
             self.human.sleep(1, 2)
             
-            post_clicked = False
-            # We use the specific data-e2e attribute provided by TikTok for the post button.
-            # This is much more reliable than searching for the text "Post" which can match other elements.
-            post_selector = '[data-e2e="post_video_button"]'
-            
             try:
-                 # Direct DOM posting
-                 self.page.locator(post_selector).first.click(timeout=60000)
-                 post_clicked = True
-            except:
-                try:
-                    # iFrame posting
-                    frame_locator = self.page.frame_locator('iframe[data-tt="Upload_index_iframe"]')
-                    frame_locator.locator(post_selector).first.click(timeout=60000)
-                    post_clicked = True
-                except:
-                    pass
-                    
-                if not post_clicked:
-                    for f in self.page.frames:
-                        try:
-                            if f.locator(post_selector).count() > 0:
-                                f.locator(post_selector).first.click(timeout=10000)
-                                post_clicked = True
-                                break
-                        except:
-                            pass
+                post_button = locators.resolve(self.page, 'tiktok', 'post_button', POST_BUTTON_STRATEGIES,
+                                               lambda button, timeout: button.click(timeout=timeout))
+            except LocatorNotFound:
+                post_button = self.page.locator(POST_SELECTOR) # the verification below will catch it
             
             # ==========================================
             # 🕵️‍♂️ PHASE 6: VERIFICATION
             # ==========================================
+            self.timer.phase("confirmation")
             print("⏳ Waiting for success confirmation...")
             try:
                 # TikTok usually redirects to a manage screen or shows a confirmation. 
                 # We wait specifically for the 'Manage your posts' text or a redirection.
                 self.page.wait_for_selector("text=Manage your posts", timeout=60000)
                 print("✅ Success confirmation detected!")
-            except:
+            except PlaywrightError:
                 print("⚠️ Success text not found. Verifying if Post button is still present...")
                 # We check if the Post button is still visible. If it IS, that means the click failed.
                 # If it is GONE, we assume the redirection happened but Playwright missed the text.
                 button_still_there = False
                 try:
-                    if self.page.locator(post_selector).is_visible(timeout=5000):
+                    # Checked in the same frame the button was clicked in
+                    if post_button.is_visible(timeout=5000):
                         button_still_there = True
-                except:
+                except PlaywrightError:
                     pass
                 
                 if button_still_there:
-                    self.page.screenshot(path="logs/tiktok_stuck_on_post.png")
+                    self.artifacts.capture("tiktok_stuck_on_post")
                     raise Exception("Failing: The 'Post' button is still visible after clicking. The post likely failed or was blocked by a popup.")
                 else:
                     print("✅ Post button is gone. Assuming success.")
@@ -223,6 +200,7 @@ class TikTokPoster:
             # ==========================================
             # 🧊 PHASE 7: THE COOL DOWN
             # ==========================================
+            self.timer.phase("cooldown")
             print("🧊 Cooling down session...")
             self.human.sleep(3, 5)
 
@@ -230,10 +208,6 @@ class TikTokPoster:
 
         except Exception as e:
             print(f"❌ Failed to post on TikTok: {e}")
-            if not os.path.exists("logs"):
-                 os.makedirs("logs")
-            try:
-                self.page.screenshot(path="logs/failed_tiktok_post.png")
-            except:
-                pass
+            self.last_error = str(e)
+            self.artifacts.capture("failed_tiktok_post")
             return False
@@ -0,0 +1,204 @@
+"""
+SHADOW POSTER - TIMING & RUN HISTORY
+A stopwatch for every job. The posters mark where each phase starts
+(warm-up, navigation, media attach, upload wait, caption, submit, confirmation, cool-down)
+and main.py times the browser launch. When the job ends, one JSON line with every phase's
+duration (and Chrome's peak/average CPU and memory, see resource_monitor.py) is appended
+to logs/timings.jsonl.
+
+The report tells you which phase got slower when a platform starts dragging:
+
+    python timing.py report              (last 7 days)
+    python timing.py report --since 24h --platform tiktok
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Ensure Windows terminal doesn't crash on emojis
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+HISTORY_PATH = os.path.join(os.getcwd(), "logs", "timings.jsonl")
+
+# Called as phase_listener(timer, name) every time a job enters a phase. The supervisor's job
+# process (supervisor.py) uses it to tell its parent how far the job got. None = nobody listens.
+phase_listener = None
+
+
+class JobTimer:
+    """
+    Collects named spans for one job. Posters call phase('caption') as they move along:
+    that closes the previous phase and opens the next. span() times one self-contained block.
+    A JobTimer without a job_id is a throwaway (finish() won't write anything).
+    """
+
+    def __init__(self, job_id=None, platform=None, username=None):
+        self.job_id = job_id
+        self.platform = platform
+        self.username = username
+        self.started = time.time()
+        self._origin = time.perf_counter() # perf_counter is the right clock for durations
+        self.spans = []          # [name, start offset, duration]
+        self.extra = {}          # anything else worth keeping next to the job result
+        self._open = None        # (name, perf_counter at start) of the running phase
+        self.finished = False
+
+    def _close_open(self):
+        if self._open:
+            name, began = self._open
+            self.spans.append([name, round(began - self._origin, 3), round(time.perf_counter() - began, 3)])
+            self._open = None
+
+    def phase(self, name):
+        """Ends whatever phase is running and starts `name`."""
+        self._close_open()
+        self._open = (name, time.perf_counter())
+        if phase_listener is not None:
+            phase_listener(self, name)
+
+    def current_phase(self):
+        """Name of the phase running right now (None before the first one / after finish)."""
+        return self._open[0] if self._open else None
+
+    @contextmanager
+    def span(self, name):
+        """Times just the `with` block (doesn't disturb the phase sequence)."""
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append([name, round(began - self._origin, 3), round(time.perf_counter() - began, 3)])
+
+    def totals(self):
+        """Seconds per phase name (a phase that happens twice, like a retry, is summed)."""
+        totals = defaultdict(float)
+        for name, _, duration in self.spans:
+            totals[name] += duration
+        return {name: round(value, 3) for name, value in totals.items()}
+
+    def finish(self, success, error=None):
+        """Closes the last phase and appends the job's record to the run history (once)."""
+        self._close_open()
+        if self.finished or self.job_id is None:
+            return None
+        self.finished = True
+        record = {
+            "ts": round(self.started, 3),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+            "job_id": str(self.job_id),
+            "platform": self.platform,
+            "username": self.username,
+            "success": bool(success),
+            "error": error,
+            "total": round(time.time() - self.started, 3),
+            "phases": self.totals(),
+            "spans": self.spans,
+        }
+        record.update(self.extra)
+        try:
+            os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+            with open(HISTORY_PATH, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"⚠️ Couldn't write timing history: {e}")
+        return record
+
+
+# ==========================================
+# 📊 REPORTING
+# ==========================================
+def parse_window(text):
+    """'90m', '24h', '7d' -> seconds."""
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (no numpy needed)."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def load_history(since_seconds=None, platform=None, path=HISTORY_PATH):
+    cutoff = time.time() - since_seconds if since_seconds else 0
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue # a half-written line from a crashed run
+            if record.get("ts", 0) < cutoff:
+                continue
+            if platform and record.get("platform") != platform:
+                continue
+            records.append(record)
+    return records
+
+
+def summarize(records):
+    """{platform: {phase: [durations]}} plus a 'total' pseudo-phase and success counts."""
+    stats = defaultdict(lambda: defaultdict(list))
+    outcomes = defaultdict(lambda: [0, 0])
+    for record in records:
+        platform = record.get("platform") or "?"
+        for name, duration in record.get("phases", {}).items():
+            stats[platform][name].append(duration)
+        stats[platform]["total"].append(record.get("total", 0))
+        outcomes[platform][0 if record.get("success") else 1] += 1
+    return stats, outcomes
+
+
+def print_report(since_seconds, platform=None):
+    records = load_history(since_seconds, platform)
+    if not records:
+        print("📭 No timing history in that window.")
+        return
+    stats, outcomes = summarize(records)
+    for plat in sorted(stats):
+        ok, failed = outcomes[plat]
+        print(f"\n📊 {plat.upper()}  ({ok} ok / {failed} failed)")
+        print(f"   {'PHASE':<16} {'N':>5} {'P50':>9} {'P95':>9} {'MAX':>9}")
+        # Phases in the order they usually happen, then anything else, then the total.
+        phases = sorted(stats[plat], key=lambda name: (name == "total", _PHASE_ORDER.get(name, 99), name))
+        for name in phases:
+            values = stats[plat][name]
+            print(f"   {name:<16} {len(values):>5} {percentile(values, 50):>8.1f}s {percentile(values, 95):>8.1f}s {max(values):>8.1f}s")
+        # Chrome's footprint per job, when resource_monitor.py could measure it (needs psutil).
+        usage = [r["resources"] for r in records if (r.get("platform") or "?") == plat and r.get("resources")]
+        if usage:
+            print(f"   {'CHROME (PEAK)':<16} {'N':>5} {'P50':>9} {'P95':>9} {'MAX':>9}")
+            for key, label, unit in (("peak_rss_mb", "memory", "MB"), ("peak_cpu", "cpu", "%"), ("peak_fds", "handles", "")):
+                values = [u[key] for u in usage if key in u]
+                print(f"   {label:<16} {len(values):>5} {percentile(values, 50):>7.0f}{unit:<2} {percentile(values, 95):>7.0f}{unit:<2} {max(values):>7.0f}{unit:<2}")
+            breaches = sum(1 for u in usage if u.get("limit_breach"))
+            if breaches:
+                print(f"   🚫 {breaches} job(s) hit a resource limit")
+
+
+_PHASE_ORDER = {name: i for i, name in enumerate(
+    ["browser_launch", "warmup", "navigation", "media_attach", "upload_wait", "caption", "submit", "confirmation", "cooldown"])}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-phase timing report for past posting jobs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_parser = sub.add_parser("report", help="p50/p95/max per platform and phase")
+    report_parser.add_argument("--since", default="7d", help="time window, e.g. 90m, 24h, 7d (default 7d)")
+    report_parser.add_argument("--platform", choices=["ig", "tiktok", "x"], default=None)
+    args = parser.parse_args()
+
+    print_report(parse_window(args.since), args.platform)
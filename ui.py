@@ -1,10 +1,16 @@
 """
 SHADOW POSTER - UI
 Graphical interface for launching the poster and configuring accounts.
+Posting jobs are handed to the warm poster service (poster_service.py), which is started
+in the background on first use, so the window opens instantly and clicks don't wait
+for Playwright to load. '⛔ Cancel Job' kills the job that's running (see supervisor.py).
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+import argparse
+import collections
+import queue
 import threading
 import sys
 import os
@@ -12,37 +18,189 @@ import time
 
 # Add custom path to access login script
 sys.path.append(os.path.join(os.path.dirname(__file__), "Login scripts"))
-from login_helper import save_session
-import main
+# Only the tiny client side is imported here. main.py and login_helper.py pull in Playwright,
+# so they are imported on first use instead of making the window wait for them.
+import poster_service
+import log_context
 
-class PrintRedirector:
-    """Redirects print statements to the Tkinter text widget"""
-    def __init__(self, text_widget):
-        self.text_widget = text_widget
-        self.original_stdout = sys.stdout
-        self.original_stderr = sys.stderr
+# ==========================================
+# 🪵 CONSOLE LOG PUMP
+# ==========================================
+LOG_FPS = 20                  # console redraws per second
+LOG_MAX_LINES = int(os.environ.get("SHADOW_UI_MAX_LINES", "5000"))
+LOG_BATCH_LIMIT = 5000        # most writes taken off the queue in one redraw (the rest wait for the next)
+LOG_FILE = os.path.join(os.getcwd(), "logs", "ui.log")
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+LEVEL_RANK = {level: rank for rank, level in enumerate(log_context.LEVELS)}
+LEVEL_FILTERS = {"All messages": 'info', "Warnings & errors": 'warning', "Errors only": 'error'}
+PLATFORM_FILTERS = {"All platforms": None, "X": 'x', "IG": 'ig', "TikTok": 'tiktok', "General": ''}
+
+
+class RotatingLogFile:
+    """Appends to logs/ui.log. Past max_bytes it becomes ui.log.1 (then .2 ... up to `backups`)."""
+
+    def __init__(self, path=LOG_FILE, max_bytes=LOG_FILE_MAX_BYTES, backups=LOG_FILE_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.file = open(path, 'a', encoding='utf-8')
 
     def write(self, text):
-        self.text_widget.insert(tk.END, text)
-        self.text_widget.see(tk.END)
-        # We also print to regular terminal just in case
-        try:
-            self.original_stdout.write(text)
-        except Exception:
-            pass
+        self.file.write(text)
+        self.file.flush()
+        if self.file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self.file.close()
+        for number in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{number}"):
+                os.replace(f"{self.path}.{number}", f"{self.path}.{number + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        self.file = open(self.path, 'w' if not self.backups else 'a', encoding='utf-8')
+
+    def close(self):
+        self.file.close()
+
+
+class _PumpStream:
+    """What sys.stdout / sys.stderr point at. Safe from any thread: it only puts text on the queue."""
+
+    def __init__(self, pump, level=None):
+        self.pump = pump
+        self.level = level
+
+    def write(self, text):
+        if text:
+            self.pump.queue.put((threading.get_ident(), log_context.current_platform(), self.level, text))
+        return len(text)
 
     def flush(self):
+        pass
+
+
+class LogPump:
+    """
+    Replaces the old print redirector, which drew on the Tk widget straight from the worker
+    threads. Now the threads only queue their text; the Tk main loop takes it off LOG_FPS
+    times a second and draws the whole batch with one insert.
+    The newest max_lines lines are kept in a ring buffer (the filters redraw from it) and the
+    console never holds more than that, so an all-night batch doesn't slowly eat the UI.
+    """
+
+    def __init__(self, root, text_widget, max_lines=LOG_MAX_LINES, fps=LOG_FPS, log_file=None):
+        self.root = root
+        self.widget = text_widget
+        self.queue = queue.SimpleQueue()
+        self.max_lines = max_lines
+        self.ring = collections.deque(maxlen=max_lines)  # (level, platform, line) of the newest lines
+        self.interval_ms = max(1, int(1000 / fps))
+        self.partial = {}    # (thread id, stream) -> (platform, level, text) of a line still waiting for its '\n'
+        self.shown = 0       # lines currently in the widget
+        self.min_level = 'info'
+        self.platform = None # None = every line, '' = lines not tied to a platform
+        self.mirror = RotatingLogFile(log_file) if log_file else None
+        self.terminal = sys.stdout
+        self.stdout = _PumpStream(self)
+        self.stderr = _PumpStream(self, 'error')
+        self.widget.tag_configure('warning', foreground="#ffcc00")
+        self.widget.tag_configure('error', foreground="#ff5555")
+        self._after = self.root.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        self.drain()
+        self._after = self.root.after(self.interval_ms, self._tick)
+
+    def _collect(self):
+        """Takes what the threads wrote off the queue and cuts it into whole lines (per thread)."""
+        lines = []
+        for _ in range(LOG_BATCH_LIMIT):
+            try:
+                thread_id, platform, level, text = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            key = (thread_id, level) # stdout and stderr of one thread are separate lines
+            line_platform, line_level, held = self.partial.pop(key, (platform, level, ""))
+            pieces = (held + text).split('\n')
+            for piece in pieces[:-1]:
+                lines.append((line_level or log_context.level_of(piece), line_platform, piece + '\n'))
+                line_platform, line_level = platform, level
+            if pieces[-1]:
+                self.partial[key] = (line_platform, line_level, pieces[-1])
+        return lines
+
+    def _visible(self, record):
+        level, platform, _ = record
+        return LEVEL_RANK[level] >= LEVEL_RANK[self.min_level] and (self.platform is None or (platform or '') == self.platform)
+
+    def drain(self):
+        lines = self._collect()
+        if not lines:
+            return
+        self.ring.extend(lines)
+        text = ''.join(line for _, _, line in lines)
         try:
-            self.original_stdout.flush()
-        except:
+            self.terminal.write(text) # We also print to regular terminal just in case
+            self.terminal.flush()
+        except Exception:
             pass
+        if self.mirror:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+            self.mirror.write(''.join(f"{stamp} {level:<7} {platform or '-':<6} {line}" for level, platform, line in lines))
+        self._draw([record for record in lines if self._visible(record)])
+
+    def _draw(self, records, replace=False):
+        at_bottom = self.widget.yview()[1] >= 0.999 # don't yank the view away from someone scrolling back
+        if replace:
+            self.widget.delete('1.0', tk.END)
+            self.shown = 0
+        records = records[-self.max_lines:]
+        if records:
+            chunks = []
+            for level, _, line in records:
+                chunks += [line, level]
+            self.widget.insert(tk.END, *chunks)
+            self.shown += len(records)
+        excess = self.shown - self.max_lines
+        if excess > 0:
+            self.widget.delete('1.0', f"{excess + 1}.0")
+            self.shown -= excess
+        if at_bottom or replace:
+            self.widget.see(tk.END)
+
+    def set_filter(self, min_level=None, platform=False):
+        """Changes what the console shows and redraws it from the ring buffer."""
+        if min_level is not None:
+            self.min_level = min_level
+        if platform is not False:
+            self.platform = platform
+        self._draw([record for record in self.ring if self._visible(record)], replace=True)
+
+    def set_mirror(self, path):
+        """Starts (path) or stops (None) copying every line, unfiltered, to a rotating log file."""
+        if self.mirror:
+            self.mirror.close()
+        self.mirror = RotatingLogFile(path) if path else None
+
+    def close(self):
+        if self._after:
+            self.root.after_cancel(self._after)
+            self._after = None
+        self.drain()
+        for (thread_id, level), (platform, _, _) in list(self.partial.items()):
+            self.queue.put((thread_id, platform, level, '\n')) # finish lines that never got their '\n'
+        self.drain()
+        self.set_mirror(None)
 
 
 class ShadowPosterUI:
-    def __init__(self, root):
+    def __init__(self, root, max_lines=LOG_MAX_LINES, fps=LOG_FPS, log_file=None):
         self.root = root
         self.root.title("Shadow Poster Control Panel")
-        self.root.geometry("600x450")
+        self.root.geometry("600x480")
         
         # Style
         style = ttk.Style()
@@ -87,20 +245,56 @@ class ShadowPosterUI:
         ttk.Button(btn_frame, text="Log into X (Twitter)", command=lambda: self.run_login('1')).grid(row=1, column=2, padx=10, pady=5)
         ttk.Button(btn_frame, text="Log into Instagram", command=lambda: self.run_login('2')).grid(row=2, column=2, padx=10, pady=5)
         ttk.Button(btn_frame, text="Log into TikTok", command=lambda: self.run_login('3')).grid(row=3, column=2, padx=10, pady=5)
+        ttk.Button(btn_frame, text="⛔ Cancel Job", command=self.cancel_job).grid(row=4, column=2, padx=10, pady=5)
+        ttk.Button(btn_frame, text="📋 Browse Queue", command=self.open_queue).grid(row=5, column=2, padx=10, pady=5)
 
         # ---------------------
         # CONSOLE OUTPUT
         # ---------------------
-        ttk.Label(main_frame, text="System Logs:").pack(anchor="w")
+        log_bar = ttk.Frame(main_frame)
+        log_bar.pack(fill=tk.X)
+        ttk.Label(log_bar, text="System Logs:").pack(side=tk.LEFT)
+        self.mirror_var = tk.BooleanVar(value=bool(log_file))
+        ttk.Checkbutton(log_bar, text="Save to file", variable=self.mirror_var, command=self.toggle_mirror).pack(side=tk.RIGHT)
+        self.platform_filter = tk.StringVar(value="All platforms")
+        platform_box = ttk.Combobox(log_bar, textvariable=self.platform_filter, values=list(PLATFORM_FILTERS), state="readonly", width=12)
+        platform_box.pack(side=tk.RIGHT, padx=5)
+        platform_box.bind("<<ComboboxSelected>>", lambda _: self.pump.set_filter(platform=PLATFORM_FILTERS[self.platform_filter.get()]))
+        self.level_filter = tk.StringVar(value="All messages")
+        level_box = ttk.Combobox(log_bar, textvariable=self.level_filter, values=list(LEVEL_FILTERS), state="readonly", width=16)
+        level_box.pack(side=tk.RIGHT)
+        level_box.bind("<<ComboboxSelected>>", lambda _: self.pump.set_filter(min_level=LEVEL_FILTERS[self.level_filter.get()]))
+
+        # The supervisor of a job running inside the UI (only when the poster service couldn't be reached)
+        self.local_supervisor = None
+
         self.console = scrolledtext.ScrolledText(main_frame, wrap=tk.WORD, height=15, bg="#1e1e1e", fg="#00ff00", font=("Consolas", 10))
         self.console.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
 
-        # Redirect standard output
-        sys.stdout = PrintRedirector(self.console)
-        sys.stderr = sys.stdout # Redirect errors here too
+        # Redirect standard output (and errors) through the log pump
+        self.log_file = log_file or LOG_FILE
+        self.pump = LogPump(root, self.console, max_lines=max_lines, fps=fps, log_file=log_file)
+        sys.stdout = self.pump.stdout
+        sys.stderr = self.pump.stderr
 
         print("System Initialized. Ready for commands.")
 
+    def open_queue(self):
+        """Opens the queue browser (or brings it to the front if it's already open)."""
+        browser = getattr(self, 'queue_browser', None)
+        if browser is not None and browser.alive:
+            browser.window.lift()
+            return
+        from queue_browser import QueueBrowser
+        self.queue_browser = QueueBrowser(self.root)
+
+    def toggle_mirror(self):
+        if self.mirror_var.get():
+            self.pump.set_mirror(self.log_file)
+            print(f"💾 Saving the full log to {self.log_file}")
+        else:
+            self.pump.set_mirror(None)
+
     def run_poster(self, target_platform=None):
         username = self.username_var.get().strip()
         if not username:
@@ -111,9 +305,35 @@ class ShadowPosterUI:
         # Run in thread so UI doesn't freeze
         threading.Thread(target=self._run_poster_thread, args=(target_platform, username), daemon=True).start()
         
+    def _run_job(self, target_platform, username, drain):
+        """Runs the job on the poster service, or right here in this thread if the service can't be reached."""
+        if poster_service.ping() is None:
+            print("🔌 Starting the poster service (only the first time)...")
+        if poster_service.ensure_running():
+            reply = poster_service.submit_job(target_platform, username, drain, on_log=lambda text: sys.stdout.write(text))
+            if reply is not None:
+                if reply.get("error"):
+                    print(f"❌ Critical Error: {reply['error']}")
+                return
+        print("⚠️ Poster service unavailable. Running the job inside the UI instead.")
+        import supervisor
+        if supervisor.ENABLED:
+            self.local_supervisor = supervisor.Supervisor()
+            try:
+                self.local_supervisor.run(target_platform, username, drain)
+            finally:
+                self.local_supervisor = None
+            return
+        import main
+        if drain:
+            main.drain(target_platform, username)
+        else:
+            main.main(target_platform, username)
+
     def _run_poster_thread(self, target_platform, username):
         try:
-            main.main(target_platform, username)
+            with log_context.platform(target_platform):
+                self._run_job(target_platform, username, drain=False)
             print("--- Bot finished ---")
         except Exception as e:
             print(f"❌ Critical Error: {e}")
@@ -128,22 +348,28 @@ class ShadowPosterUI:
 
     def _run_post_all_thread(self, username):
         try:
-            from content_manager import ContentManager
-            cm = ContentManager()
-            while True:
-                job = cm.get_next_post(None, username)
-                if not job:
-                    print(f"✅ Completed processing all pending posts for {username}!")
-                    break
-                
-                print(f"\n>>> Processing Batch Post: ID {job['id']} for {job['platform'].upper()} (User: {username})...")
-                main.main(None, username)
-                time.sleep(3) # Small delay to give resources a break before opening the next browser
-                
+            # One pass over the queue, one browser per account/platform group (see main.drain)
+            self._run_job(None, username, drain=True)
             print("--- Bot batch finish ---")
         except Exception as e:
             print(f"❌ Critical Error: {e}")
 
+    def cancel_job(self):
+        """Kills the running job (and its browser). The rest of the queue is left as it is."""
+        local = self.local_supervisor
+        if local is not None:
+            stopped = local.cancel()
+        else:
+            reply = poster_service.cancel_job()
+            if reply is None:
+                print("💤 No job is running right now.")
+                return
+            if not reply.get("ok"):
+                print(f"⚠️ Can't cancel: {reply['error']}")
+                return
+            stopped = reply["cancelled"]
+        print("⛔ Cancelling the running job..." if stopped else "💤 No job is running right now.")
+
     def run_login(self, choice):
         username = self.username_var.get().strip()
         if not username:
@@ -159,17 +385,26 @@ class ShadowPosterUI:
 
     def _run_login_thread(self, choice, username):
         try:
+            from login_helper import save_session
             save_session(choice=choice, is_ui=True, username=username)
             print("--- Configuration saved successfully! ---")
         except Exception as e:
             print(f"❌ Configuration Error: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shadow Poster - control panel")
+    parser.add_argument("--max-lines", type=int, default=LOG_MAX_LINES, help="lines kept in the console")
+    parser.add_argument("--fps", type=int, default=LOG_FPS, help="console redraws per second")
+    parser.add_argument("--log-file", nargs="?", const=LOG_FILE, default=None,
+                        help=f"also save the full log to a rotating file (default path: {LOG_FILE})")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    app = ShadowPosterUI(root)
+    app = ShadowPosterUI(root, max_lines=args.max_lines, fps=args.fps, log_file=args.log_file)
     
     # Reset sys.stdout on exit to prevent errors
     def on_closing():
+        app.pump.close()
         sys.stdout = sys.__stdout__
         sys.stderr = sys.__stderr__
         root.destroy()
@@ -0,0 +1,202 @@
+"""
+SHADOW POSTER - UPLOAD WATCHER
+Replaces the blind 'sleep 15-25 seconds and hope' after attaching a video.
+
+The watcher listens to the page while the file goes up:
+  - the network: the platform's upload requests starting, finishing or failing
+  - the DOM: progress bars / percentages, 'uploaded' markers and error banners
+and returns the moment the upload is really done. A small clip no longer waits 25s,
+a big one is no longer mid-upload when the caption step starts, and a stuck upload
+fails with a reason ('no progress for 60s, last seen 45%') instead of a confusing
+timeout three steps later.
+
+Usage inside a poster (the watcher must be started BEFORE set_input_files):
+    upload = UploadWatcher(self.page, 'tiktok', media_path).start()
+    ...set_input_files(...)
+    upload.wait()
+"""
+
+import os
+import re
+import time
+
+# ==========================================
+# 📡 WHAT 'UPLOADING' LOOKS LIKE PER PLATFORM
+# ==========================================
+# upload_urls      regexes for the requests that carry the file (POST/PUT only)
+# progress         selectors visible WHILE uploading (a bar, a percentage...)
+# ready            selectors that appear once the media is in (preview, 'Uploaded' label, Next button)
+# errors           selectors that mean the platform rejected the upload
+# base_timeout     seconds allowed for any file, plus seconds_per_mb for each MB of it
+# stall_seconds    fail if nothing at all changes for this long
+# settle_seconds   network-only completion: how long the uploads must stay quiet before we believe it
+UPLOAD_SIGNALS = {
+    'tiktok': {
+        'upload_urls': [r"/upload", r"vod.*\.(tiktok|byte)", r"tos-[a-z0-9-]+\.(tiktok|byte)"],
+        'progress': ['[role="progressbar"]', 'text=/^\\s*\\d{1,3}(\\.\\d+)?%\\s*$/'],
+        'ready': ['text=/^\\s*Uploaded\\b/i', '[data-e2e="upload_status_container"] >> text=/uploaded/i'],
+        'errors': ['text=/(upload failed|couldn.t upload|couldn.t be uploaded|video not supported)/i'],
+        'base_timeout': 45,
+        'seconds_per_mb': 4,
+        'stall_seconds': 60,
+        'settle_seconds': 3,
+    },
+    'ig': {
+        # Instagram renders the media locally first; the real transfer happens on Share.
+        'upload_urls': [r"/rupload_ig(photo|video)/"],
+        'progress': ['[role="progressbar"]'],
+        'ready': ['div[role="dialog"] >> text=Next'],
+        'errors': ['text=/(could not be uploaded|file is not supported|something went wrong)/i'],
+        'base_timeout': 20,
+        'seconds_per_mb': 0.5,
+        'stall_seconds': 30,
+        'settle_seconds': 1,
+    },
+}
+
+POLL_MS = 500          # how often the page is checked (this is also what lets Playwright deliver events)
+FAILURE_GRACE = 5      # a failed upload request gets this long to be retried by the site before we give up
+MAX_TIMEOUT = 15 * 60  # nothing should take longer than this, however big the file
+
+
+class UploadStalled(Exception):
+    """The upload failed, stopped making progress or ran out of time."""
+
+
+class UploadWatcher:
+    def __init__(self, page, platform, media_path, guard=None):
+        self.page = page
+        self.platform = platform
+        self.guard = guard         # called every poll; raising from it aborts the wait (see resource_monitor.py)
+        self.signals = UPLOAD_SIGNALS[platform]
+        self.url_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.signals['upload_urls']]
+        try:
+            self.size_mb = os.path.getsize(media_path) / (1024 * 1024)
+        except (OSError, TypeError):
+            self.size_mb = 0
+        self.timeout = min(MAX_TIMEOUT, self.signals['base_timeout'] + self.size_mb * self.signals['seconds_per_mb'])
+
+        self.pending = set()       # upload requests still in flight
+        self.finished = 0
+        self.failure = None        # (time, reason) of the last failed upload request
+        self.last_activity = None
+        self.last_progress = None  # the last progress value we read off the page ('45%')
+        self.listening = False
+
+    # ==========================================
+    # 🎧 NETWORK LISTENERS
+    # ==========================================
+    def _is_upload(self, request):
+        return request.method in ("POST", "PUT") and any(p.search(request.url) for p in self.url_patterns)
+
+    def _on_request(self, request):
+        if self._is_upload(request):
+            self.pending.add(request)
+            self.last_activity = time.monotonic()
+
+    def _on_finished(self, request):
+        if request in self.pending:
+            self.pending.discard(request)
+            self.finished += 1
+            self.failure = None # the site retried successfully
+            self.last_activity = time.monotonic()
+
+    def _on_failed(self, request):
+        if request in self.pending:
+            self.pending.discard(request)
+            self.failure = (time.monotonic(), request.failure or "request failed")
+            self.last_activity = time.monotonic()
+
+    def start(self):
+        """Call right BEFORE attaching the file, so the first upload request isn't missed."""
+        self.page.on("request", self._on_request)
+        self.page.on("requestfinished", self._on_finished)
+        self.page.on("requestfailed", self._on_failed)
+        self.listening = True
+        self.started = time.monotonic()
+        self.last_activity = self.started
+        return self
+
+    def stop(self):
+        """Detaches the listeners (the page may be reused for the next job in a batch)."""
+        if not self.listening:
+            return
+        self.listening = False
+        for event, handler in (("request", self._on_request), ("requestfinished", self._on_finished),
+                               ("requestfailed", self._on_failed)):
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+
+    # ==========================================
+    # 👀 DOM CHECKS
+    # ==========================================
+    def _visible(self, selectors):
+        """First visible match of any selector in any frame (TikTok's form often lives in an iframe)."""
+        for frame in self.page.frames:
+            for selector in selectors:
+                try:
+                    locator = frame.locator(selector)
+                    # count() and is_visible() don't wait, so a miss costs next to nothing
+                    if locator.count() and locator.first.is_visible():
+                        return locator.first
+                except Exception:
+                    pass
+        return None
+
+    def _read_progress(self, element):
+        try:
+            return element.get_attribute("aria-valuenow", timeout=POLL_MS) or element.inner_text(timeout=POLL_MS).strip()
+        except Exception:
+            return None
+
+    # ==========================================
+    # ⏳ THE WAIT
+    # ==========================================
+    def wait(self):
+        """
+        Blocks until the upload is done. Returns a short description of what proved it.
+        Raises UploadStalled with the reason otherwise. Always detaches the listeners.
+        """
+        if not self.listening:
+            self.start()
+        print(f"⏳ Watching the upload ({self.size_mb:.1f} MB, giving it up to {self.timeout:.0f}s)...")
+        try:
+            while True:
+                # Sleeping through Playwright (not time.sleep) keeps the network events flowing.
+                self.page.wait_for_timeout(POLL_MS)
+                if self.guard:
+                    self.guard()
+                now = time.monotonic()
+
+                error = self._visible(self.signals['errors'])
+                if error is not None:
+                    raise UploadStalled(f"{self.platform.upper()} rejected the upload: '{self._read_progress(error) or 'error shown'}'")
+
+                if self.failure and not self.pending and now - self.failure[0] > FAILURE_GRACE:
+                    raise UploadStalled(f"Upload request failed: {self.failure[1]}")
+
+                progress = self._visible(self.signals['progress'])
+                if progress is not None:
+                    value = self._read_progress(progress)
+                    if value != self.last_progress:
+                        self.last_progress = value
+                        self.last_activity = now
+                        if value:
+                            print(f"   ...{value}")
+
+                if not self.pending and progress is None:
+                    if self._visible(self.signals['ready']) is not None:
+                        return f"ready marker after {now - self.started:.1f}s"
+                    if self.finished and now - self.last_activity >= self.signals['settle_seconds']:
+                        return f"{self.finished} upload request(s) done after {now - self.started:.1f}s"
+
+                if now - self.last_activity > self.signals['stall_seconds']:
+                    last_seen = f", last seen {self.last_progress}" if self.last_progress else ""
+                    in_flight = f", {len(self.pending)} request(s) still open" if self.pending else ""
+                    raise UploadStalled(f"Upload stalled: no progress for {self.signals['stall_seconds']}s{last_seen}{in_flight}")
+                if now - self.started > self.timeout:
+                    raise UploadStalled(f"Upload not finished after {self.timeout:.0f}s ({self.size_mb:.1f} MB)")
+        finally:
+            self.stop()
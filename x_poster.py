@@ -4,22 +4,36 @@ This script handles the actual physical interaction with X.com.
 It actively mimics erratic human behavior to avoid the ban hammer.
 """
 
+import os
 import time
-from playwright.sync_api import Page
+from playwright.sync_api import Page, Error as PlaywrightError
+from timing import JobTimer
+from artifacts import JobArtifacts
+
+# Where the site lives. Point it at fixture_server.py to rehearse the whole flow offline.
+BASE_URL = os.environ.get("SHADOW_X_BASE_URL", "https://x.com")
 
 class XPoster:
-    def __init__(self, page: Page, human):
+    def __init__(self, page: Page, human, timer=None, base_url=None, artifacts=None):
         self.page = page
         self.human = human
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        # Phase stopwatch (see timing.py). main.py passes a real one; otherwise it's a throwaway.
+        self.timer = timer or JobTimer()
+        # Where failure screenshots / DOM snapshots go (see artifacts.py). main.py passes the job's bundle.
+        self.artifacts = artifacts or JobArtifacts(page, platform='x')
+        # Why the last create_post() failed. main.py stores it in the queue's 'last_error' column.
+        self.last_error = None
 
     def create_post(self, text: str, media_path: str = None) -> bool:
         try:
             # ==========================================
             # 🏃‍♂️ PHASE 1: THE WARM UP
             # ==========================================
+            self.timer.phase("warmup")
             print("🏠 Navigating to Home feed for warm-up...")
             # FIX: Changed from networkidle to domcontentloaded
-            self.page.goto("https://x.com/home", wait_until="domcontentloaded")
+            self.page.goto(f"{self.base_url}/home", wait_until="domcontentloaded")
             
             # Give the Javascript a second to render the actual tweets
             self.human.sleep(2, 4) 
@@ -28,20 +42,23 @@ class XPoster:
             # ==========================================
             # ✍️ PHASE 2: OPENING THE COMPOSER
             # ==========================================
+            self.timer.phase("navigation")
             print("🐦 Opening composer...")
             # FIX: Changed from networkidle to domcontentloaded
-            self.page.goto("https://x.com/compose/tweet", wait_until="domcontentloaded")
+            self.page.goto(f"{self.base_url}/compose/tweet", wait_until="domcontentloaded")
             self.human.sleep(2, 4)
             
             # ==========================================
             # 📎 PHASE 3: HANDLING MEDIA
             # ==========================================
             if media_path:
+                self.timer.phase("media_attach")
                 print(f"📎 Attaching media: {media_path}")
                 self.page.wait_for_selector('input[data-testid="fileInput"]', state="attached")
                 self.page.set_input_files('input[data-testid="fileInput"]', media_path)
                 
                 # Wait for the media (photo or video) to visually render in the composer box
+                self.timer.phase("upload_wait")
                 # Increased timeout to 120s to allow for video processing
                 self.page.wait_for_selector('button[aria-label="Remove"]', timeout=120000)
                 self.human.sleep(3, 5) 
@@ -49,6 +66,7 @@ class XPoster:
             # ==========================================
             # 🗣️ PHASE 4: TYPING THE CAPTION
             # ==========================================
+            self.timer.phase("caption")
             self.page.wait_for_selector('div[data-testid="tweetTextarea_0"]')
             self.human.human_type('div[data-testid="tweetTextarea_0"]', text)
             self.human.sleep(1, 3)
@@ -56,16 +74,18 @@ class XPoster:
             # ==========================================
             # 🚀 PHASE 5: THE STEALTH POST METHOD
             # ==========================================
+            self.timer.phase("submit")
             print("🚀 Sending via Ctrl+Enter...")
             self.page.keyboard.press("Control+Enter")
             
             # ==========================================
             # 🕵️‍♂️ PHASE 6: VERIFICATION
             # ==========================================
+            self.timer.phase("confirmation")
             try:
                 self.page.wait_for_selector('div[data-testid="toast"]', timeout=10000)
                 print("✅ Toast notification detected!")
-            except:
+            except PlaywrightError:
                 print("⚠️ No toast detected, checking if text box is empty...")
                 box_text = self.page.locator('div[data-testid="tweetTextarea_0"]').text_content()
                 if not box_text: 
@@ -76,9 +96,10 @@ class XPoster:
             # ==========================================
             # 🧊 PHASE 7: THE COOL DOWN
             # ==========================================
+            self.timer.phase("cooldown")
             print("🧊 Cooling down session...")
             # FIX: Changed from networkidle to domcontentloaded
-            self.page.goto("https://x.com/home", wait_until="domcontentloaded")
+            self.page.goto(f"{self.base_url}/home", wait_until="domcontentloaded")
             self.human.sleep(2, 4)
             self.human.scroll_feed(duration_seconds=40)
 
@@ -86,8 +107,6 @@ class XPoster:
 
         except Exception as e:
             print(f"❌ Failed to post: {e}")
-            try:
-                self.page.screenshot(path="logs/failed_x_post.png")
-            except:
-                pass
+            self.last_error = str(e)
+            self.artifacts.capture("failed_x_post")
             return False
\ No newline at end of file